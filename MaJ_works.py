@@ -2,13 +2,36 @@ import time
 import pandas as pd
 import requests
 import json
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.edge.service import Service
-from selenium.webdriver.edge.options import Options
 from tqdm import tqdm
+from inies.dataset import compacter
+from inies.snapshots import StockInstantanes
+from inies.shared_cache import publier
+from inies.browser import GestionnaireNavigateur, extraire_avec_reprise
+from inies.metrics import MesureProduit, MesuresExtraction, fichier_mesures
+from inies.indicators import enregistrements_tableau, enregistrer_indicateurs, ids_indicateurs
+from inies.page_produit import (
+    URL_PRODUIT, XPATH_ESPACE, XPATH_NOM, XPATH_INFORMATIONS, XPATH_ONGLET_UNITE, XPATH_UNITE, XPATH_DUREE,
+    XPATH_ONGLET_INDICATEURS, XPATH_PHASES, XPATH_ENTETES, COLONNE_TOTAL, COLONNE_D, CHAMPS,
+    classer_declaration, ligne_en_echec, xpath_cellule
+)
+
+# ✅ Lecture du tableau d'indicateurs complet en un seul aller-retour avec le navigateur
+SCRIPT_TABLEAU_INDICATEURS = """
+const table = document.querySelector('indicateurs-read-only table');
+if (!table) { return null; }
+return {
+    entetes: Array.from(table.querySelectorAll('thead tr th')).map(th => th.innerText.trim()),
+    lignes: Array.from(table.querySelectorAll('tbody tr')).map(
+        tr => Array.from(tr.querySelectorAll('td')).map(td => td.innerText.trim())
+    )
+};
+"""
+
+# ✅ Produits déjà en base sans indicateurs : complétés par lots à chaque mise à jour (None = tous d'un coup)
+LOT_RATTRAPAGE = 500
 
 def fetch_latest_inies_data():
     url = "https://base-inies.fr/api/SearchProduits"
@@ -45,96 +68,106 @@ def fetch_latest_inies_data():
         print(f"❌ Erreur d'accès à l'API INIES : {response.status_code} {response.reason}")
         return []
 
-def classer_declaration(text):
-    text = text.lower()
-    if "déclaration individuelle" in text:
-        return "Individuelle"
-    elif "déclaration collective" in text:
-        return "Collective"
-    elif "donnée générique" in text:
-        return "DED"
-    elif "donnée conventionnelle pour la re2020" in text:
-        return "RE2020"
-    elif "donnée conventionnelle issue du référenciel" in text:
-        return "EC"
-    else:
-        return "N/A"
+def extraire_indicateurs(id_inies, driver):
+    tableau = driver.execute_script(SCRIPT_TABLEAU_INDICATEURS)
+    if not tableau:
+        return []
+    return enregistrements_tableau(id_inies, tableau["entetes"], tableau["lignes"])
 
-def extract_product_data(id_inies, driver):
-    try:
-        driver.get(f"https://base-inies.fr/consultation/infos-produit/{id_inies}")
+def extraire_produit(id_inies, driver, indicateurs=None, mesure=None, url=URL_PRODUIT):
+    # ✅ Temps par étape et champs manquants consignés (journal JSONL de la mise à jour)
+    mesure = mesure or MesureProduit(None, id_inies)
+
+    with mesure.etape("navigation"):
+        driver.get(url.format(id_inies))
+    with mesure.etape("attente"):
         WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.XPATH, '//*[@id="workSpace"]'))
+            EC.presence_of_element_located((By.XPATH, XPATH_ESPACE))
         )
         time.sleep(2)
 
+    with mesure.etape("informations"):
         product_name = "Nom introuvable"
         try:
-            product_name = driver.find_element(By.XPATH, '//*[@id="workSpace"]/div/infos-produit/div/div[3]/informations-generales-read-only/div/div[1]/div[2]/span[1]').text.strip()
-        except:
-            pass
+            product_name = driver.find_element(By.XPATH, XPATH_NOM).text.strip()
+        except Exception as e:
+            mesure.echec("nom", e)
 
         declaration_type = "N/A"
         try:
-            declaration_text = driver.find_element(By.XPATH, '//*[@id="workSpace"]/div/infos-produit/div/div[3]/informations-generales-read-only').text
+            declaration_text = driver.find_element(By.XPATH, XPATH_INFORMATIONS).text
             declaration_type = classer_declaration(declaration_text)
-        except:
-            pass
+        except Exception as e:
+            mesure.echec("type_declaration", e)
 
+    with mesure.etape("onglet_unite"):
         try:
-            driver.find_element(By.XPATH, '//*[@id="workSpace"]/div/infos-produit/div/div[2]/button[2]').click()
+            driver.find_element(By.XPATH, XPATH_ONGLET_UNITE).click()
             time.sleep(1)
-        except:
-            pass
+        except Exception as e:
+            mesure.echec("onglet_unite", e)
 
         unite_fonctionnelle = "N/A"
         try:
-            unite_fonctionnelle = driver.find_element(By.XPATH, '//*[@id="workSpace"]/div/infos-produit/div/div[3]/unite-fonctionnelle-read-only/div/div[1]/div[2]/span').text.strip()
-        except:
-            pass
+            unite_fonctionnelle = driver.find_element(By.XPATH, XPATH_UNITE).text.strip()
+        except Exception as e:
+            mesure.echec("unite_fonctionnelle", e)
 
         duree_vie = "N/A"
         try:
-            duree_vie = driver.find_element(By.XPATH, '//*[@id="workSpace"]/div/infos-produit/div/div[3]/unite-fonctionnelle-read-only/div/div[3]/div[2]/span').text.strip()
-        except:
-            pass
+            duree_vie = driver.find_element(By.XPATH, XPATH_DUREE).text.strip()
+        except Exception as e:
+            mesure.echec("duree_vie", e)
 
+    with mesure.etape("onglet_indicateurs"):
         try:
-            driver.find_element(By.XPATH, '//*[@id="workSpace"]/div/infos-produit/div/div[2]/button[3]').click()
+            driver.find_element(By.XPATH, XPATH_ONGLET_INDICATEURS).click()
             time.sleep(1)
-        except:
-            pass
+        except Exception as e:
+            mesure.echec("onglet_indicateurs", e)
 
         try:
-            driver.find_element(By.XPATH, '//*[contains(text(), "Afficher les phases optionnelles")]').click()
+            driver.find_element(By.XPATH, XPATH_PHASES).click()
             time.sleep(2)
-        except:
-            pass
+        except Exception as e:
+            mesure.echec("phases_optionnelles", e)
 
+    with mesure.etape("tableau"):
         impact_co2 = "N/A"
         d_benefices = 0
         try:
-            headers = driver.find_elements(By.XPATH, '//*[@id="workSpace"]/div/infos-produit/div/div[3]/indicateurs-read-only//table/thead/tr/th')
+            headers = driver.find_elements(By.XPATH, XPATH_ENTETES)
             columns = {header.text.strip(): idx + 1 for idx, header in enumerate(headers)}
 
-            if "Total cycle de vie" in columns:
-                impact_co2_xpath = f'//*[@id="workSpace"]/div/infos-produit/div/div[3]/indicateurs-read-only//table/tbody/tr[1]/td[{columns["Total cycle de vie"]}]/span'
-                impact_co2 = driver.find_element(By.XPATH, impact_co2_xpath).text.strip()
+            if COLONNE_TOTAL in columns:
+                impact_co2 = driver.find_element(By.XPATH, xpath_cellule(columns[COLONNE_TOTAL])).text.strip()
+            else:
+                mesure.echec("impact_co2", "ColonneAbsente")
 
-            if "D-Bénéfices et charges au-delà des frontières du système" in columns:
-                d_benefices_xpath = f'//*[@id="workSpace"]/div/infos-produit/div/div[3]/indicateurs-read-only//table/tbody/tr[1]/td[{columns["D-Bénéfices et charges au-delà des frontières du système"]}]/span'
-                d_benefices_text = driver.find_element(By.XPATH, d_benefices_xpath).text.strip()
+            if COLONNE_D in columns:
+                d_benefices_text = driver.find_element(By.XPATH, xpath_cellule(columns[COLONNE_D])).text.strip()
                 if d_benefices_text and d_benefices_text != "-":
                     d_benefices = d_benefices_text
-        except:
-            pass
+        except Exception as e:
+            mesure.echec("tableau", e)
 
-        return [id_inies, product_name, declaration_type, unite_fonctionnelle, duree_vie, impact_co2, d_benefices]
-    
+    # ✅ Matrice complète des indicateurs (tous modules, tous indicateurs)
+    if indicateurs is not None:
+        with mesure.etape("indicateurs"):
+            try:
+                indicateurs.extend(extraire_indicateurs(id_inies, driver))
+            except Exception as e:
+                mesure.echec("indicateurs", e)
+
+    return [id_inies, product_name, declaration_type, unite_fonctionnelle, duree_vie, impact_co2, d_benefices]
+
+def extract_product_data(id_inies, driver, indicateurs=None):
+    try:
+        return extraire_produit(id_inies, driver, indicateurs)
     except Exception as e:
-        return [id_inies, f"Erreur: {str(e)}", "N/A", "N/A", "N/A", "N/A", "N/A"]
+        return ligne_en_echec(id_inies, e)
 
-def update_inies_data():
+def update_inies_data(progression=None, rattrapage=LOT_RATTRAPAGE):
     file_path = "base_inies_complete.xlsx"
     updated_file_path = "base_inies_complete_MAJ.xlsx"
 
@@ -150,18 +183,52 @@ def update_inies_data():
     existing_ids = set(df[id_column_name].astype(str))
     new_entries = set(map(str, latest_ids)) - existing_ids
 
-    if new_entries:
-        service = Service("C:\\Users\\john.chuah\\Documents\\Python\\msedgedriver.exe")
-        options = Options()
-        options.add_argument("--start-maximized")
-        driver = webdriver.Edge(service=service, options=options)
+    # ✅ Rattrapage des indicateurs : produits existants encore absents du stock (la ligne de base est conservée)
+    sans_indicateurs = sorted((existing_ids & set(map(str, latest_ids))) - ids_indicateurs(), key=int)[:rattrapage]
+    if sans_indicateurs:
+        print(f"📥 {len(sans_indicateurs)} produits existants sans indicateurs ajoutés à l'extraction")
+    a_extraire = sorted(new_entries, key=int) + sans_indicateurs
+
+    if a_extraire:
+        indicateurs = []
+        barre = tqdm(total=len(a_extraire), desc="Extraction", unit="produit")
+
+        # ✅ Avancement lisible par l'interface (tâche de fond)
+        def suivre(fait, total, message):
+            barre.update(fait - barre.n)
+            if progression is not None:
+                progression(fait, total, message)
+
+        # ✅ Navigateur issu de la configuration (scraper.json / INIES_*), recyclé et relancé si besoin
+        with GestionnaireNavigateur() as navigateur, MesuresExtraction(fichier_mesures()) as mesures:
+            product_data = extraire_avec_reprise(
+                a_extraire,
+                lambda id_inies, driver, mesure: extraire_produit(id_inies, driver, indicateurs, mesure),
+                navigateur,
+                ligne_en_echec,
+                suivre,
+                mesures
+            )
+        barre.close()
+        print(f"✅ {navigateur.sessions} sessions navigateur, {navigateur.redemarrages} redémarrages après plantage")
+        print(f"📊 Mesures d'extraction : {mesures.chemin} (python -m inies metriques {mesures.chemin})")
+
+        if indicateurs:
+            enregistrer_indicateurs(indicateurs)
+
+        new_df = pd.DataFrame([ligne for ligne in product_data if ligne[0] in new_entries], columns=CHAMPS)
+        if not new_df.empty:
+            df = pd.concat([df, new_df], ignore_index=True)
 
-        product_data = [extract_product_data(id_inies, driver) for id_inies in tqdm(new_entries, desc="Extraction", unit="produit")]
-        driver.quit()
+    df.to_excel(updated_file_path, index=False)
 
-        new_df = pd.DataFrame(product_data, columns=[id_column_name, "Nom du produit", "Type de Déclaration", "Unité Fonctionnelle", "Durée de Vie", "Impact CO₂ (kg)", "D-Bénéfices"])
-        df = pd.concat([df, new_df], ignore_index=True)
+    # ✅ Instantané versionné de la base (historique et comparaison entre rafraîchissements)
+    base = compacter(df)
+    StockInstantanes().enregistrer(base, source=updated_file_path)
 
-    df.to_excel(updated_file_path, index=False)
+    # ✅ Bascule atomique du cache partagé : les processus Streamlit lisent la nouvelle version
+    publier(base)
+    return len(new_entries)
 
-update_inies_data()
+if __name__ == "__main__":
+    update_inies_data()
@@ -1,18 +1,14 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import requests
-import json
 import time
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.edge.options import Options
-from tqdm import tqdm
-import plotly.express as px
+import uuid
 import requests
 import io
+from inies.dataset import compacter
+from inies.shared_cache import base_partagee
+from inies.uploads import importer_fichier, charger_import
+from inies.refresh import soumettre, demarrer_travailleur, derniere_tache, STATUTS_ACTIFS
 
 # ✅ Titre de l'application
 st.set_page_config(layout="wide")
@@ -23,15 +19,14 @@ global df
 df = pd.DataFrame()
 
 # ✅ Fonction pour charger automatiquement depuis GitHub
-@st.cache_data
-def load_data_from_repo():
+def telecharger_base():
     url = 'https://raw.githubusercontent.com/CJ-AEG/aeginies/main/base_inies_complete.xlsx'
     try:
         response = requests.get(url)
         if response.status_code == 200:
             file = io.BytesIO(response.content)
             df = pd.read_excel(file, sheet_name="Sheet1", engine='openpyxl')
-            return df
+            return compacter(df)
         else:
             st.error(f"❌ Erreur de chargement du fichier : {response.status_code}")
             return pd.DataFrame()
@@ -39,6 +34,10 @@ def load_data_from_repo():
         st.error(f"⚠️ Erreur lors du chargement : {e}")
         return pd.DataFrame()
 
+# ✅ Base partagée entre processus : remplacée d'un bloc quand une mise à jour se termine
+def load_data_from_repo():
+    return base_partagee(telecharger_base)
+
 # ✅ Charger automatiquement la base de données
 df = load_data_from_repo()
 if not df.empty:
@@ -47,9 +46,20 @@ if not df.empty:
 # ✅ Zone pour uploader un fichier Excel (optionnel)
 uploaded_file = st.file_uploader("📂 Importer un fichier Excel", type=["xlsx"])
 
+# ✅ Import rattaché à la session (lecture en flux, validation, format compact)
+id_session = st.session_state.setdefault("id_session", f"session-{uuid.uuid4().hex[:12]}")
 if uploaded_file is not None:
-    df = pd.read_excel(uploaded_file, sheet_name="Sheet1", engine='openpyxl')
-    st.success("✅ Fichier chargé avec succès !")
+    try:
+        importer_fichier(uploaded_file.getvalue(), uploaded_file.name, id_session)
+        st.success("✅ Fichier chargé avec succès !")
+    except ValueError as e:
+        st.error(f"❌ Fichier non importé : {e}")
+
+df_import, rapport_import = charger_import(id_session)
+if df_import is not None:
+    df = df_import
+    for avertissement in rapport_import["avertissements"]:
+        st.warning(f"⚠️ {avertissement}")
 
 
 # ✅ Affichage des données importées AVANT traitement
@@ -57,103 +67,6 @@ if not df.empty:
     st.write("### 🔎 Données importées :")
     st.dataframe(df)
 
-# ✅ Fonction pour récupérer les derniers IDs depuis l'API INIES
-def fetch_latest_inies_data():
-    url = "https://base-inies.fr/api/SearchProduits"
-    payload = {
-        "typeDeclaration": 0,
-        "cov": 0,
-        "onlineDate": 0,
-        "lieuProduction": 0,
-        "perfUF": 0,
-        "norme": 0,
-        "onlyArchive": False
-    }
-    headers = {
-        "Content-Type": "application/json",
-        "Accept": "application/json"
-    }
-
-    response = requests.post(url, json=payload, headers=headers)
-
-    if response.status_code == 200:
-        try:
-            data = response.json()
-            if isinstance(data, list):
-                st.success(f"✅ {len(data)} IDs INIES récupérés avec succès !")
-                return [str(item) for item in data]
-            else:
-                st.warning("⚠️ Format de données inattendu.")
-                return []
-        except json.JSONDecodeError:
-            st.error("⚠️ Erreur de décodage JSON.")
-            return []
-    else:
-        st.error(f"❌ Erreur d'accès à l'API INIES : {response.status_code} {response.reason}")
-        return []
-
-# ✅ Fonction de mise à jour des données
-def update_inies_data():
-    global df
-    latest_ids = fetch_latest_inies_data()
-    if not latest_ids:
-        return
-    
-    if df.empty:
-        existing_ids = set()
-    else:
-        existing_ids = set(df['ID INIES'].astype(str))
-
-    new_entries = set(map(str, latest_ids)) - existing_ids
-
-    if new_entries:
-        st.info(f"🔄 Mise à jour en cours avec {len(new_entries)} nouveaux produits...")
-
-        options = Options()
-        options.add_argument("--headless")
-        driver = webdriver.Edge(options=options)
-
-        product_data = []
-        for id_inies in tqdm(new_entries, desc="Extraction"):
-            try:
-                driver.get(f"https://base-inies.fr/consultation/infos-produit/{id_inies}")
-                WebDriverWait(driver, 15).until(
-                    EC.presence_of_element_located((By.XPATH, '//*[@id="workSpace"]'))
-                )
-                time.sleep(2)
-
-                # ✅ Produit
-                try:
-                    product_name = driver.find_element(By.XPATH, '//*[@id="workSpace"]/div/infos-produit/div/div[3]/informations-generales-read-only/div/div[1]/div[2]/span[1]').text.strip()
-                except:
-                    product_name = "Nom introuvable"
-
-                # ✅ Durée de vie
-                try:
-                    duree_vie = driver.find_element(By.XPATH, '//*[@id="workSpace"]/div/infos-produit/div/div[3]/unite-fonctionnelle-read-only/div/div[3]/div[2]/span').text.strip().replace('ans', '').strip()
-                    duree_vie = float(duree_vie) if duree_vie != '' else np.nan
-                except:
-                    duree_vie = np.nan
-
-                # ✅ Impact CO2 + D-bénéfices
-                try:
-                    impact_co2 = float(driver.find_element(By.XPATH, '...').text)
-                    d_benefices = float(driver.find_element(By.XPATH, '...').text)
-                except:
-                    impact_co2 = 0
-                    d_benefices = 0
-
-                product_data.append([id_inies, product_name, duree_vie, impact_co2, d_benefices])
-
-            except Exception as e:
-                st.warning(f"⚠️ Erreur lors de l'extraction de l'ID {id_inies} : {e}")
-
-        driver.quit()
-
-        new_df = pd.DataFrame(product_data, columns=['ID INIES', 'Nom du produit', 'Durée de Vie', 'Impact CO₂ (kg)', 'D-Bénéfices'])
-        df = pd.concat([df, new_df], ignore_index=True).drop_duplicates(subset=['ID INIES'], keep='last')
-        st.success("✅ Base de données mise à jour avec succès !")
-
 # ✅ Fonction de traitement après recherche
 def process_data(filtered_data):
     if filtered_data.empty:
@@ -182,9 +95,33 @@ def process_data(filtered_data):
     st.write("### ✅ Résultats après traitement des données :")
     st.dataframe(filtered_data)
 
-# ✅ Bouton de mise à jour
+# ✅ Bouton de mise à jour : la mise à jour tourne dans le travailleur, pas dans la session
 if st.sidebar.button("🔄 Mettre à jour"):
-    update_inies_data()
+    tache = soumettre()
+    demarrer_travailleur()
+    st.session_state["tache_maj"] = tache["id"]
+
+# ✅ Suivi de la mise à jour (rafraîchi toutes les 5 s tant qu'elle est active)
+def suivi_mise_a_jour():
+    tache = derniere_tache()
+    if tache is None:
+        return
+    if tache["statut"] in STATUTS_ACTIFS:
+        avancement = tache["fait"] / tache["total"] if tache["total"] else 0.0
+        st.progress(avancement, text=f"🔄 Mise à jour : {tache['fait']}/{tache['total']} — {tache['message']}")
+    elif tache["statut"] == "terminee":
+        st.success(f"✅ {tache['message']} le {time.strftime('%d/%m/%Y à %H:%M', time.localtime(tache['fin']))}")
+        # ✅ Rechargement complet de la page pour servir la nouvelle version
+        if st.session_state.pop("tache_maj", None) == tache["id"]:
+            st.rerun()
+    else:
+        st.error(f"❌ Échec de la mise à jour : {tache['message']}")
+        st.session_state.pop("tache_maj", None)
+
+tache_active = derniere_tache()
+actif = tache_active is not None and tache_active["statut"] in STATUTS_ACTIFS
+with st.sidebar:
+    st.fragment(suivi_mise_a_jour, run_every=5 if actif or "tache_maj" in st.session_state else None)()
 
 # ✅ Champ de recherche
 search_term = st.text_input("🔎 Type d'élément à afficher (exemple : Plancher bois)")
@@ -0,0 +1 @@
+# ✅ Cœur applicatif AEG INIES (calculs indépendants de l'interface Streamlit)
@@ -0,0 +1,4 @@
+import sys
+from inies.cli import main
+
+sys.exit(main())
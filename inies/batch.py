@@ -0,0 +1,157 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from inies.dataset import COLONNE_ID, DOSSIER_CACHE, VERSION_SCHEMA
+from inies.impact import impacts_base
+from inies.snapshots import version_contenu
+from inies.units import COLONNE_UNITE, unites_fonctionnelles
+from inies.solutions import lignes_solutions, totaux_solutions
+
+# ✅ Nombre de substituts bas carbone retenus par produit
+NB_VARIANTES = 3
+# ✅ Format de l'export colonnaire (à incrémenter quand les colonnes exportées changent)
+FORMAT_COLONNES = 2
+
+# ✅ Colonnes partagées en lecture seule (fichiers .npy projetés en mémoire par chaque processus)
+_COLONNES = {}
+
+
+# ✅ Export colonnaire de la base : un fichier .npy par colonne, écrit une seule fois par version (contenu et schéma)
+def exporter_colonnes(df, dossier_cache=DOSSIER_CACHE, nb_variantes=NB_VARIANTES):
+    dossier = os.path.join(dossier_cache, "colonnes", f"{version_contenu(df)}-s{VERSION_SCHEMA}-c{FORMAT_COLONNES}")
+    if os.path.exists(os.path.join(dossier, "pret")):
+        return dossier
+    os.makedirs(dossier, exist_ok=True)
+
+    ids = df[COLONNE_ID].to_numpy(dtype='int64')
+    impacts = impacts_base(df)
+    normalise = impacts.normalises
+    # ✅ Groupes d'unité canonique (« 1 m² » et « 1m2 » ensemble), produits comparés sur l'impact par unité
+    groupes = unites_fonctionnelles(df)[COLONNE_UNITE].cat.codes.to_numpy().astype('int32')
+
+    # ✅ Pour chaque unité canonique : les produits les moins émissifs par unité (positions, -1 si absent)
+    ordre = np.lexsort((impacts.par_unite, groupes))
+    ordre = ordre[groupes[ordre] >= 0]
+    groupes_tries = groupes[ordre]
+    debut_groupe = np.searchsorted(groupes_tries, groupes_tries, side='left')
+    rang = np.arange(len(ordre)) - debut_groupe
+    retenus = rang <= nb_variantes
+    meilleurs = np.full((groupes.max() + 1 if len(groupes) else 0, nb_variantes + 1), -1, dtype='int64')
+    meilleurs[groupes_tries[retenus], rang[retenus]] = ordre[retenus]
+
+    tri_ids = np.argsort(ids, kind='stable')
+    colonnes = {
+        'ids_tries': ids[tri_ids],
+        'positions_tries': tri_ids,
+        'ids': ids,
+        'normalise': normalise,
+        'par_unite': impacts.par_unite,
+        'quantites_uf': impacts.quantites_uf,
+        'groupes': groupes,
+        'meilleurs': meilleurs,
+    }
+    for nom, valeurs in colonnes.items():
+        np.save(os.path.join(dossier, f"{nom}.npy"), valeurs)
+    # ✅ Marqueur écrit en dernier : un processus ne lit jamais un export incomplet
+    open(os.path.join(dossier, "pret"), "w").close()
+    return dossier
+
+
+def _colonnes(dossier):
+    if dossier not in _COLONNES:
+        _COLONNES[dossier] = {
+            nom[:-4]: np.load(os.path.join(dossier, nom), mmap_mode='r')
+            for nom in os.listdir(dossier) if nom.endswith('.npy')
+        }
+    return _COLONNES[dossier]
+
+
+# ✅ Évaluation d'un lot de lignes de solutions (exécutée dans un processus du pool)
+def evaluer_lot(dossier, lignes):
+    c = _colonnes(dossier)
+    ids = lignes['ID INIES'].fillna(-1).to_numpy(dtype='int64')
+    quantites = lignes['Quantité'].to_numpy(dtype='float64')
+
+    # ✅ ID INIES -> position par recherche dichotomique dans les IDs triés
+    rang = np.clip(np.searchsorted(c['ids_tries'], ids), 0, max(len(c['ids_tries']) - 1, 0))
+    connues = (len(c['ids_tries']) > 0) & (np.asarray(c['ids_tries'])[rang] == ids)
+    positions = np.where(connues, np.asarray(c['positions_tries'])[rang], -1)
+
+    impacts = lignes['Impact enregistré'].to_numpy(dtype='float64').copy()
+    impacts[connues] = np.round(np.asarray(c['normalise'])[positions[connues]] * quantites[connues], 2)
+    lignes = lignes.assign(**{'Impact normalisé': impacts, 'Produit trouvé': connues})
+
+    # ✅ Variantes : substituts de même unité canonique et d'impact plus faible pour la même quantité physique
+    groupes = np.where(connues, np.asarray(c['groupes'])[np.maximum(positions, 0)], -1)
+    avec_groupe = np.flatnonzero(groupes >= 0)
+    candidats = np.asarray(c['meilleurs'])[groupes[avec_groupe]]
+    ligne_idx = np.repeat(avec_groupe, candidats.shape[1])
+    candidats = candidats.ravel()
+    valides = (candidats >= 0) & (candidats != positions[ligne_idx])
+    ligne_idx, candidats = ligne_idx[valides], candidats[valides]
+
+    unites = quantites[ligne_idx] * np.asarray(c['quantites_uf'])[positions[ligne_idx]]
+    impact_substitut = np.round(np.asarray(c['par_unite'])[candidats] * unites, 2)
+    gain = impacts[ligne_idx] - impact_substitut
+    plus_bas = gain > 0
+
+    variantes = pd.DataFrame({
+        'Solution': lignes['Solution'].to_numpy()[ligne_idx[plus_bas]],
+        'Ligne': lignes['Ligne'].to_numpy()[ligne_idx[plus_bas]],
+        'ID INIES': ids[ligne_idx[plus_bas]],
+        'ID substitut': np.asarray(c['ids'])[candidats[plus_bas]],
+        'Impact substitut': impact_substitut[plus_bas],
+        'Gain': gain[plus_bas],
+    })
+    variantes = variantes.groupby(['Solution', 'Ligne'], sort=False).head(NB_VARIANTES)
+    return lignes, variantes
+
+
+def _evaluer_lot(args):
+    return evaluer_lot(*args)
+
+
+# ✅ Découpage par solution entière : un lot ne coupe jamais une solution en deux
+def decouper(lignes, nb_lots):
+    if lignes.empty:
+        return []
+    codes = pd.factorize(lignes['Solution'])[0]
+    bornes = np.linspace(0, codes.max() + 1, nb_lots + 1).astype(int)
+    coupures = np.searchsorted(codes, bornes)
+    return [lignes.iloc[a:b] for a, b in zip(coupures[:-1], coupures[1:]) if b > a]
+
+
+# ✅ Évaluation de toute une bibliothèque de solutions sur un pool de processus
+def evaluer_bibliotheque(solutions, df, processus=None, lots_par_processus=4, dossier_cache=DOSSIER_CACHE):
+    dossier = exporter_colonnes(df, dossier_cache)
+    lignes = lignes_solutions(solutions)
+    processus = processus or os.cpu_count() or 1
+    lots = decouper(lignes, processus * lots_par_processus)
+
+    if processus == 1 or len(lots) <= 1:
+        resultats = [evaluer_lot(dossier, lot) for lot in lots]
+    else:
+        with ProcessPoolExecutor(max_workers=processus) as pool:
+            # ✅ map conserve l'ordre des lots : fusion déterministe
+            resultats = list(pool.map(_evaluer_lot, [(dossier, lot) for lot in lots]))
+
+    if not resultats:
+        return lignes.assign(**{'Impact normalisé': [], 'Produit trouvé': []}), pd.DataFrame()
+    lignes = pd.concat([r[0] for r in resultats], ignore_index=True)
+    variantes = pd.concat([r[1] for r in resultats], ignore_index=True)
+    return lignes, variantes
+
+
+# ✅ Totaux par solution : meilleure variante (un substitut) et toutes lignes substituées
+def totaux_avec_variantes(lignes, variantes):
+    totaux = totaux_solutions(lignes)
+    if variantes.empty:
+        meilleur, cumule = pd.Series(dtype='float64'), pd.Series(dtype='float64')
+    else:
+        par_ligne = variantes.groupby(['Solution', 'Ligne'], sort=False)['Gain'].max()
+        meilleur = par_ligne.groupby(level='Solution', sort=False).max()
+        cumule = par_ligne.groupby(level='Solution', sort=False).sum()
+    totaux['Impact meilleure variante'] = totaux['Impact total normalisé'] - totaux['Solution'].map(meilleur).fillna(0.0)
+    totaux['Impact tous substituts'] = totaux['Impact total normalisé'] - totaux['Solution'].map(cumule).fillna(0.0)
+    return totaux
@@ -0,0 +1,207 @@
+import glob
+import json
+import os
+from collections import deque
+from inies.dataset import BASE_DIR
+from inies.metrics import MesuresExtraction
+
+# ✅ Configuration du navigateur de mise à jour : valeurs par défaut < scraper.json < variables d'environnement
+FICHIER_CONFIG = os.path.join(BASE_DIR, "scraper.json")
+CONFIG_DEFAUT = {
+    "navigateur": "chrome",      # chrome ou edge
+    "driver": None,              # chemin du chromedriver / msedgedriver (Selenium Manager sinon)
+    "binaire": None,             # exécutable du navigateur s'il n'est pas dans le PATH
+    "headless": True,
+    "pages_max": 200,            # recyclage de la session toutes les N pages
+    "memoire_max_mo": 1500,      # ... ou au-delà de ce total RSS (navigateur + driver)
+    "tentatives": 3,             # essais par ID avant abandon
+    "delai_chargement": 30,
+}
+VARIABLES = {
+    "navigateur": "INIES_NAVIGATEUR",
+    "driver": "INIES_DRIVER",
+    "binaire": "INIES_BINAIRE",
+    "headless": "INIES_HEADLESS",
+    "pages_max": "INIES_PAGES_MAX",
+    "memoire_max_mo": "INIES_MEMOIRE_MAX_MO",
+    "tentatives": "INIES_TENTATIVES",
+}
+
+
+def configuration(chemin=FICHIER_CONFIG):
+    config = dict(CONFIG_DEFAUT)
+    if os.path.exists(chemin):
+        with open(chemin, "r", encoding="utf-8") as f:
+            config.update(json.load(f))
+    for cle, variable in VARIABLES.items():
+        valeur = os.environ.get(variable)
+        if valeur is None:
+            continue
+        if isinstance(CONFIG_DEFAUT[cle], bool):
+            valeur = valeur.strip().lower() not in ("0", "false", "non", "")
+        elif isinstance(CONFIG_DEFAUT[cle], int):
+            valeur = int(valeur)
+        config[cle] = valeur
+    if config["navigateur"] not in ("chrome", "edge"):
+        raise ValueError(f"Navigateur non pris en charge : {config['navigateur']} (chrome ou edge)")
+    return config
+
+
+# ✅ Mémoire résidente d'un processus et de ses descendants (Linux, /proc) ; None ailleurs
+def memoire_processus_mo(pid):
+    if pid is None or not os.path.isdir("/proc"):
+        return None
+    parents = {}
+    for chemin in glob.glob("/proc/[0-9]*/stat"):
+        try:
+            with open(chemin, "r") as f:
+                champs = f.read().rsplit(")", 1)[1].split()
+            parents.setdefault(int(champs[1]), []).append(int(chemin.split("/")[2]))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    total, a_visiter = 0, [pid]
+    page = os.sysconf("SC_PAGE_SIZE")
+    while a_visiter:
+        courant = a_visiter.pop()
+        a_visiter.extend(parents.get(courant, []))
+        try:
+            with open(f"/proc/{courant}/statm", "r") as f:
+                total += int(f.read().split()[1]) * page
+        except (OSError, IndexError, ValueError):
+            continue
+    return total / 1024 ** 2
+
+
+# ✅ Session Selenium gérée : création depuis la configuration, recyclage périodique, redémarrage après plantage
+class GestionnaireNavigateur:
+    def __init__(self, config=None):
+        self.config = config or configuration()
+        self._driver = None
+        self.pages = 0
+        self.sessions = 0
+        self.redemarrages = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def _options(self):
+        if self.config["navigateur"] == "edge":
+            from selenium.webdriver.edge.options import Options
+        else:
+            from selenium.webdriver.chrome.options import Options
+        options = Options()
+        if self.config["headless"]:
+            options.add_argument("--headless=new")
+            options.add_argument("--window-size=1920,1080")
+        # ✅ Conteneurs Linux : pas de bac à sable, /dev/shm souvent trop petit
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+        if self.config["binaire"]:
+            options.binary_location = self.config["binaire"]
+        return options
+
+    def _creer(self):
+        from selenium import webdriver
+        if self.config["navigateur"] == "edge":
+            from selenium.webdriver.edge.service import Service
+            fabrique = webdriver.Edge
+        else:
+            from selenium.webdriver.chrome.service import Service
+            fabrique = webdriver.Chrome
+        service = Service(self.config["driver"]) if self.config["driver"] else Service()
+        driver = fabrique(service=service, options=self._options())
+        driver.set_page_load_timeout(self.config["delai_chargement"])
+        self.sessions += 1
+        self.pages = 0
+        return driver
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            self._driver = self._creer()
+        return self._driver
+
+    def memoire_mo(self):
+        if self._driver is None:
+            return 0.0
+        processus = getattr(self._driver.service, "process", None)
+        return memoire_processus_mo(getattr(processus, "pid", None))
+
+    def est_vivant(self):
+        if self._driver is None:
+            return False
+        try:
+            self._driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def fermer(self):
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+            self._driver = None
+
+    def redemarrer(self):
+        self.fermer()
+        self.redemarrages += 1
+
+    # ✅ Après chaque page : nouvelle session si le quota de pages ou le seuil mémoire est atteint
+    def page_chargee(self):
+        if self._driver is None:
+            return
+        self.pages += 1
+        if self.pages >= self.config["pages_max"]:
+            self.fermer()
+            return
+        memoire = self.memoire_mo()
+        if memoire is not None and memoire > self.config["memoire_max_mo"]:
+            self.fermer()
+
+
+# ✅ Extraction d'une liste d'IDs : un ID en échec est remis en fin de file (session redémarrée si plantée)
+def extraire_avec_reprise(ids, extraire, navigateur, en_echec, progression=None, mesures=None):
+    mesures = mesures or MesuresExtraction()
+    file = deque((id_inies, 1) for id_inies in ids)
+    total = len(file)
+    resultats = []
+    while file:
+        id_inies, tentative = file.popleft()
+        # ✅ Échec au lancement du navigateur : erreur de configuration, remontée telle quelle
+        driver = navigateur.driver
+        mesure = mesures.produit(id_inies, tentative, navigateur.sessions)
+        try:
+            resultat = extraire(id_inies, driver, mesure)
+            # ✅ Champs manquants et session morte : le plantage a interrompu la page, le produit est réessayé
+            if mesure.enregistrement["echecs"] and not navigateur.est_vivant():
+                navigateur.redemarrer()
+                if tentative < navigateur.config["tentatives"]:
+                    mesure.terminer("reessai")
+                    file.append((id_inies, tentative + 1))
+                    continue
+            resultats.append(resultat)
+            mesure.terminer("partiel" if mesure.enregistrement["echecs"] else "ok")
+        except Exception as e:
+            if not mesure.enregistrement["echecs"]:
+                mesure.echec("extraction", e)
+            if not navigateur.est_vivant():
+                navigateur.redemarrer()
+            if tentative < navigateur.config["tentatives"]:
+                mesure.terminer("reessai")
+                file.append((id_inies, tentative + 1))
+                continue
+            mesure.terminer("echec")
+            resultats.append(en_echec(id_inies, e))
+        finally:
+            navigateur.page_chargee()
+
+        if progression is not None:
+            progression(len(resultats), total, f"Produit {id_inies}")
+    return resultats
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# ✅ Couleurs des catégories carbone (partagées par toutes les pages)
+COULEURS_BASE = {
+    'Bas carbone': '#2ca02c',
+    'Intermédiaire': '#ff7f0e',
+    'Haut carbone': '#d62728',
+}
+# ✅ Valeurs marquées : couleur de leur catégorie, sauf les deux extrêmes attendus
+COULEURS_CATEGORIES = {
+    **COULEURS_BASE,
+    **{f"{categorie} ({marque})": couleur for categorie, couleur in COULEURS_BASE.items()
+       for marque in ('Valeur minimale', 'Valeur maximale')},
+    'Bas carbone (Valeur minimale)': '#1f77b4',
+    'Haut carbone (Valeur maximale)': '#9467bd',
+    'Non classé': '#7f7f7f'
+}
+
+
+# ✅ Histogramme pré-calculé côté serveur : seuls les effectifs par classe et par catégorie
+# sont envoyés au navigateur, quelle que soit la taille du jeu de résultats
+def histogramme_par_categorie(valeurs, categories, nbins=20, plage=(-3, 3)):
+    valeurs = np.asarray(valeurs, dtype=float)
+    categories = pd.Categorical(categories)
+    bornes = np.linspace(plage[0], plage[1], nbins + 1)
+
+    # ✅ Valeurs hors plage ou non numériques ignorées (elles ne seraient pas visibles)
+    visibles = np.isfinite(valeurs) & (valeurs >= bornes[0]) & (valeurs <= bornes[-1]) & (categories.codes >= 0)
+    classes = np.clip(np.searchsorted(bornes, valeurs[visibles], side='right') - 1, 0, nbins - 1)
+    codes = categories.codes[visibles].astype(np.int64)
+
+    # ✅ Un seul bincount pour toutes les catégories
+    effectifs = np.bincount(codes * nbins + classes, minlength=len(categories.categories) * nbins)
+    effectifs = effectifs.reshape(len(categories.categories), nbins)
+
+    cat_idx, bin_idx = np.nonzero(effectifs)
+    return pd.DataFrame({
+        'Catégorie': np.asarray(categories.categories)[cat_idx],
+        'Début': bornes[bin_idx],
+        'Fin': bornes[bin_idx + 1],
+        'Effectif': effectifs[cat_idx, bin_idx]
+    })
+
+
+# ✅ Construction de la figure à partir des effectifs pré-calculés
+def figure_histogramme(classes, titre_x='Z-Score', plage=(-3, 3), couleurs=COULEURS_CATEGORIES):
+    fig = go.Figure()
+    for categorie, groupe in classes.groupby('Catégorie', sort=True):
+        fig.add_trace(go.Bar(
+            x=(groupe['Début'] + groupe['Fin']) / 2,
+            y=groupe['Effectif'],
+            width=groupe['Fin'] - groupe['Début'],
+            name=categorie,
+            marker_color=couleurs.get(categorie)
+        ))
+    fig.update_layout(barmode='stack', bargap=0, xaxis_title=titre_x, yaxis_title='count', legend_title='Catégorie')
+    fig.update_xaxes(range=list(plage))
+    return fig
+
+
+# ✅ Graphique à barres groupées directement depuis le tableau large (sans melt)
+def figure_barres_groupees(data, colonne_nom, variables, titre=None):
+    fig = go.Figure()
+    for _, ligne in data.iterrows():
+        fig.add_trace(go.Bar(
+            x=variables,
+            y=[ligne[v] for v in variables],
+            name=str(ligne[colonne_nom])
+        ))
+    fig.update_layout(barmode='group', title=titre)
+    return fig
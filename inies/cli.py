@@ -0,0 +1,398 @@
+import argparse
+import sys
+import tempfile
+import time
+import pandas as pd
+from inies.dataset import FICHIER_BASE, charger_base
+from inies.batch import evaluer_bibliotheque, totaux_avec_variantes
+from inies.fixtures import DOSSIER_FIXTURES, capturer, comparer_extractions
+from inies.impact import impacts_base
+from inies.indicators import FICHIER_INDICATEURS, MODULE_TOTAL, StockIndicateurs
+from inies.metrics import lire_mesures, rapport_mesures
+from inies.optimize import optimiser_solutions, totaux_optimises
+from inies.project import CalculProjet, charger_projets
+from inies.recommend import IndexSubstituts
+from inies.refresh import DOSSIER_TACHES, soumettre, travailler
+from inies.scoring import scorer, MODES_SCORE
+from inies.search import rechercher, TYPES_DECLARATION
+from inies.session import BUDGET_SESSION, simuler_sessions
+from inies.solutions import charger_solutions
+from inies.shared_cache import DOSSIER_PARTAGE, publier, verifier_processus
+from inies.snapshots import DOSSIER_INSTANTANES, StockInstantanes
+from inies.sorties import FORMATS, EcrivainFlux
+from inies.warmup import FICHIER_ETAT, PAGE_BANC, SCRIPT_ACCUEIL, banc_demarrage, est_pret, lancer_serveur, lire_etat
+
+COLONNES_RECHERCHE = [
+    'ID INIES', 'Nom du produit', 'Type de Déclaration', 'Unité Fonctionnelle', 'Durée de Vie',
+    'Impact CO₂ (kg)', 'D-Bénéfices', 'Impact total', 'Impact normalisé', 'Unité canonique', 'Impact par unité',
+    'Z-Score', 'Catégorie'
+]
+
+
+# ✅ Une requête par ligne (lignes vides et commentaires "#" ignorés)
+def lire_requetes(chemin):
+    with open(chemin, "r", encoding="utf-8") as f:
+        return [ligne.strip() for ligne in f if ligne.strip() and not ligne.lstrip().startswith('#')]
+
+
+def commande_recherche(args):
+    df = charger_base(args.base)
+    requetes = lire_requetes(args.requetes)
+    impacts = impacts_base(df)
+
+    with EcrivainFlux(args.sortie, args.format) as sortie:
+        for requete in requetes:
+            resultats = scorer(rechercher(df, requete, args.types), args.mode, not args.toutes_unites, impacts)
+            if resultats.empty:
+                print(f"⚠️ {requete} : aucun résultat", file=sys.stderr)
+                continue
+            resultats = resultats[[col for col in COLONNES_RECHERCHE if col in resultats.columns]]
+            resultats.insert(0, 'Requête', requete)
+            sortie.ecrire(resultats)
+            print(f"✅ {requete} : {len(resultats)} résultats", file=sys.stderr)
+    return sortie.lignes
+
+
+def commande_solutions(args):
+    df = charger_base(args.base)
+    lignes, variantes = evaluer_bibliotheque(charger_solutions(args.solutions), df, args.processus)
+    resultat = lignes if args.detail else totaux_avec_variantes(lignes, variantes)
+
+    with EcrivainFlux(args.sortie, args.format) as sortie:
+        sortie.ecrire(resultat)
+    if args.variantes:
+        with EcrivainFlux(args.variantes) as sortie_variantes:
+            sortie_variantes.ecrire(variantes)
+        print(f"✅ {sortie_variantes.lignes} variantes écrites dans {args.variantes}", file=sys.stderr)
+    return sortie.lignes
+
+
+def commande_substituts(args):
+    df = charger_base(args.base)
+    substituts = IndexSubstituts(df).recommander_lot(args.ids, k=args.k, types=args.types)
+    if not args.sortie:
+        print(substituts.to_string(index=False))
+        return len(substituts)
+
+    with EcrivainFlux(args.sortie, args.format) as sortie:
+        sortie.ecrire(substituts)
+    return sortie.lignes
+
+
+def commande_optimiser(args):
+    df = charger_base(args.base)
+    lignes = optimiser_solutions(
+        charger_solutions(args.solutions), IndexSubstituts(df),
+        types=args.types, max_substitutions=args.max_substitutions
+    )
+    resultat = lignes if args.detail else totaux_optimises(lignes)
+
+    with EcrivainFlux(args.sortie, args.format) as sortie:
+        sortie.ecrire(resultat)
+    return sortie.lignes
+
+
+def commande_indicateurs(args):
+    stock = StockIndicateurs.charger(args.indicateurs)
+    ids = None
+    if args.recherche:
+        ids = rechercher(charger_base(args.base), args.recherche)['ID INIES']
+
+    resultat = pd.concat([
+        stock.valeurs(args.module, args.indicateur, ids),
+        stock.valeurs(MODULE_TOTAL, args.indicateur, ids),
+        stock.part_module(args.module, args.indicateur, ids)
+    ], axis=1).reset_index()
+
+    with EcrivainFlux(args.sortie, args.format) as sortie:
+        sortie.ecrire(resultat)
+    return sortie.lignes
+
+
+def commande_projet(args):
+    df = charger_base(args.base)
+    solutions = charger_solutions(args.solutions)
+    projets = charger_projets(args.projets)
+    noms = args.noms or list(projets)
+
+    recapitulatifs = []
+    for nom in noms:
+        calcul = CalculProjet.depuis_projet(projets[nom], solutions, df)
+        resultat = calcul.tableau() if args.detail else calcul.recapitulatif()
+        resultat.insert(0, 'Projet', nom)
+        recapitulatifs.append(resultat)
+        print(f"✅ {nom} : {calcul.total:.2f} kg CO₂ normalisé", file=sys.stderr)
+
+    with EcrivainFlux(args.sortie, args.format) as sortie:
+        sortie.ecrire(pd.concat(recapitulatifs, ignore_index=True))
+    return sortie.lignes
+
+
+def commande_instantanes(args):
+    stock = StockInstantanes(args.dossier)
+    if args.enregistrer:
+        version = stock.enregistrer(charger_base(args.base), source=args.base)
+        print(f"✅ Instantané {version}", file=sys.stderr)
+    versions = stock.versions()
+    for v in versions:
+        print(f"{v['version']}  {v['date']}  {v['lignes']:>6} produits  {v.get('source') or ''}")
+    return len(versions)
+
+
+def commande_diff(args):
+    stock = StockInstantanes(args.dossier)
+    versions = [v["version"] for v in stock.versions()]
+    version_a = args.de or (versions[-2] if len(versions) >= 2 else None)
+    version_b = args.vers or (versions[-1] if versions else None)
+    if version_a is None or version_b is None:
+        print("⚠️ Au moins deux instantanés sont nécessaires.", file=sys.stderr)
+        return 0
+
+    changements = stock.diff(version_a, version_b)
+    for nature, ids in changements.items():
+        print(f"{nature} : {len(ids)}")
+    if not args.sortie:
+        return sum(len(ids) for ids in changements.values())
+
+    with EcrivainFlux(args.sortie, args.format) as sortie:
+        sortie.ecrire(stock.diff_valeurs(version_a, version_b))
+    return sortie.lignes
+
+
+def commande_partage(args):
+    df = charger_base(args.base)
+    if args.verifier:
+        # ✅ Vérification dans un dossier temporaire : la base publiée n'est pas touchée
+        with tempfile.TemporaryDirectory() as dossier:
+            lectures = verifier_processus(df, args.verifier, dossier)
+        print(lectures.to_string(index=False))
+        print(f"{'✅' if lectures['Conforme'].all() else '❌'} {args.verifier} processus vérifiés", file=sys.stderr)
+        return len(lectures)
+
+    version = publier(df, args.dossier)
+    print(f"✅ Base {version} publiée dans {args.dossier}", file=sys.stderr)
+    return len(df)
+
+
+def commande_travailleur(args):
+    if args.soumettre:
+        tache = soumettre(dossier=args.dossier)
+        print(f"✅ Tâche {tache['id']} ({tache['statut']})", file=sys.stderr)
+    return travailler(args.dossier, une_fois=args.une_fois)
+
+
+def commande_metriques(args):
+    rapport = rapport_mesures([m for chemin in args.fichiers for m in lire_mesures(chemin)])
+    if not rapport:
+        print("⚠️ Aucune mesure.", file=sys.stderr)
+        return 0
+    for cle, valeur in rapport["synthese"].items():
+        print(f"{cle} : {valeur}")
+    for titre, cle in (("Latences", "latences"), ("Classes d'échec", "echecs"), ("Tentatives", "tentatives")):
+        print(f"\n{titre}\n{rapport[cle].to_string(index=False)}")
+    if args.sortie:
+        with EcrivainFlux(args.sortie, args.format) as sortie:
+            sortie.ecrire(rapport["latences"])
+        return sortie.lignes
+    return len(rapport["latences"])
+
+
+def commande_capture(args):
+    from inies.browser import GestionnaireNavigateur
+
+    with GestionnaireNavigateur() as navigateur:
+        return capturer(args.ids, navigateur, args.dossier, lambda fait, total, message: print(f"{fait}/{total} {message}"))
+
+
+def commande_banc(args):
+    resultats, ecarts = comparer_extractions(args.dossier, args.selenium)
+    print(resultats.to_string(index=False))
+    if not ecarts.empty:
+        print(f"\nÉcarts avec les valeurs attendues\n{ecarts.to_string(index=False)}")
+    if args.sortie:
+        with EcrivainFlux(args.sortie, args.format) as sortie:
+            sortie.ecrire(resultats)
+        return sortie.lignes
+    return len(resultats)
+
+
+def commande_sessions(args):
+    df = charger_base(args.base)
+    resultats = simuler_sessions(df, args.nb, args.executions, int(args.budget_ko * 1024))
+    print(resultats.describe().loc[['mean', 'max']].round(1).to_string())
+    print(
+        f"Total {args.nb} sessions : {resultats['Empreinte (Ko)'].sum() / 1024:.1f} Mo "
+        f"(sans gestion : {resultats['Sans gestion (Ko)'].sum() / 1024:.1f} Mo)"
+    )
+    if args.sortie:
+        with EcrivainFlux(args.sortie, args.format) as sortie:
+            sortie.ecrire(resultats)
+        return sortie.lignes
+    return len(resultats)
+
+
+def commande_serveur(args):
+    return lancer_serveur(args.script, args.options, lambda: charger_base(args.base), not args.sans_prechauffage)
+
+
+def commande_pret(args):
+    etat = lire_etat(args.etat)
+    if etat is None:
+        print("❌ Aucun préchauffage enregistré", file=sys.stderr)
+        raise SystemExit(1)
+    for cle in ("pid", "pret", "duree", "lignes", "erreur"):
+        print(f"{cle} : {etat.get(cle)}")
+    for nom, duree in etat["etapes"].items():
+        print(f"  {nom} : {duree:.3f} s")
+    if not est_pret(args.etat):
+        print("❌ Serveur non prêt", file=sys.stderr)
+        raise SystemExit(1)
+    return len(etat["etapes"])
+
+
+def commande_demarrage(args):
+    resultats = banc_demarrage(args.page, args.terme, args.repetitions)
+    print(resultats.round(3).to_string(index=False))
+    if args.sortie:
+        with EcrivainFlux(args.sortie, args.format) as sortie:
+            sortie.ecrire(resultats)
+        return sortie.lignes
+    return len(resultats)
+
+
+def construire_parser():
+    parser = argparse.ArgumentParser(prog="python -m inies", description="Traitements AEG INIES sans interface Streamlit")
+    parser.add_argument("--base", default=FICHIER_BASE, help="Classeur INIES (mis en cache en Parquet)")
+    sous = parser.add_subparsers(dest="commande", required=True)
+
+    recherche = sous.add_parser("recherche", help="Recherche, Z-Score et catégorisation pour un fichier de requêtes")
+    recherche.add_argument("requetes", help="Fichier texte : une requête par ligne")
+    recherche.add_argument("-o", "--sortie", required=True, help="Fichier de sortie (.csv, .parquet ou .xlsx)")
+    recherche.add_argument("--format", choices=FORMATS, help="Format (déduit de l'extension par défaut)")
+    recherche.add_argument("--types", nargs="+", default=TYPES_DECLARATION, help="Types de déclaration retenus")
+    recherche.add_argument("--mode", choices=list(MODES_SCORE), default='zscore', help="Méthode de score : zscore, mediane (MAD) ou centile")
+    recherche.add_argument("--toutes-unites", action="store_true", help="Classe tous les résultats ensemble, sans regrouper par unité fonctionnelle")
+    recherche.set_defaults(fonction=commande_recherche)
+
+    solutions = sous.add_parser("solutions", help="Impact total normalisé des solutions prédéfinies")
+    solutions.add_argument("solutions", help="Bibliothèque de solutions (solutions_db.json)")
+    solutions.add_argument("-o", "--sortie", required=True, help="Fichier de sortie (.csv, .parquet ou .xlsx)")
+    solutions.add_argument("--format", choices=FORMATS, help="Format (déduit de l'extension par défaut)")
+    solutions.add_argument("--detail", action="store_true", help="Une ligne par produit plutôt qu'un total par solution")
+    solutions.add_argument("--variantes", help="Fichier de sortie des substituts bas carbone (.csv, .parquet ou .xlsx)")
+    solutions.add_argument("--processus", type=int, help="Nombre de processus (par défaut : nombre de cœurs)")
+    solutions.set_defaults(fonction=commande_solutions)
+
+    substituts = sous.add_parser("substituts", help="Substituts bas carbone de même unité fonctionnelle")
+    substituts.add_argument("ids", nargs="+", type=int, help="ID INIES des produits à remplacer")
+    substituts.add_argument("-k", type=int, default=5, help="Nombre de substituts par produit")
+    substituts.add_argument("-o", "--sortie", help="Fichier de sortie (.csv, .parquet ou .xlsx), affichage sinon")
+    substituts.add_argument("--format", choices=FORMATS, help="Format (déduit de l'extension par défaut)")
+    substituts.add_argument("--types", nargs="+", help="Types de déclaration autorisés pour les substituts")
+    substituts.set_defaults(fonction=commande_substituts)
+
+    optimiser = sous.add_parser("optimiser", help="Minimise l'impact total des solutions par substitution")
+    optimiser.add_argument("solutions", help="Bibliothèque de solutions (solutions_db.json)")
+    optimiser.add_argument("-o", "--sortie", required=True, help="Fichier de sortie (.csv, .parquet ou .xlsx)")
+    optimiser.add_argument("--format", choices=FORMATS, help="Format (déduit de l'extension par défaut)")
+    optimiser.add_argument("--types", nargs="+", help="Types de déclaration autorisés (ex. Individuelle Collective)")
+    optimiser.add_argument("--max-substitutions", type=int, help="Nombre maximal de substitutions par solution")
+    optimiser.add_argument("--detail", action="store_true", help="Une ligne par produit plutôt qu'un total par solution")
+    optimiser.set_defaults(fonction=commande_optimiser)
+
+    projet = sous.add_parser("projet", help="Impact d'un projet (solutions x quantités), par catégorie")
+    projet.add_argument("projets", help="Projets (projets_db.json)")
+    projet.add_argument("solutions", help="Bibliothèque de solutions (solutions_db.json)")
+    projet.add_argument("--noms", nargs="+", help="Projets à calculer (par défaut : tous)")
+    projet.add_argument("-o", "--sortie", required=True, help="Fichier de sortie (.csv, .parquet ou .xlsx)")
+    projet.add_argument("--format", choices=FORMATS, help="Format (déduit de l'extension par défaut)")
+    projet.add_argument("--detail", action="store_true", help="Une ligne par solution plutôt qu'un total par catégorie")
+    projet.set_defaults(fonction=commande_projet)
+
+    indicateurs = sous.add_parser("indicateurs", help="Part d'un module du cycle de vie dans le total (ex. A1-A3)")
+    indicateurs.add_argument("--module", required=True, help="Module du cycle de vie (A1-A3, A4, A5, B1..B7, C1..C4, D)")
+    indicateurs.add_argument("--indicateur", help="Indicateur environnemental (par défaut : première ligne du tableau INIES)")
+    indicateurs.add_argument("--recherche", help="Restreindre aux produits correspondant à cette recherche")
+    indicateurs.add_argument("--indicateurs", default=FICHIER_INDICATEURS, help="Stock Parquet des indicateurs")
+    indicateurs.add_argument("-o", "--sortie", required=True, help="Fichier de sortie (.csv, .parquet ou .xlsx)")
+    indicateurs.add_argument("--format", choices=FORMATS, help="Format (déduit de l'extension par défaut)")
+    indicateurs.set_defaults(fonction=commande_indicateurs)
+
+    instantanes = sous.add_parser("instantanes", help="Historique des instantanés de la base")
+    instantanes.add_argument("--dossier", default=DOSSIER_INSTANTANES, help="Dossier des instantanés")
+    instantanes.add_argument("--enregistrer", action="store_true", help="Enregistrer d'abord la base courante")
+    instantanes.set_defaults(fonction=commande_instantanes, sortie=None)
+
+    diff = sous.add_parser("diff", help="Produits ajoutés, supprimés et modifiés entre deux instantanés")
+    diff.add_argument("de", nargs="?", help="Version de départ (par défaut : avant-dernière)")
+    diff.add_argument("vers", nargs="?", help="Version d'arrivée (par défaut : dernière)")
+    diff.add_argument("--dossier", default=DOSSIER_INSTANTANES, help="Dossier des instantanés")
+    diff.add_argument("-o", "--sortie", help="Détail des valeurs modifiées (.csv, .parquet ou .xlsx)")
+    diff.add_argument("--format", choices=FORMATS, help="Format (déduit de l'extension par défaut)")
+    diff.set_defaults(fonction=commande_diff)
+
+    partage = sous.add_parser("partage", help="Publie la base dans le cache partagé par les processus Streamlit")
+    partage.add_argument("--dossier", default=DOSSIER_PARTAGE, help="Dossier du cache partagé")
+    partage.add_argument("--verifier", type=int, metavar="N", help="Vérifier la bascule de version sur N processus")
+    partage.set_defaults(fonction=commande_partage, sortie=None)
+
+    metriques = sous.add_parser("metriques", help="Latences p50/p95 et classes d'échec d'une mise à jour (journal JSONL)")
+    metriques.add_argument("fichiers", nargs="+", help="Journaux .cache/metriques/extraction-*.jsonl")
+    metriques.add_argument("-o", "--sortie", help="Latences par étape (.csv, .parquet ou .xlsx)")
+    metriques.add_argument("--format", choices=FORMATS, help="Format (déduit de l'extension par défaut)")
+    metriques.set_defaults(fonction=commande_metriques)
+
+    capture = sous.add_parser("capture", help="Enregistre des pages produit INIES dans le corpus hors ligne (Selenium, réseau)")
+    capture.add_argument("ids", nargs="+", help="ID INIES à capturer")
+    capture.add_argument("--dossier", default=DOSSIER_FIXTURES, help="Dossier du corpus")
+    capture.set_defaults(fonction=commande_capture, sortie=None)
+
+    banc = sous.add_parser("banc", help="Analyse statique (lxml) du corpus hors ligne, comparée à Selenium avec --selenium")
+    banc.add_argument("--dossier", default=DOSSIER_FIXTURES, help="Dossier du corpus")
+    banc.add_argument("--selenium", action="store_true", help="Mesure aussi Selenium sur le corpus servi en local")
+    banc.add_argument("-o", "--sortie", help="Résultats du banc (.csv, .parquet ou .xlsx)")
+    banc.add_argument("--format", choices=FORMATS, help="Format (déduit de l'extension par défaut)")
+    banc.set_defaults(fonction=commande_banc)
+
+    sessions = sous.add_parser("sessions", help="Simule des sessions concurrentes de la page Solutions (empreinte et budget mémoire)")
+    sessions.add_argument("--nb", type=int, default=50, help="Nombre de sessions")
+    sessions.add_argument("--executions", type=int, default=30, help="Exécutions de page par session (un brouillon ouvert par exécution)")
+    sessions.add_argument("--budget-ko", type=float, default=BUDGET_SESSION / 1024, help="Budget mémoire par session (Ko)")
+    sessions.add_argument("-o", "--sortie", help="Détail par session (.csv, .parquet ou .xlsx)")
+    sessions.add_argument("--format", choices=FORMATS, help="Format (déduit de l'extension par défaut)")
+    sessions.set_defaults(fonction=commande_sessions)
+
+    serveur = sous.add_parser("serveur", help="Préchauffe la base et les index, puis lance le serveur Streamlit dans le même processus")
+    serveur.add_argument("script", nargs="?", default=SCRIPT_ACCUEIL, help="Script Streamlit (par défaut : login.py)")
+    serveur.add_argument("options", nargs=argparse.REMAINDER, help="Options transmises à `streamlit run` (ex. --server.port 8501)")
+    serveur.add_argument("--sans-prechauffage", action="store_true", help="Lance le serveur sans préchauffage")
+    serveur.set_defaults(fonction=commande_serveur, sortie=None)
+
+    pret = sous.add_parser("pret", help="Signal de disponibilité : code de retour 1 tant que le préchauffage n'est pas terminé")
+    pret.add_argument("--etat", default=FICHIER_ETAT, help="Fichier d'état du préchauffage")
+    pret.set_defaults(fonction=commande_pret, sortie=None)
+
+    demarrage = sous.add_parser("demarrage", help="Banc de démarrage à froid : délai jusqu'au premier affichage, sans puis avec préchauffage")
+    demarrage.add_argument("--page", default=PAGE_BANC, help="Page mesurée (par défaut : pages/appworks.py)")
+    demarrage.add_argument("--terme", default="bois", help="Recherche saisie après le premier affichage")
+    demarrage.add_argument("--repetitions", type=int, default=1, help="Nombre d'essais par mode")
+    demarrage.add_argument("-o", "--sortie", help="Mesures (.csv, .parquet ou .xlsx)")
+    demarrage.add_argument("--format", choices=FORMATS, help="Format (déduit de l'extension par défaut)")
+    demarrage.set_defaults(fonction=commande_demarrage)
+
+    travailleur = sous.add_parser("travailleur", help="Exécute en tâche de fond les mises à jour demandées depuis l'interface")
+    travailleur.add_argument("--dossier", default=DOSSIER_TACHES, help="Dossier de la file de tâches")
+    travailleur.add_argument("--soumettre", action="store_true", help="Ajouter d'abord une mise à jour à la file")
+    travailleur.add_argument("--une-fois", action="store_true", help="Traiter la file puis s'arrêter (tâche planifiée)")
+    travailleur.set_defaults(fonction=commande_travailleur, sortie=None)
+
+    return parser
+
+
+def main(argv=None):
+    args = construire_parser().parse_args(argv)
+    debut = time.perf_counter()
+    lignes = args.fonction(args)
+    destination = args.sortie or "la sortie standard"
+    print(f"✅ {lignes} lignes écrites dans {destination} ({time.perf_counter() - debut:.2f} s)", file=sys.stderr)
+    return 0
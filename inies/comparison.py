@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+from inies.dataset import COLONNE_ID, memoiser_par_base
+from inies.impact import impacts_base
+
+COLONNES_COMPARAISON = ['Impact CO₂ (kg)', 'D-Bénéfices', 'Impact total normalisé']
+
+
+# ✅ Libellés "Nom (ID: ...)" par ID INIES (listes de sélection)
+@memoiser_par_base()
+def libelles_produits(df):
+    return dict(zip(
+        df[COLONNE_ID].tolist(),
+        (df['Nom du produit'] + " (ID: " + df[COLONNE_ID].astype(str) + ")").tolist()
+    ))
+
+
+# ✅ Comparaison de N produits en une seule passe vectorisée
+def comparer_produits(df, ids):
+    impacts = impacts_base(df)
+    ids = np.asarray(list(ids), dtype='int64')
+    positions = impacts.positions(ids)
+    if (positions < 0).any():
+        inconnus = ', '.join(str(i) for i in ids[positions < 0])
+        raise KeyError(f"ID INIES introuvable(s) : {inconnus}")
+
+    selection = df.iloc[positions]
+    valeurs = impacts.calculer(ids)
+
+    resultat = pd.DataFrame({
+        COLONNE_ID: ids,
+        'Nom du produit': selection['Nom du produit'].to_numpy(),
+        'Type de Déclaration': selection['Type de Déclaration'].to_numpy(),
+        'Durée de Vie (ans)': valeurs['Durée de Vie (ans)'].to_numpy(),
+        'Impact CO₂ (kg)': valeurs['Impact CO₂ (kg)'].to_numpy(),
+        'D-Bénéfices': valeurs['D-Bénéfices'].to_numpy(),
+        'Impact total normalisé': valeurs['Impact normalisé'].to_numpy()
+    })
+
+    # ✅ Classement : rang 1 = impact normalisé le plus faible
+    resultat['Rang'] = resultat['Impact total normalisé'].rank(method='min').astype(int)
+    return resultat.sort_values(['Rang', COLONNE_ID], kind='stable').reset_index(drop=True)
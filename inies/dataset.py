@@ -0,0 +1,138 @@
+import functools
+import os
+import weakref
+import pandas as pd
+from inies.parsing import nombre_fr, duree_vie, rapport_analyse
+from inies.units import COLONNE_QUANTITE, COLONNE_UNITE, unites_fonctionnelles
+
+# ✅ Emplacements de la base INIES
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+FICHIER_BASE = os.path.join(BASE_DIR, "base_inies_complete.xlsx")
+URL_BASE = 'https://raw.githubusercontent.com/CJ-AEG/aeginies/main/base_inies_complete.xlsx'
+# ✅ Dossier de cache surchargeable (INIES_CACHE) : banc de démarrage à froid, conteneurs en lecture seule
+DOSSIER_CACHE = os.environ.get("INIES_CACHE") or os.path.join(BASE_DIR, ".cache")
+
+# ✅ Schéma de la base INIES
+COLONNE_ID = 'ID INIES'
+COLONNES_TEXTE = ['Nom du produit']
+COLONNES_CATEGORIELLES = ['Type de Déclaration', 'Unité Fonctionnelle', 'Durée de Vie']
+COLONNES_IMPACT = ['Impact CO₂ (kg)', 'D-Bénéfices']
+COLONNE_DUREE = 'Durée de Vie (ans)'
+
+# ✅ À incrémenter à chaque changement de la représentation compacte (invalide le cache Parquet)
+VERSION_SCHEMA = 4
+
+
+# ✅ Chaînes stockées en Arrow si pyarrow est disponible
+def type_chaine():
+    try:
+        import pyarrow  # noqa: F401
+        return pd.StringDtype("pyarrow")
+    except ImportError:
+        return pd.StringDtype("python")
+
+
+# ✅ Lecture brute du classeur Excel (fichier local, chemin ou flux)
+def lire_classeur(source=FICHIER_BASE):
+    df = pd.read_excel(source, sheet_name="Sheet1", engine='openpyxl')
+    df.columns = df.columns.str.strip()
+    return df
+
+
+# ✅ Représentation compacte de la base : catégories, float32, IDs entiers, chaînes Arrow
+def compacter(df):
+    df = df.copy()
+
+    if COLONNE_ID in df.columns:
+        ids = pd.to_numeric(df[COLONNE_ID], errors='coerce')
+        if ids.notna().all():
+            df[COLONNE_ID] = pd.to_numeric(ids.astype('int64'), downcast='integer')
+        else:
+            df[COLONNE_ID] = ids.astype('Int32')
+
+    for col in COLONNES_TEXTE:
+        if col in df.columns:
+            df[col] = df[col].astype(type_chaine())
+
+    for col in COLONNES_CATEGORIELLES:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    # ✅ Nombres au format français, marqueurs "N/A" / "-" -> NaN
+    for col in COLONNES_IMPACT:
+        if col in df.columns:
+            df[col] = nombre_fr(df[col]).astype('float32')
+
+    # ✅ Durée de vie typée (la colonne texte d'origine est conservée pour l'affichage)
+    if 'Durée de Vie' in df.columns:
+        df[COLONNE_DUREE] = duree_vie(df['Durée de Vie']).astype('float32')
+
+    # ✅ Unité fonctionnelle canonique et quantité, calculées une fois ici (classement à unité égale)
+    if {'Durée de Vie', 'Unité Fonctionnelle'} <= set(df.columns):
+        unites = unites_fonctionnelles(df)
+        df[COLONNE_UNITE] = unites[COLONNE_UNITE]
+        df[COLONNE_QUANTITE] = unites[COLONNE_QUANTITE]
+
+    return df
+
+
+# ✅ Base compacte mise en cache au format Parquet (reconstruite si le classeur est plus récent)
+def charger_base(source=FICHIER_BASE, dossier_cache=DOSSIER_CACHE):
+    nom = os.path.splitext(os.path.basename(source))[0]
+    cache = os.path.join(dossier_cache, f"{nom}.v{VERSION_SCHEMA}.parquet")
+
+    if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(source):
+        return pd.read_parquet(cache)
+
+    df = compacter(lire_classeur(source))
+    os.makedirs(dossier_cache, exist_ok=True)
+    # ✅ Écriture atomique : un lecteur concurrent ne voit jamais un fichier partiel
+    temporaire = f"{cache}.{os.getpid()}.tmp"
+    df.to_parquet(temporaire, index=False)
+    os.replace(temporaire, cache)
+    return df
+
+
+# ✅ Structure dérivée d'une base (index...) construite une fois par base chargée :
+# ✅ même objet DataFrame entre deux reruns, mémo vérifié par référence faible
+def memoiser_par_base(conserves=4):
+    def decorateur(construire):
+        memo = {}
+
+        @functools.wraps(construire)
+        def obtenir(df):
+            cle = id(df)
+            if cle in memo:
+                reference, valeur = memo[cle]
+                if reference() is df:
+                    return valeur
+
+            valeur = construire(df)
+            memo[cle] = (weakref.ref(df), valeur)
+            while len(memo) > conserves:
+                del memo[next(iter(memo))]
+            return valeur
+
+        obtenir.vider = memo.clear
+        return obtenir
+    return decorateur
+
+
+# ✅ Empreinte mémoire avant / après compaction, colonne par colonne
+def rapport_memoire(avant, apres):
+    rapport = pd.DataFrame({
+        'Type avant': avant.dtypes.astype(str),
+        'Avant (Ko)': avant.memory_usage(deep=True, index=False) / 1024,
+        'Type après': apres.dtypes.astype(str),
+        'Après (Ko)': apres.memory_usage(deep=True, index=False) / 1024,
+    }).reindex(apres.columns)
+    rapport.loc['Total'] = ['', rapport['Avant (Ko)'].sum(), '', rapport['Après (Ko)'].sum()]
+    rapport['Gain (x)'] = (rapport['Avant (Ko)'] / rapport['Après (Ko)']).round(1)
+    return rapport.round({'Avant (Ko)': 1, 'Après (Ko)': 1})
+
+
+if __name__ == "__main__":
+    brut = pd.read_excel(FICHIER_BASE, sheet_name="Sheet1", engine='openpyxl', dtype=object)
+    print(rapport_memoire(brut, compacter(brut)).to_string())
+    print()
+    print(rapport_analyse(brut, COLONNES_IMPACT, 'Durée de Vie').to_string(index=False))
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+from inies.dataset import COLONNE_DUREE, memoiser_par_base
+from inies.units import unite_canonique
+
+# ✅ Facettes de la recherche : type de déclaration, tranche de durée de vie, famille d'unité fonctionnelle
+FACETTE_TYPE = 'Type de Déclaration'
+FACETTE_DUREE = 'Durée de vie'
+FACETTE_UNITE = "Famille d'unité"
+TRANCHES_DUREE = [0, 10, 20, 30, 50, np.inf]
+LIBELLES_DUREE = ['≤ 10 ans', '11 à 20 ans', '21 à 30 ans', '31 à 50 ans', '> 50 ans']
+DUREE_INCONNUE = 'Non renseignée'
+COLONNES_TEXTE = ['Nom du produit', 'Unité Fonctionnelle']
+INDEX_CONSERVES = 4
+
+
+def tranches_duree(durees):
+    tranches = pd.cut(pd.Series(durees, dtype='float64'), TRANCHES_DUREE, labels=LIBELLES_DUREE)
+    return tranches.cat.add_categories([DUREE_INCONNUE]).fillna(DUREE_INCONNUE)
+
+
+# ✅ Valeur de chaque facette par ligne (catégories)
+def valeurs_facettes(df):
+    facettes = {}
+    if FACETTE_TYPE in df.columns:
+        facettes[FACETTE_TYPE] = df[FACETTE_TYPE].astype('category')
+    if COLONNE_DUREE in df.columns:
+        facettes[FACETTE_DUREE] = tranches_duree(df[COLONNE_DUREE].to_numpy())
+    if {'Durée de Vie', 'Unité Fonctionnelle'} <= set(df.columns):
+        facettes[FACETTE_UNITE] = unite_canonique(df)
+    return facettes
+
+
+# ✅ Index de recherche d'une base : un bitmap (bits compactés) par valeur de facette,
+# ✅ et des listes de positions par mot (nom du produit + unité fonctionnelle)
+class IndexRecherche:
+    def __init__(self, df):
+        self.lignes = len(df)
+        self.codes = {}
+        self.valeurs = {}
+        self.bitmaps = {}
+        for facette, valeurs in valeurs_facettes(df).items():
+            categories = pd.Categorical(valeurs)
+            self.codes[facette] = categories.codes
+            self.valeurs[facette] = list(categories.categories)
+            self.bitmaps[facette] = {
+                valeur: np.packbits(categories.codes == code)
+                for code, valeur in enumerate(categories.categories)
+            }
+
+        # ✅ Les termes recherchés ne contiennent pas d'espace : une occurrence tient toujours dans un seul mot
+        textes = pd.Series('', index=range(self.lignes), dtype='object')
+        for col in COLONNES_TEXTE:
+            if col in df.columns:
+                textes = textes + ' ' + df[col].astype('object').fillna('').astype(str).str.lower().to_numpy()
+        mots = textes.str.split().explode().dropna()
+        mots = mots[~pd.MultiIndex.from_arrays([mots.index, mots.to_numpy()]).duplicated()]
+        codes, vocabulaire = pd.factorize(mots.to_numpy())
+        self.vocabulaire = pd.Series(vocabulaire, dtype='string')
+        self.mots = codes.astype('int32')
+        self.positions_mots = mots.index.to_numpy(dtype='int32')
+
+    def _vide(self):
+        return np.zeros((self.lignes + 7) // 8, dtype='uint8')
+
+    def _tout(self):
+        return np.packbits(np.ones(self.lignes, dtype=bool))
+
+    # ✅ Facette : OU des valeurs retenues ; None = pas de filtre
+    def bitmap_facette(self, facette, valeurs):
+        if valeurs is None or facette not in self.bitmaps:
+            return self._tout()
+        bits = self._vide()
+        for valeur in valeurs:
+            if valeur in self.bitmaps[facette]:
+                bits |= self.bitmaps[facette][valeur]
+        return bits
+
+    # ✅ Terme : OU des listes de positions des mots qui le contiennent (recherche dans le seul vocabulaire)
+    def bitmap_terme(self, terme):
+        trouves = self.vocabulaire.str.contains(terme.lower(), regex=False).to_numpy(dtype=bool)
+        masque = np.zeros(self.lignes, dtype=bool)
+        masque[self.positions_mots[trouves[self.mots]]] = True
+        return np.packbits(masque)
+
+    # ✅ Facettes et termes combinés par ET bit à bit
+    def bitmap(self, terme="", selections=None):
+        bits = self._tout()
+        for facette, valeurs in (selections or {}).items():
+            bits &= self.bitmap_facette(facette, valeurs)
+        for t in (terme or "").split():
+            if not bits.any():
+                break
+            bits &= self.bitmap_terme(t)
+        return bits
+
+    # ✅ Effectifs par valeur de chaque facette pour la recherche courante (bincount sur les codes) ;
+    # ✅ une facette est comptée sous les filtres des autres, pas sous le sien (valeurs encore sélectionnables)
+    def comptes(self, terme="", selections=None):
+        selections = selections or {}
+        bits_termes = self.bitmap(terme)
+        filtres = {facette: self.bitmap_facette(facette, valeurs) for facette, valeurs in selections.items()}
+        resultat = {}
+        for facette, codes in self.codes.items():
+            bits = bits_termes.copy()
+            for autre, filtre in filtres.items():
+                if autre != facette:
+                    bits &= filtre
+            retenus = np.unpackbits(bits, count=self.lignes).astype(bool)
+            effectifs = np.bincount(codes[retenus] + 1, minlength=len(self.valeurs[facette]) + 1)[1:]
+            resultat[facette] = pd.Series(effectifs, index=self.valeurs[facette], name=facette)
+        return resultat
+
+    def masque(self, terme="", selections=None):
+        return np.unpackbits(self.bitmap(terme, selections), count=self.lignes).astype(bool)
+
+    def positions(self, terme="", selections=None):
+        return np.flatnonzero(self.masque(terme, selections))
+
+
+# ✅ Index construit une fois par base chargée (même objet DataFrame entre deux reruns)
+@memoiser_par_base(INDEX_CONSERVES)
+def index_recherche(df):
+    return IndexRecherche(df)
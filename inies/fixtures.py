@@ -0,0 +1,208 @@
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+from inies.dataset import BASE_DIR
+from inies.metrics import STATUTS_REUSSIS, MesuresExtraction
+from inies.page_produit import (
+    CHAMPS, XPATH_CONTENU, XPATH_ONGLET_INFORMATIONS, XPATH_ONGLET_UNITE, analyser_page, ligne_en_echec
+)
+
+# ✅ Corpus hors ligne : une page produit INIES rendue par fichier (<ID>.html) + valeurs attendues (attendu.json)
+DOSSIER_FIXTURES = os.path.join(BASE_DIR, "fixtures", "pages_inies")
+FICHIER_ATTENDU = "attendu.json"
+CHEMIN_PRODUIT = re.compile(r"^/consultation/infos-produit/(\d+)/?$")
+
+# ✅ Les trois onglets sont rendus séparément par l'application : on les réunit dans le conteneur
+# ✅ de contenu (les XPath restent valables) et on retire les scripts pour figer la page
+SCRIPT_COMPOSER = """
+const contenu = document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+contenu.innerHTML = arguments[1].join('\\n');
+document.querySelectorAll('script, link[rel="modulepreload"]').forEach(e => e.remove());
+return '<!DOCTYPE html>\\n' + document.documentElement.outerHTML;
+"""
+
+
+def charger_attendu(dossier=DOSSIER_FIXTURES):
+    chemin = os.path.join(dossier, FICHIER_ATTENDU)
+    if not os.path.exists(chemin):
+        return {}
+    with open(chemin, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def pages(dossier=DOSSIER_FIXTURES):
+    if not os.path.isdir(dossier):
+        return []
+    return sorted(
+        (nom[:-5] for nom in os.listdir(dossier) if nom.endswith(".html") and nom[:-5].isdigit()),
+        key=int
+    )
+
+
+def lire_page(id_inies, dossier=DOSSIER_FIXTURES):
+    with open(os.path.join(dossier, f"{id_inies}.html"), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+# ✅ Capture (réseau et Selenium requis) : extraction de référence puis DOM des trois onglets
+def capturer(ids, navigateur, dossier=DOSSIER_FIXTURES, progression=None):
+    from selenium.webdriver.common.by import By
+    from MaJ_works import extraire_produit
+
+    os.makedirs(dossier, exist_ok=True)
+    attendu = charger_attendu(dossier)
+    for numero, id_inies in enumerate(ids, start=1):
+        id_inies = str(id_inies)
+        driver = navigateur.driver
+        champs = extraire_produit(id_inies, driver)
+
+        # ✅ extraire_produit s'arrête sur l'onglet indicateurs (phases optionnelles affichées)
+        onglets = [driver.find_element(By.XPATH, XPATH_CONTENU).get_attribute("innerHTML")]
+        for xpath in (XPATH_ONGLET_UNITE, XPATH_ONGLET_INFORMATIONS):
+            driver.find_element(By.XPATH, xpath).click()
+            time.sleep(1)
+            onglets.insert(0, driver.find_element(By.XPATH, XPATH_CONTENU).get_attribute("innerHTML"))
+        html = driver.execute_script(SCRIPT_COMPOSER, XPATH_CONTENU, onglets)
+
+        with open(os.path.join(dossier, f"{id_inies}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+        attendu[id_inies] = dict(zip(CHAMPS, map(str, champs)))
+        navigateur.page_chargee()
+        if progression is not None:
+            progression(numero, len(ids), f"Produit {id_inies}")
+
+    with open(os.path.join(dossier, FICHIER_ATTENDU), "w", encoding="utf-8") as f:
+        json.dump(attendu, f, indent=4, ensure_ascii=False)
+    return len(ids)
+
+
+# ✅ Serveur HTTP local : /consultation/infos-produit/<ID> -> <ID>.html (même chemin que le site)
+class ServeurFixtures:
+    def __init__(self, dossier=DOSSIER_FIXTURES, port=0):
+        dossier = os.path.abspath(dossier)
+
+        class Gestionnaire(BaseHTTPRequestHandler):
+            def do_GET(self):
+                trouve = CHEMIN_PRODUIT.match(self.path.split("?")[0])
+                chemin = os.path.join(dossier, f"{trouve.group(1)}.html") if trouve else None
+                if chemin is None or not os.path.exists(chemin):
+                    self.send_error(404)
+                    return
+                with open(chemin, "rb") as f:
+                    contenu = f.read()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(contenu)))
+                self.end_headers()
+                self.wfile.write(contenu)
+
+            def log_message(self, *args):
+                pass
+
+        self.serveur = ThreadingHTTPServer(("127.0.0.1", port), Gestionnaire)
+        self._fil = None
+
+    @property
+    def url_produit(self):
+        return f"http://127.0.0.1:{self.serveur.server_port}/consultation/infos-produit/{{}}"
+
+    def __enter__(self):
+        self._fil = threading.Thread(target=self.serveur.serve_forever, daemon=True)
+        self._fil.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.serveur.shutdown()
+        self.serveur.server_close()
+
+
+# ✅ Champs extraits comparés aux valeurs attendues : une ligne par écart
+def ecarts(lignes, attendu):
+    differences = []
+    for ligne in lignes:
+        reference = attendu.get(str(ligne[0]))
+        if reference is None:
+            continue
+        for champ, valeur in zip(CHAMPS, map(str, ligne)):
+            if champ in reference and reference[champ] != valeur:
+                differences.append({"ID INIES": ligne[0], "Champ": champ, "Attendu": reference[champ], "Obtenu": valeur})
+    return pd.DataFrame(differences, columns=["ID INIES", "Champ", "Attendu", "Obtenu"])
+
+
+# ✅ Mesures gardées en mémoire pour le banc d'essai
+class _MesuresMemoire(MesuresExtraction):
+    def __init__(self):
+        super().__init__()
+        self.enregistrements = []
+
+    def ecrire(self, enregistrement):
+        self.enregistrements.append(enregistrement)
+
+
+def _extraction_statique(ids, dossier, mesures, indicateurs):
+    lignes = []
+    for id_inies in ids:
+        mesure = mesures.produit(id_inies)
+        with mesure.etape("lecture"):
+            html = lire_page(id_inies, dossier)
+        try:
+            lignes.append(analyser_page(html, id_inies, indicateurs, mesure))
+            mesure.terminer("partiel" if mesure.enregistrement["echecs"] else "ok")
+        except Exception as e:
+            mesure.terminer("echec")
+            lignes.append(ligne_en_echec(id_inies, e))
+    return lignes
+
+
+def _extraction_selenium(ids, dossier, mesures, indicateurs, navigateur):
+    from MaJ_works import extraire_produit
+    from inies.browser import GestionnaireNavigateur, extraire_avec_reprise
+
+    with ServeurFixtures(dossier) as serveur, (navigateur or GestionnaireNavigateur()) as navigateur:
+        return extraire_avec_reprise(
+            ids,
+            lambda id_inies, driver, mesure: extraire_produit(id_inies, driver, indicateurs, mesure, serveur.url_produit),
+            navigateur,
+            ligne_en_echec,
+            mesures=mesures
+        )
+
+
+# ✅ Banc d'essai sur le corpus : analyse statique (lxml) et, en option, Selenium servi en local
+def comparer_extractions(dossier=DOSSIER_FIXTURES, selenium=False, navigateur=None):
+    ids = pages(dossier)
+    if not ids:
+        raise ValueError(f"Aucune page dans le corpus {dossier} (python -m inies capture <ID>...)")
+    attendu = charger_attendu(dossier)
+
+    methodes = [("Statique (lxml)", lambda m, ind: _extraction_statique(ids, dossier, m, ind))]
+    if selenium:
+        methodes.append(("Selenium", lambda m, ind: _extraction_selenium(ids, dossier, m, ind, navigateur)))
+
+    resultats, differences = [], []
+    for nom, extraire in methodes:
+        mesures, indicateurs = _MesuresMemoire(), []
+        debut = time.perf_counter()
+        lignes = extraire(mesures, indicateurs)
+        duree = time.perf_counter() - debut
+
+        produits = pd.DataFrame(mesures.enregistrements)
+        reussis = produits.loc[produits["statut"].isin(STATUTS_REUSSIS), "duree"] * 1000
+        ecart = ecarts(lignes, attendu)
+        resultats.append({
+            "Méthode": nom,
+            "Pages": len(lignes),
+            "Durée (s)": round(duree, 3),
+            "Pages/s": round(len(lignes) / duree, 1) if duree > 0 else float("nan"),
+            "p50 (ms)": round(reussis.quantile(0.5), 2),
+            "p95 (ms)": round(reussis.quantile(0.95), 2),
+            "Échecs": int(len(lignes) - len(reussis)),
+            "Indicateurs": len(indicateurs),
+            "Écarts": len(ecart),
+        })
+        differences.append(ecart.assign(Méthode=nom))
+    return pd.DataFrame(resultats), pd.concat(differences, ignore_index=True)
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from inies.dataset import COLONNE_DUREE, COLONNE_ID, memoiser_par_base
+from inies.parsing import duree_vie, nombre_fr
+from inies.snapshots import version_contenu
+from inies.units import COLONNE_QUANTITE, unites_fonctionnelles
+
+# ✅ Durée de vie de référence pour la normalisation (ans)
+DUREE_REFERENCE = 50
+IMPACTS_CONSERVES = 2
+
+
+# ✅ Durée de vie en années de chaque produit, valeur de référence si absente ou illisible
+def durees_ans(df, defaut=DUREE_REFERENCE):
+    if COLONNE_DUREE in df.columns:
+        durees = df[COLONNE_DUREE].astype('float64')
+    else:
+        durees = duree_vie(df['Durée de Vie'])
+    return durees.fillna(defaut)
+
+
+# ✅ Impact normalisé sur la durée de référence : (CO₂ + D) * 50 / durée de vie
+# ✅ (durée nulle, négative ou absente -> durée de référence, jamais de division par zéro)
+def impact_normalise(impact_co2, d_benefices, duree_vie):
+    # ✅ Valeur absente -> 0 ; valeur infinie conservée (score NaN, produit non classé) plutôt que ramenée au plus grand float
+    impact_co2 = np.nan_to_num(np.asarray(impact_co2, dtype='float64'), posinf=np.inf, neginf=-np.inf)
+    d_benefices = np.nan_to_num(np.asarray(d_benefices, dtype='float64'), posinf=np.inf, neginf=-np.inf)
+    duree_vie = np.asarray(duree_vie, dtype='float64')
+    duree_vie = np.where(duree_vie > 0, duree_vie, DUREE_REFERENCE)
+    return (impact_co2 + d_benefices) * (DUREE_REFERENCE / duree_vie)
+
+
+# ✅ Impacts d'une base par ID INIES (pour une quantité d'UF) : CO₂, D, durée de vie et impact normalisé
+# ✅ calculés une fois ; alignés sur les lignes de la base, avec une valeur NaN finale pour les ID inconnus ;
+# ✅ par_unite : impact normalisé ramené à une unité d'UF (1 m², 1 kg...), base du classement et des substitutions
+class ImpactsBase:
+    def __init__(self, df, version=None):
+        self.version = version
+        ids = pd.to_numeric(df[COLONNE_ID], errors='coerce').reset_index(drop=True)
+        # ✅ ID en double ou illisible : seule la première ligne est adressable par ID
+        adressables = ids.notna() & ~ids.duplicated()
+        self.index = pd.Index(ids[adressables].astype('int64'))
+        self.lignes = np.flatnonzero(adressables.to_numpy())
+        self.complet = bool(adressables.all())
+
+        self.impact_co2 = nombre_fr(df['Impact CO₂ (kg)']).fillna(0).to_numpy(dtype='float64')
+        self.d_benefices = nombre_fr(df['D-Bénéfices']).fillna(0).to_numpy(dtype='float64')
+        self.durees = durees_ans(df).to_numpy(dtype='float64')
+        self.normalises = impact_normalise(self.impact_co2, self.d_benefices, self.durees)
+        self.quantites_uf = unites_fonctionnelles(df)[COLONNE_QUANTITE].to_numpy(dtype='float64')
+        self.par_unite = self.normalises / self.quantites_uf
+
+    # ✅ Ligne de la base de chaque ID (ID en texte ou entier), -1 si inconnu
+    def positions(self, ids):
+        ids = pd.to_numeric(pd.Series(np.asarray(ids, dtype=object)), errors='coerce')
+        connus = ids.notna().to_numpy()
+        positions = np.full(len(ids), -1, dtype='int64')
+        trouves = self.index.get_indexer(ids[connus].astype('int64'))
+        positions[connus] = np.where(trouves >= 0, self.lignes[trouves], -1)
+        return positions
+
+    # ✅ Impact normalisé x quantité d'une liste quelconque de produits, en un seul appel (NaN si inconnu)
+    def calculer(self, ids, quantites=1.0):
+        positions = self.positions(ids)
+        connus = positions >= 0
+
+        def prendre(valeurs):
+            return np.append(valeurs, np.nan)[positions]
+
+        return pd.DataFrame({
+            COLONNE_ID: np.asarray(ids, dtype=object),
+            'Impact CO₂ (kg)': prendre(self.impact_co2),
+            'D-Bénéfices': prendre(self.d_benefices),
+            COLONNE_DUREE: prendre(self.durees),
+            'Impact normalisé': prendre(self.normalises) * np.asarray(quantites, dtype='float64'),
+            'Produit trouvé': connus,
+        })
+
+
+_IMPACTS = {}
+
+
+# ✅ Table des impacts d'une base, partagée par version de contenu (mémo par objet DataFrame entre deux reruns)
+@memoiser_par_base()
+def impacts_base(df):
+    version = version_contenu(df)
+    if version not in _IMPACTS:
+        _IMPACTS[version] = ImpactsBase(df, version)
+        while len(_IMPACTS) > IMPACTS_CONSERVES:
+            del _IMPACTS[next(iter(_IMPACTS))]
+    return _IMPACTS[version]
+
+
+def impacts_normalises(df, ids, quantites=1.0):
+    return impacts_base(df).calculer(ids, quantites)
@@ -0,0 +1,151 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+from inies.dataset import BASE_DIR, COLONNE_ID
+from inies.parsing import nombre_fr
+
+# ✅ Stockage long format : une ligne par (produit, indicateur, module)
+FICHIER_INDICATEURS = os.path.join(BASE_DIR, "base_inies_indicateurs.parquet")
+COLONNES = [COLONNE_ID, 'Ligne', 'Indicateur', 'Unité', 'Module', 'Valeur']
+CLE = [COLONNE_ID, 'Indicateur', 'Module']
+
+MODULE_TOTAL = 'Total cycle de vie'
+ORDRE_MODULES = ['A1-A3', 'A1', 'A2', 'A3', 'A4', 'A5'] + [f"B{i}" for i in range(1, 8)] + \
+    ['C1', 'C2', 'C3', 'C4', 'D', MODULE_TOTAL]
+MOTIF_MODULE = re.compile(r"^\s*(A1\s*-\s*A3|A[1-5]|B[1-7]|C[1-4]|D)(?![\w])")
+
+
+# ✅ En-tête du tableau INIES -> code de module ("D-Bénéfices et charges ..." -> "D")
+def normaliser_module(entete):
+    entete = (entete or "").strip()
+    trouve = MOTIF_MODULE.match(entete)
+    if trouve:
+        return re.sub(r"\s+", "", trouve.group(1))
+    return entete
+
+
+# ✅ Tableau INIES (en-têtes + cellules texte) -> enregistrements (une valeur par indicateur et module)
+def enregistrements_tableau(id_inies, entetes, lignes):
+    entetes = [(e or "").strip() for e in entetes]
+    col_unite = next((i for i, e in enumerate(entetes) if e.lower().startswith('unité')), None)
+    enregistrements = []
+    for numero, cellules in enumerate(lignes, start=1):
+        if not cellules or not (cellules[0] or "").strip():
+            continue
+        for i, entete in enumerate(entetes):
+            if i == 0 or i == col_unite or i >= len(cellules) or not entete:
+                continue
+            enregistrements.append({
+                COLONNE_ID: id_inies,
+                'Ligne': numero,
+                'Indicateur': cellules[0].strip(),
+                'Unité': cellules[col_unite].strip() if col_unite is not None and col_unite < len(cellules) else None,
+                'Module': entete,
+                'Valeur': cellules[i]
+            })
+    return enregistrements
+
+
+# ✅ Enregistrements bruts du scraper -> tableau long typé
+def tableau_indicateurs(enregistrements):
+    tableau = pd.DataFrame(list(enregistrements), columns=COLONNES)
+    tableau[COLONNE_ID] = pd.to_numeric(tableau[COLONNE_ID], errors='coerce').astype('Int32')
+    tableau['Ligne'] = pd.to_numeric(tableau['Ligne'], errors='coerce').fillna(0).astype('int16')
+    tableau['Module'] = tableau['Module'].map(normaliser_module)
+    tableau['Valeur'] = nombre_fr(tableau['Valeur']).astype('float32')
+    for col in ['Indicateur', 'Unité', 'Module']:
+        tableau[col] = tableau[col].astype('category')
+    return tableau.dropna(subset=[COLONNE_ID])
+
+
+# ✅ ID INIES déjà présents dans le stock (en texte, comme les ID de la mise à jour) ; vide si le stock n'existe pas
+def ids_indicateurs(chemin=FICHIER_INDICATEURS):
+    if not os.path.exists(chemin):
+        return set()
+    ids = pd.read_parquet(chemin, columns=[COLONNE_ID])[COLONNE_ID].dropna().astype('int64')
+    return set(ids.astype(str))
+
+
+# ✅ Ajout au stock Parquet : la dernière valeur extraite remplace l'ancienne
+def enregistrer_indicateurs(enregistrements, chemin=FICHIER_INDICATEURS):
+    nouveau = tableau_indicateurs(enregistrements)
+    if os.path.exists(chemin):
+        ancien = pd.read_parquet(chemin)
+        nouveau = pd.concat([ancien.astype({c: 'object' for c in ['Indicateur', 'Unité', 'Module']}),
+                             nouveau.astype({c: 'object' for c in ['Indicateur', 'Unité', 'Module']})],
+                            ignore_index=True)
+        nouveau = nouveau.drop_duplicates(subset=CLE, keep='last')
+        for col in ['Indicateur', 'Unité', 'Module']:
+            nouveau[col] = nouveau[col].astype('category')
+
+    temporaire = f"{chemin}.{os.getpid()}.tmp"
+    nouveau.to_parquet(temporaire, index=False)
+    os.replace(temporaire, chemin)
+    return nouveau
+
+
+# ✅ Cube produit × indicateur × module (float32, NaN si absent) pour des requêtes vectorisées
+class StockIndicateurs:
+    def __init__(self, tableau):
+        ids = tableau[COLONNE_ID].to_numpy(dtype='int64')
+        self.ids = pd.Index(np.unique(ids))
+        # ✅ Indicateurs dans l'ordre des lignes du tableau INIES, modules dans l'ordre du cycle de vie
+        noms_indicateurs = tableau['Indicateur'].astype('object')
+        ordre_indicateurs = tableau.assign(Indicateur=noms_indicateurs).groupby('Indicateur')['Ligne'].min().sort_values(kind='stable')
+        noms_modules = tableau['Module'].astype('object')
+        ordre_modules = sorted(
+            pd.unique(noms_modules),
+            key=lambda m: (ORDRE_MODULES.index(m) if m in ORDRE_MODULES else len(ORDRE_MODULES), m)
+        )
+        indicateurs = pd.Categorical(noms_indicateurs, categories=ordre_indicateurs.index)
+        modules = pd.Categorical(noms_modules, categories=ordre_modules)
+        self.indicateurs = pd.Index(indicateurs.categories)
+        self.modules = pd.Index(modules.categories)
+        unites = tableau.drop_duplicates('Indicateur').set_index('Indicateur')['Unité']
+        self.unites = unites.reindex(self.indicateurs.astype('object'))
+
+        self.cube = np.full((len(self.ids), len(self.indicateurs), len(self.modules)), np.nan, dtype='float32')
+        self.cube[self.ids.get_indexer(ids), indicateurs.codes, modules.codes] = tableau['Valeur'].to_numpy(dtype='float32')
+
+    @classmethod
+    def charger(cls, chemin=FICHIER_INDICATEURS):
+        return cls(pd.read_parquet(chemin))
+
+    def _positions(self, ids):
+        if ids is None:
+            return np.arange(len(self.ids))
+        positions = self.ids.get_indexer(np.asarray(list(ids), dtype='int64'))
+        return positions[positions >= 0]
+
+    # ✅ Par défaut : le premier indicateur du tableau INIES (réchauffement climatique)
+    def _indicateur(self, indicateur):
+        return 0 if indicateur is None else self.indicateurs.get_loc(indicateur)
+
+    # ✅ Valeurs d'un indicateur pour tous les modules (produits en lignes)
+    def matrice(self, indicateur=None, ids=None):
+        positions = self._positions(ids)
+        return pd.DataFrame(
+            self.cube[positions, self._indicateur(indicateur), :],
+            index=pd.Index(self.ids[positions], name=COLONNE_ID),
+            columns=self.modules
+        )
+
+    # ✅ Valeur d'un indicateur pour un module donné
+    def valeurs(self, module, indicateur=None, ids=None):
+        positions = self._positions(ids)
+        return pd.Series(
+            self.cube[positions, self._indicateur(indicateur), self.modules.get_loc(module)],
+            index=pd.Index(self.ids[positions], name=COLONNE_ID),
+            name=module
+        )
+
+    # ✅ Part d'un module dans le total cycle de vie (ex. A1-A3 des isolants)
+    def part_module(self, module, indicateur=None, ids=None, total=MODULE_TOTAL):
+        positions = self._positions(ids)
+        i = self._indicateur(indicateur)
+        valeurs = self.cube[positions, i, self.modules.get_loc(module)]
+        totaux = self.cube[positions, i, self.modules.get_loc(total)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            parts = np.where(totaux != 0, valeurs / totaux, np.nan)
+        return pd.Series(parts, index=pd.Index(self.ids[positions], name=COLONNE_ID), name=f"Part {module}")
@@ -0,0 +1,144 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from inies.dataset import DOSSIER_CACHE
+
+# ✅ Mesures de la mise à jour INIES : une ligne JSON par tentative d'extraction d'un produit
+DOSSIER_METRIQUES = os.path.join(DOSSIER_CACHE, "metriques")
+CENTILES = (50, 95)
+# ✅ ok : tous les champs lus ; partiel : page chargée, champs manquants ; reessai / echec : exception
+STATUTS_REUSSIS = ("ok", "partiel")
+
+
+def fichier_mesures(dossier=DOSSIER_METRIQUES):
+    os.makedirs(dossier, exist_ok=True)
+    return os.path.join(dossier, f"extraction-{time.strftime('%Y%m%d-%H%M%S')}.jsonl")
+
+
+def _classe(erreur):
+    return type(erreur).__name__ if isinstance(erreur, BaseException) else str(erreur)
+
+
+def _message(erreur):
+    return str(erreur).strip().split("\n")[0][:200] if isinstance(erreur, BaseException) else ""
+
+
+# ✅ Chronométrage d'un produit : durée par étape, champs manquants et cause d'échec
+class MesureProduit:
+    def __init__(self, journal, id_inies, tentative=1, session=None):
+        self.journal = journal
+        self.enregistrement = {
+            "id": str(id_inies), "tentative": tentative, "session": session,
+            "debut": time.time(), "etapes": {}, "echecs": []
+        }
+        self._debut = time.perf_counter()
+
+    @contextmanager
+    def etape(self, nom):
+        debut = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.echec(nom, e)
+            raise
+        finally:
+            etapes = self.enregistrement["etapes"]
+            etapes[nom] = etapes.get(nom, 0.0) + time.perf_counter() - debut
+
+    def echec(self, etape, erreur):
+        self.enregistrement["echecs"].append({"etape": etape, "classe": _classe(erreur), "message": _message(erreur)})
+
+    def terminer(self, statut):
+        self.enregistrement.update(statut=statut, duree=time.perf_counter() - self._debut)
+        if self.journal is not None:
+            self.journal.ecrire(self.enregistrement)
+        return self.enregistrement
+
+
+# ✅ Journal JSONL (sans chemin : mesures prises mais non écrites)
+class MesuresExtraction:
+    def __init__(self, chemin=None):
+        self.chemin = chemin
+        self._fichier = open(chemin, "a", encoding="utf-8") if chemin else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def produit(self, id_inies, tentative=1, session=None):
+        return MesureProduit(self, id_inies, tentative, session)
+
+    def ecrire(self, enregistrement):
+        if self._fichier is not None:
+            self._fichier.write(json.dumps(enregistrement, ensure_ascii=False) + "\n")
+            self._fichier.flush()
+
+    def fermer(self):
+        if self._fichier is not None:
+            self._fichier.close()
+            self._fichier = None
+
+
+def lire_mesures(chemin):
+    with open(chemin, "r", encoding="utf-8") as f:
+        return [json.loads(ligne) for ligne in f if ligne.strip()]
+
+
+def _centiles(valeurs, nom):
+    valeurs = np.asarray(valeurs, dtype='float64')
+    ligne = {"Étape": nom, "Mesures": len(valeurs)}
+    for c in CENTILES:
+        ligne[f"p{c} (s)"] = np.percentile(valeurs, c) if len(valeurs) else np.nan
+    ligne["Moyenne (s)"] = valeurs.mean() if len(valeurs) else np.nan
+    return ligne
+
+
+# ✅ Synthèse : latences p50/p95 (produit et étapes), classes d'échec, tentatives et débit
+def rapport_mesures(enregistrements):
+    mesures = pd.DataFrame(enregistrements)
+    if mesures.empty:
+        return {}
+
+    reussies = mesures[mesures["statut"].isin(STATUTS_REUSSIS)]
+    etapes = pd.DataFrame(list(mesures["etapes"]))
+    latences = [_centiles(reussies["duree"], "Produit (réussi)")]
+    latences += [_centiles(etapes[col].dropna(), col) for col in etapes.columns]
+
+    echecs = mesures[["id", "statut", "echecs"]].explode("echecs").dropna(subset=["echecs"])
+    if echecs.empty:
+        classes = pd.DataFrame(columns=["Étape", "Classe", "Occurrences", "Produits"])
+    else:
+        details = pd.DataFrame(list(echecs["echecs"]), index=echecs.index)
+        echecs = pd.concat([echecs[["id"]], details], axis=1)
+        classes = (
+            echecs.groupby(["etape", "classe"])
+            .agg(Occurrences=("id", "size"), Produits=("id", "nunique"))
+            .reset_index()
+            .rename(columns={"etape": "Étape", "classe": "Classe"})
+            .sort_values("Occurrences", ascending=False, ignore_index=True)
+        )
+
+    par_produit = mesures.sort_values("debut").groupby("id").agg(
+        Tentatives=("tentative", "max"), Statut=("statut", "last")
+    )
+    tentatives = par_produit.groupby(["Tentatives", "Statut"]).size().rename("Produits").reset_index()
+
+    duree_totale = (mesures["debut"] + mesures["duree"]).max() - mesures["debut"].min()
+    synthese = {
+        "Produits": len(par_produit),
+        "Réussis": int(par_produit["Statut"].isin(STATUTS_REUSSIS).sum()),
+        "Tentatives": len(mesures),
+        "Sessions navigateur": int(mesures["session"].nunique()),
+        "Débit (produits/min)": round(60 * len(par_produit) / duree_totale, 2) if duree_totale > 0 else np.nan,
+    }
+    return {
+        "synthese": synthese,
+        "latences": pd.DataFrame(latences).round(3),
+        "echecs": classes,
+        "tentatives": tentatives,
+    }
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from inies.solutions import lignes_solutions
+
+
+# ✅ Optimisation des solutions : pour chaque ligne, le substitut de même unité fonctionnelle
+# qui minimise l'impact normalisé total, sous contrainte de type de déclaration.
+# La quantité de la ligne (nombre d'UF du produit actuel) est ramenée en unités (m², kg...) :
+# chaque candidat est évalué sur son impact par unité, pour la même quantité physique.
+# L'objectif étant une somme de termes indépendants par ligne, le choix ligne par ligne est optimal ;
+# une limite de substitutions par solution revient à garder les plus grands gains (toujours exact).
+def optimiser_solutions(solutions, index_substituts, types=None, max_substitutions=None, similarite_min=0.0):
+    ix = index_substituts
+    lignes = lignes_solutions(solutions)
+    ids = lignes['ID INIES'].fillna(-1).to_numpy(dtype='int64')
+    quantites = lignes['Quantité'].to_numpy(dtype='float64')
+    positions = ix.positions.get_indexer(ids)
+    connues = positions >= 0
+    surs = np.maximum(positions, 0)
+
+    # ✅ Candidats : le produit actuel (colonne 0) puis ses voisins précalculés
+    candidats = np.concatenate([positions[:, None], np.where(connues[:, None], ix.voisins[surs], -1)], axis=1)
+    similarites = np.concatenate([np.ones((len(lignes), 1), dtype='float32'), ix.similarites[surs]], axis=1)
+    valides = (candidats >= 0) & (similarites > similarite_min)
+    valides[:, 0] = connues
+    if types is not None:
+        valides &= np.isin(ix.types[np.maximum(candidats, 0)], list(types))
+
+    unites = np.where(connues, quantites * ix.quantites_uf[surs], np.nan)
+    impacts = np.where(valides, ix.par_unite[np.maximum(candidats, 0)] * unites[:, None], np.inf)
+    choix = np.argmin(impacts, axis=1)
+    impact_initial = np.where(connues, ix.normalise[surs] * quantites, lignes['Impact enregistré'].to_numpy())
+    impact_optimise = impacts[np.arange(len(lignes)), choix]
+
+    # ✅ Aucun candidat admissible : la ligne est conservée telle quelle
+    sans_candidat = ~np.isfinite(impact_optimise)
+    choix[sans_candidat] = 0
+    impact_optimise[sans_candidat] = impact_initial[sans_candidat]
+    gain = impact_initial - impact_optimise
+
+    # ✅ Limite de substitutions par solution : seuls les plus grands gains sont appliqués
+    if max_substitutions is not None:
+        rang = (
+            pd.Series(np.where(choix > 0, gain, -np.inf))
+            .groupby(lignes['Solution'].to_numpy(), sort=False)
+            .rank(method='first', ascending=False)
+            .to_numpy()
+        )
+        refuses = (choix > 0) & (rang > max_substitutions)
+        choix[refuses] = 0
+        impact_optimise[refuses] = impact_initial[refuses]
+        gain[refuses] = 0.0
+
+    choisis = candidats[np.arange(len(lignes)), choix]
+    substitue = choix > 0
+    lignes['Impact initial'] = np.round(impact_initial, 2)
+    lignes['ID optimisé'] = pd.Series(np.where(substitue, ix.ids[np.maximum(choisis, 0)], ids), dtype='Int64').where(connues)
+    lignes['Nom optimisé'] = np.where(substitue, ix.noms[np.maximum(choisis, 0)], lignes['Nom du produit'].to_numpy())
+    lignes['Quantité optimisée'] = np.where(substitue, unites / ix.quantites_uf[np.maximum(choisis, 0)], quantites)
+    lignes['Impact optimisé'] = np.round(impact_optimise, 2)
+    lignes['Substitué'] = substitue
+    lignes['Type non conforme'] = connues & ~valides[:, 0] & ~substitue
+    return lignes
+
+
+# ✅ Totaux par solution avant / après optimisation
+def totaux_optimises(lignes):
+    totaux = lignes.groupby(['Solution', 'Catégorie'], sort=False, as_index=False).agg(**{
+        'Impact initial': ('Impact initial', 'sum'),
+        'Impact optimisé': ('Impact optimisé', 'sum'),
+        'Substitutions': ('Substitué', 'sum'),
+    })
+    totaux['Gain (%)'] = np.where(
+        totaux['Impact initial'] != 0,
+        (1 - totaux['Impact optimisé'] / totaux['Impact initial']) * 100,
+        0.0
+    ).round(1)
+    return totaux
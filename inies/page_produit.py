@@ -0,0 +1,122 @@
+import re
+from inies.indicators import enregistrements_tableau
+from inies.metrics import MesureProduit
+
+# ✅ Page produit INIES : XPath communs au scraper Selenium (MaJ_works) et à l'analyse statique (lxml)
+URL_PRODUIT = "https://base-inies.fr/consultation/infos-produit/{}"
+XPATH_ESPACE = '//*[@id="workSpace"]'
+XPATH_ONGLETS = '//*[@id="workSpace"]/div/infos-produit/div/div[2]'
+XPATH_ONGLET_INFORMATIONS = XPATH_ONGLETS + '/button[1]'
+XPATH_ONGLET_UNITE = XPATH_ONGLETS + '/button[2]'
+XPATH_ONGLET_INDICATEURS = XPATH_ONGLETS + '/button[3]'
+XPATH_PHASES = '//*[contains(text(), "Afficher les phases optionnelles")]'
+XPATH_CONTENU = '//*[@id="workSpace"]/div/infos-produit/div/div[3]'
+XPATH_INFORMATIONS = XPATH_CONTENU + '/informations-generales-read-only'
+XPATH_NOM = XPATH_INFORMATIONS + '/div/div[1]/div[2]/span[1]'
+XPATH_UNITE = XPATH_CONTENU + '/unite-fonctionnelle-read-only/div/div[1]/div[2]/span'
+XPATH_DUREE = XPATH_CONTENU + '/unite-fonctionnelle-read-only/div/div[3]/div[2]/span'
+XPATH_TABLEAU = XPATH_CONTENU + '/indicateurs-read-only//table'
+XPATH_ENTETES = XPATH_TABLEAU + '/thead/tr/th'
+XPATH_LIGNES = XPATH_TABLEAU + '/tbody/tr'
+
+COLONNE_TOTAL = "Total cycle de vie"
+COLONNE_D = "D-Bénéfices et charges au-delà des frontières du système"
+CHAMPS = ["ID INIES", "Nom du produit", "Type de Déclaration", "Unité Fonctionnelle", "Durée de Vie", "Impact CO₂ (kg)", "D-Bénéfices"]
+
+
+def xpath_cellule(colonne, ligne=1):
+    return f'{XPATH_TABLEAU}/tbody/tr[{ligne}]/td[{colonne}]/span'
+
+
+def classer_declaration(text):
+    text = text.lower()
+    if "déclaration individuelle" in text:
+        return "Individuelle"
+    elif "déclaration collective" in text:
+        return "Collective"
+    elif "donnée générique" in text:
+        return "DED"
+    elif "donnée conventionnelle pour la re2020" in text:
+        return "RE2020"
+    elif "donnée conventionnelle issue du référenciel" in text:
+        return "EC"
+    else:
+        return "N/A"
+
+
+def ligne_en_echec(id_inies, erreur):
+    return [id_inies, f"Erreur: {str(erreur)}", "N/A", "N/A", "N/A", "N/A", "N/A"]
+
+
+# ✅ Texte d'un nœud lxml au plus près de WebElement.text (espaces regroupés)
+def _texte(noeud):
+    return re.sub(r"\s+", " ", noeud.text_content()).strip()
+
+
+def _element(arbre, xpath):
+    noeuds = arbre.xpath(xpath)
+    if not noeuds:
+        raise LookupError(f"Élément introuvable : {xpath}")
+    return noeuds[0]
+
+
+# ✅ Analyse d'une page déjà rendue (DOM enregistré) : mêmes champs et mêmes valeurs par défaut que extraire_produit
+def analyser_page(html, id_inies, indicateurs=None, mesure=None):
+    from lxml import html as lxml_html
+
+    mesure = mesure or MesureProduit(None, id_inies)
+    with mesure.etape("analyse"):
+        arbre = lxml_html.fromstring(html)
+        if not arbre.xpath(XPATH_ESPACE):
+            raise LookupError("Page produit sans espace de travail (workSpace)")
+
+    with mesure.etape("informations"):
+        product_name = "Nom introuvable"
+        try:
+            product_name = _texte(_element(arbre, XPATH_NOM))
+        except Exception as e:
+            mesure.echec("nom", e)
+
+        declaration_type = "N/A"
+        try:
+            declaration_type = classer_declaration(_texte(_element(arbre, XPATH_INFORMATIONS)))
+        except Exception as e:
+            mesure.echec("type_declaration", e)
+
+    with mesure.etape("unite"):
+        unite_fonctionnelle = "N/A"
+        try:
+            unite_fonctionnelle = _texte(_element(arbre, XPATH_UNITE))
+        except Exception as e:
+            mesure.echec("unite_fonctionnelle", e)
+
+        duree_vie = "N/A"
+        try:
+            duree_vie = _texte(_element(arbre, XPATH_DUREE))
+        except Exception as e:
+            mesure.echec("duree_vie", e)
+
+    with mesure.etape("tableau"):
+        impact_co2 = "N/A"
+        d_benefices = 0
+        entetes = [_texte(th) for th in arbre.xpath(XPATH_ENTETES)]
+        columns = {entete: idx + 1 for idx, entete in enumerate(entetes)}
+        try:
+            if COLONNE_TOTAL in columns:
+                impact_co2 = _texte(_element(arbre, xpath_cellule(columns[COLONNE_TOTAL])))
+            else:
+                mesure.echec("impact_co2", "ColonneAbsente")
+
+            if COLONNE_D in columns:
+                d_benefices_text = _texte(_element(arbre, xpath_cellule(columns[COLONNE_D])))
+                if d_benefices_text and d_benefices_text != "-":
+                    d_benefices = d_benefices_text
+        except Exception as e:
+            mesure.echec("tableau", e)
+
+    if indicateurs is not None:
+        with mesure.etape("indicateurs"):
+            lignes = [[_texte(td) for td in tr.xpath('./td')] for tr in arbre.xpath(XPATH_LIGNES)]
+            indicateurs.extend(enregistrements_tableau(id_inies, entetes, lignes))
+
+    return [id_inies, product_name, declaration_type, unite_fonctionnelle, duree_vie, impact_co2, d_benefices]
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+# ✅ Marqueurs de valeur absente (pas une erreur d'analyse)
+MARQUEURS_VIDES = ['', '-', '–', '—', 'n/a', 'na', 'nan', 'none', 'nd', 'n.d.']
+
+MOTIF_DUREE = r"^(?P<valeur>[-+]?\d[\d\s  ]*(?:[.,]\d+)?)\s*ans?\b"
+
+
+# ✅ Applique une analyse vectorisée aux seules valeurs distinctes, puis diffuse le résultat
+def _par_valeurs_distinctes(valeurs, analyse):
+    valeurs = pd.Series(valeurs)
+    codes, distinctes = pd.factorize(valeurs.astype('object'), use_na_sentinel=True)
+    nombres, illisibles = analyse(pd.Series(distinctes, dtype='object'))
+    nombres = np.append(nombres.to_numpy(dtype='float64'), np.nan)
+    illisibles = np.append(illisibles.to_numpy(dtype=bool), False)
+    return (
+        pd.Series(nombres[codes], index=valeurs.index),
+        pd.Series(illisibles[codes], index=valeurs.index)
+    )
+
+
+def _analyser_nombres(valeurs, decimale):
+    texte = valeurs.astype('string').str.strip()
+    vides = texte.isna() | texte.str.lower().isin(MARQUEURS_VIDES)
+
+    # ✅ Signe moins typographique, séparateurs de milliers (espaces, espaces insécables, apostrophes)
+    texte = texte.str.replace('−', '-', regex=False)
+    texte = texte.str.replace(r"[\s  ']", '', regex=True)
+
+    # ✅ Séparateur décimal : le dernier séparateur rencontré ; à défaut, celui de la locale
+    derniere_virgule = texte.str.rfind(',')
+    dernier_point = texte.str.rfind('.')
+    seul = (derniere_virgule >= 0) ^ (dernier_point >= 0)
+    virgule_decimale = (derniere_virgule > dernier_point) & (~seul | (decimale == ','))
+    texte = texte.mask(
+        virgule_decimale,
+        texte.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    )
+    texte = texte.mask(~virgule_decimale, texte.str.replace(',', '', regex=False))
+
+    nombres = pd.to_numeric(texte.mask(vides), errors='coerce').astype('float64')
+    return nombres, (nombres.isna() & ~vides).fillna(False).astype(bool)
+
+
+def _analyser_durees(valeurs):
+    texte = valeurs.astype('string').str.strip()
+    vides = texte.isna() | texte.str.lower().isin(MARQUEURS_VIDES)
+    extraites = texte.str.extract(MOTIF_DUREE, expand=False)
+    nombres, illisibles = _analyser_nombres(extraites.astype('object'), ',')
+    return nombres, ((nombres.isna() | illisibles) & ~vides).fillna(False).astype(bool)
+
+
+# ✅ Nombres au format français ("1 234,5", "3,14e-1", "−2,1") ou anglais ("1,234.5"), "-" / "N/A" -> NaN
+def analyser_nombres(valeurs, decimale=','):
+    valeurs = pd.Series(valeurs)
+    if pd.api.types.is_numeric_dtype(valeurs) and not pd.api.types.is_bool_dtype(valeurs):
+        return valeurs.astype('float64'), pd.Series(False, index=valeurs.index)
+    return _par_valeurs_distinctes(valeurs, lambda v: _analyser_nombres(v, decimale))
+
+
+def nombre_fr(valeurs, decimale=','):
+    return analyser_nombres(valeurs, decimale)[0]
+
+
+# ✅ Durée de vie en années ("30 ans", "1 an", "12,5 ans") ; toute autre valeur -> NaN
+def analyser_durees(valeurs):
+    valeurs = pd.Series(valeurs)
+    if pd.api.types.is_numeric_dtype(valeurs) and not pd.api.types.is_bool_dtype(valeurs):
+        return valeurs.astype('float64'), pd.Series(False, index=valeurs.index)
+    return _par_valeurs_distinctes(valeurs, _analyser_durees)
+
+
+def duree_vie(valeurs):
+    return analyser_durees(valeurs)[0]
+
+
+# ✅ Valeurs non reconnues par colonne, avec leur nombre d'occurrences
+def rapport_analyse(df, colonnes_nombres, colonne_duree=None):
+    morceaux = []
+    analyses = [(col, analyser_nombres) for col in colonnes_nombres if col in df.columns]
+    if colonne_duree in df.columns:
+        analyses.append((colonne_duree, analyser_durees))
+    for col, analyse in analyses:
+        illisibles = analyse(df[col])[1].to_numpy()
+        if illisibles.any():
+            comptes = df.loc[illisibles, col].astype('string').value_counts()
+            morceaux.append(pd.DataFrame({'Colonne': col, 'Valeur': comptes.index, 'Lignes': comptes.to_numpy()}))
+    if not morceaux:
+        return pd.DataFrame(columns=['Colonne', 'Valeur', 'Lignes'])
+    return pd.concat(morceaux, ignore_index=True)
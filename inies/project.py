@@ -0,0 +1,105 @@
+import json
+from pathlib import Path
+import pandas as pd
+from inies.solutions import evaluer_solutions
+
+COLONNES_PROJET = ['Solution', 'Catégorie', 'Quantité', 'Impact unitaire', 'Impact']
+
+
+# ✅ Projets (projets_db.json) : {nom: {"nom": ..., "lignes": [{"solution": ..., "quantité": ...}]}}
+def charger_projets(chemin):
+    chemin = Path(chemin)
+    if chemin.exists():
+        with open(chemin, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def enregistrer_projets(projets, chemin):
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump(projets, f, indent=4, ensure_ascii=False)
+
+
+# ✅ Calcul d'un projet : impact unitaire par solution x quantité, cumuls tenus à jour par différence
+class CalculProjet:
+    def __init__(self, solutions, df):
+        self.df = df
+        self.unitaires = {}
+        self.categories = {}
+        self.lignes = {}
+        self.par_categorie = {}
+        self.total = 0.0
+
+        lignes = evaluer_solutions(solutions, df)
+        totaux = lignes.groupby('Solution', sort=False)['Impact normalisé'].sum()
+        for nom, contenu in solutions.items():
+            self.unitaires[nom] = float(totaux.get(nom, 0.0))
+            self.categories[nom] = contenu.get('categorie', 'Non spécifiée')
+
+    @classmethod
+    def depuis_projet(cls, projet, solutions, df):
+        calcul = cls(solutions, df)
+        for cle, ligne in enumerate(projet.get('lignes', [])):
+            calcul.definir_ligne(cle, ligne['solution'], ligne.get('quantité', 0))
+        return calcul
+
+    def _ajouter(self, solution, impact):
+        categorie = self.categories.get(solution, 'Non spécifiée')
+        self.par_categorie[categorie] = self.par_categorie.get(categorie, 0.0) + impact
+        self.total += impact
+
+    def impact_ligne(self, cle):
+        solution, quantite = self.lignes[cle]
+        return self.unitaires.get(solution, 0.0) * quantite
+
+    # ✅ Ajout ou modification d'une ligne : seuls les cumuls concernés sont corrigés
+    def definir_ligne(self, cle, solution, quantite):
+        if cle in self.lignes:
+            self._ajouter(self.lignes[cle][0], -self.impact_ligne(cle))
+        self.lignes[cle] = (solution, float(quantite or 0))
+        self._ajouter(solution, self.impact_ligne(cle))
+
+    def retirer_ligne(self, cle):
+        if cle not in self.lignes:
+            return
+        solution = self.lignes[cle][0]
+        self._ajouter(solution, -self.impact_ligne(cle))
+        del self.lignes[cle]
+
+    # ✅ Solution modifiée : réévaluée seule, l'écart est reporté sur les lignes qui l'utilisent
+    def actualiser_solution(self, nom, contenu):
+        cles = [cle for cle, (solution, _) in self.lignes.items() if solution == nom]
+        for cle in cles:
+            self._ajouter(nom, -self.impact_ligne(cle))
+
+        if contenu is None:
+            self.unitaires.pop(nom, None)
+        else:
+            lignes = evaluer_solutions({nom: contenu}, self.df)
+            self.unitaires[nom] = float(lignes['Impact normalisé'].sum())
+            self.categories[nom] = contenu.get('categorie', 'Non spécifiée')
+
+        for cle in cles:
+            self._ajouter(nom, self.impact_ligne(cle))
+
+    def tableau(self):
+        lignes = [
+            (solution, self.categories.get(solution, 'Non spécifiée'), quantite,
+             self.unitaires.get(solution, 0.0), self.impact_ligne(cle))
+            for cle, (solution, quantite) in self.lignes.items()
+        ]
+        return pd.DataFrame(lignes, columns=COLONNES_PROJET)
+
+    def recapitulatif(self):
+        recap = pd.DataFrame(
+            [(categorie, impact) for categorie, impact in self.par_categorie.items() if abs(impact) > 1e-9],
+            columns=['Catégorie', 'Impact']
+        ).sort_values('Impact', ascending=False, ignore_index=True)
+        recap['Part (%)'] = (100 * recap['Impact'] / self.total).round(1) if self.total else 0.0
+        return recap
+
+    def projet(self, nom):
+        return {
+            "nom": nom,
+            "lignes": [{"solution": solution, "quantité": quantite} for solution, quantite in self.lignes.values()]
+        }
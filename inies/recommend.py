@@ -0,0 +1,115 @@
+import re
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from inies.dataset import COLONNE_ID, memoiser_par_base
+from inies.impact import impacts_base
+from inies.units import unite_canonique
+
+# ✅ Nombre de voisins précalculés par produit
+NB_VOISINS = 30
+
+MOTIF_MOT = re.compile(r"[a-zà-ÿ0-9]{2,}")
+
+
+# ✅ Vecteurs TF-IDF (normalisés L2) des noms de produits, sans dépendance externe
+def tfidf_noms(noms):
+    vocabulaire = {}
+    lignes, colonnes = [], []
+    for i, nom in enumerate(pd.Series(noms).fillna('').astype(str).str.lower()):
+        for mot in set(MOTIF_MOT.findall(nom)):
+            lignes.append(i)
+            colonnes.append(vocabulaire.setdefault(mot, len(vocabulaire)))
+
+    n = len(noms)
+    tf = sparse.csr_matrix(
+        (np.ones(len(lignes), dtype='float32'), (lignes, colonnes)),
+        shape=(n, len(vocabulaire))
+    )
+    df_mots = np.bincount(colonnes, minlength=len(vocabulaire))
+    idf = np.log((1 + n) / (1 + df_mots)).astype('float32') + 1
+    tfidf = tf @ sparse.diags(idf)
+    normes = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+    normes[normes == 0] = 1
+    return sparse.diags(1 / normes) @ tfidf
+
+
+# ✅ Index précalculé des substituts : voisins par similarité de nom, au sein d'une même unité canonique ;
+# ✅ comparés sur l'impact par unité d'UF (comme le classement de la recherche), pas sur l'impact de l'UF déclarée
+class IndexSubstituts:
+    def __init__(self, df, nb_voisins=NB_VOISINS):
+        self.ids = df[COLONNE_ID].to_numpy(dtype='int64')
+        self.positions = pd.Index(self.ids)
+        self.noms = df['Nom du produit'].to_numpy(dtype=object)
+        self.types = df['Type de Déclaration'].to_numpy(dtype=object)
+        self.unites = unite_canonique(df)
+        impacts = impacts_base(df)
+        self.normalise = impacts.normalises
+        self.quantites_uf = impacts.quantites_uf
+        self.par_unite = impacts.par_unite
+
+        # ✅ Voisins triés par similarité décroissante (-1 si absent)
+        self.voisins = np.full((len(df), nb_voisins), -1, dtype='int64')
+        self.similarites = np.zeros((len(df), nb_voisins), dtype='float32')
+
+        vecteurs = tfidf_noms(self.noms)
+        codes = self.unites.cat.codes.to_numpy()
+        for code in np.unique(codes):
+            membres = np.flatnonzero(codes == code)
+            bloc = vecteurs[membres]
+            sim = (bloc @ bloc.T).toarray()
+            np.fill_diagonal(sim, -1)
+            k = min(nb_voisins, len(membres) - 1)
+            if k <= 0:
+                continue
+            meilleurs = np.argpartition(-sim, k - 1, axis=1)[:, :k]
+            sim_meilleurs = np.take_along_axis(sim, meilleurs, axis=1)
+            ordre = np.argsort(-sim_meilleurs, axis=1, kind='stable')
+            self.voisins[membres, :k] = membres[np.take_along_axis(meilleurs, ordre, axis=1)]
+            self.similarites[membres, :k] = np.take_along_axis(sim_meilleurs, ordre, axis=1)
+
+    # ✅ k substituts comparables pour une liste d'ID INIES, en une passe vectorisée
+    def recommander_lot(self, ids_inies, k=5, plus_bas=True, types=None):
+        ids_inies = np.asarray(list(ids_inies), dtype='int64')
+        positions = self.positions.get_indexer(ids_inies)
+        if (positions < 0).any():
+            inconnus = ', '.join(str(i) for i in ids_inies[positions < 0])
+            raise KeyError(f"ID INIES introuvable(s) : {inconnus}")
+
+        candidats = self.voisins[positions]
+        similarites = self.similarites[positions]
+        surs = np.maximum(candidats, 0)
+        garder = (candidats >= 0) & (similarites > 0)
+        if plus_bas:
+            garder &= self.par_unite[surs] < self.par_unite[positions][:, None]
+        if types is not None:
+            garder &= np.isin(self.types[surs], list(types))
+        # ✅ Les k plus proches voisins retenus par ligne
+        garder &= np.cumsum(garder, axis=1) <= k
+
+        lignes, rangs = np.nonzero(garder)
+        choisis = candidats[lignes, rangs]
+        resultat = pd.DataFrame({
+            'ID source': ids_inies[lignes],
+            COLONNE_ID: self.ids[choisis],
+            'Nom du produit': self.noms[choisis],
+            'Type de Déclaration': self.types[choisis],
+            'Unité': np.asarray(self.unites)[choisis],
+            'Similarité': similarites[lignes, rangs],
+            'Impact normalisé': self.normalise[choisis],
+            'Impact par unité': self.par_unite[choisis],
+            'Gain par unité': self.par_unite[positions[lignes]] - self.par_unite[choisis],
+        })
+        resultat['_ordre'] = lignes
+        resultat = resultat.sort_values(['_ordre', 'Impact par unité'], kind='stable')
+        return resultat.drop(columns='_ordre').reset_index(drop=True)
+
+    # ✅ k substituts comparables d'un produit, classés par impact par unité croissant
+    def recommander(self, id_inies, k=5, plus_bas=True, types=None):
+        return self.recommander_lot([id_inies], k, plus_bas, types).drop(columns='ID source')
+
+
+# ✅ Index des substituts construit une fois par base chargée (suit la version courante de la base partagée)
+@memoiser_par_base(2)
+def index_substituts(df):
+    return IndexSubstituts(df)
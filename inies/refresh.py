@@ -0,0 +1,176 @@
+import glob
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from inies.dataset import BASE_DIR, DOSSIER_CACHE
+
+# ✅ File de tâches en fichiers : partagée par tous les processus Streamlit et le travailleur
+DOSSIER_TACHES = os.path.join(DOSSIER_CACHE, "taches")
+FICHIER_TRAVAILLEUR = "travailleur.json"
+STATUTS_ACTIFS = ("en_attente", "en_cours")
+BATTEMENT_MAX = 60
+ATTENTE = 2
+
+
+def _chemin(dossier, id_tache):
+    return os.path.join(dossier, f"{id_tache}.json")
+
+
+def _ecrire(chemin, contenu):
+    # ✅ Fichier temporaire propre au fil : le battement et la progression peuvent écrire en même temps
+    temporaire = f"{chemin}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(temporaire, "w", encoding="utf-8") as f:
+        json.dump(contenu, f, ensure_ascii=False)
+    os.replace(temporaire, chemin)
+
+
+def _lire(chemin):
+    try:
+        with open(chemin, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def taches(dossier=DOSSIER_TACHES):
+    chemins = glob.glob(os.path.join(dossier, "*.json"))
+    liste = [_lire(c) for c in chemins if os.path.basename(c) != FICHIER_TRAVAILLEUR]
+    return sorted((t for t in liste if t), key=lambda t: t["creee"])
+
+
+def etat(id_tache, dossier=DOSSIER_TACHES):
+    return _lire(_chemin(dossier, id_tache))
+
+
+def derniere_tache(nature="maj", dossier=DOSSIER_TACHES):
+    liste = [t for t in taches(dossier) if t["nature"] == nature]
+    return liste[-1] if liste else None
+
+
+# ✅ Une seule tâche active par nature : un second clic renvoie la tâche déjà en file
+def soumettre(nature="maj", dossier=DOSSIER_TACHES):
+    os.makedirs(dossier, exist_ok=True)
+    for tache in taches(dossier):
+        if tache["nature"] == nature and tache["statut"] in STATUTS_ACTIFS:
+            return tache
+
+    tache = {
+        "id": f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}",
+        "nature": nature,
+        "statut": "en_attente",
+        "creee": time.time(),
+        "fait": 0,
+        "total": 0,
+        "message": "En attente du travailleur",
+    }
+    _ecrire(_chemin(dossier, tache["id"]), tache)
+    return tache
+
+
+def _mettre_a_jour(tache, dossier, **champs):
+    tache.update(champs, maj=time.time())
+    _ecrire(_chemin(dossier, tache["id"]), tache)
+
+
+def _battement(dossier):
+    _ecrire(os.path.join(dossier, FICHIER_TRAVAILLEUR), {"pid": os.getpid(), "battement": time.time()})
+
+
+# ✅ Battement régulier dans un fil dédié : une étape longue sans progression ne fait pas passer le travailleur pour arrêté
+def _battre(dossier, arret):
+    while not arret.wait(BATTEMENT_MAX / 4):
+        _battement(dossier)
+
+
+def _processus_vivant(pid):
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# ✅ Actif : battement récent d'un processus toujours en vie (pid 0 : travailleur en cours de lancement)
+def travailleur_actif(dossier=DOSSIER_TACHES):
+    travailleur = _lire(os.path.join(dossier, FICHIER_TRAVAILLEUR))
+    if travailleur is None or time.time() - travailleur["battement"] >= BATTEMENT_MAX:
+        return False
+    return not travailleur["pid"] or _processus_vivant(travailleur["pid"])
+
+
+# ✅ Mise à jour INIES : scraping, instantané puis bascule atomique du cache partagé (MaJ_works)
+def _tache_maj(progression):
+    from MaJ_works import update_inies_data
+    ajouts = update_inies_data(progression=progression)
+    if ajouts is None:
+        raise RuntimeError("aucun ID INIES récupéré depuis l'API")
+    return f"Base mise à jour ({ajouts} nouveaux produits)"
+
+
+TRAITEMENTS = {"maj": _tache_maj}
+
+
+def executer(tache, dossier=DOSSIER_TACHES):
+    _mettre_a_jour(tache, dossier, statut="en_cours", debut=time.time(), message="Démarrage")
+
+    def progression(fait, total, message=""):
+        _mettre_a_jour(tache, dossier, fait=fait, total=total, message=message)
+        _battement(dossier)
+
+    arret = threading.Event()
+    threading.Thread(target=_battre, args=(dossier, arret), daemon=True).start()
+    try:
+        message = TRAITEMENTS[tache["nature"]](progression)
+    except Exception as e:
+        _mettre_a_jour(tache, dossier, statut="echec", fin=time.time(), message=f"{type(e).__name__} : {e}")
+    else:
+        _mettre_a_jour(tache, dossier, statut="terminee", fin=time.time(), message=message or "Terminée")
+    finally:
+        arret.set()
+    return tache
+
+
+# ✅ Boucle du travailleur : tâches en attente exécutées une par une, dans l'ordre de soumission
+def travailler(dossier=DOSSIER_TACHES, une_fois=False):
+    os.makedirs(dossier, exist_ok=True)
+    # ✅ Un autre travailleur bat encore : il garde la file (et sa tâche en cours)
+    travailleur = _lire(os.path.join(dossier, FICHIER_TRAVAILLEUR))
+    if travailleur and travailleur["pid"] not in (0, os.getpid()) and travailleur_actif(dossier):
+        return 0
+    # ✅ Tâche restée "en cours" : le travailleur précédent s'est arrêté en route
+    for tache in taches(dossier):
+        if tache["statut"] == "en_cours":
+            _mettre_a_jour(tache, dossier, statut="echec", fin=time.time(), message="Travailleur interrompu")
+    executees = 0
+    while True:
+        _battement(dossier)
+        en_attente = [t for t in taches(dossier) if t["statut"] == "en_attente"]
+        for tache in en_attente:
+            executer(tache, dossier)
+            executees += 1
+        if une_fois:
+            return executees
+        time.sleep(ATTENTE)
+
+
+# ✅ Lancement du travailleur dans un processus détaché (aucun lien avec la session Streamlit)
+def demarrer_travailleur(dossier=DOSSIER_TACHES):
+    if travailleur_actif(dossier):
+        return None
+    os.makedirs(dossier, exist_ok=True)
+    _ecrire(os.path.join(dossier, FICHIER_TRAVAILLEUR), {"pid": 0, "battement": time.time()})
+    journal = open(os.path.join(dossier, "travailleur.log"), "a", encoding="utf-8")
+    options = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP} if os.name == "nt" else {"start_new_session": True}
+    processus = subprocess.Popen(
+        [sys.executable, "-m", "inies", "travailleur", "--dossier", dossier],
+        cwd=BASE_DIR, stdout=journal, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, **options
+    )
+    return processus.pid
@@ -0,0 +1,20 @@
+import base64
+import functools
+import os
+from inies.dataset import BASE_DIR
+
+# ✅ Ressources communes aux pages (logo, feuille de style), lues et encodées une fois par processus
+FICHIER_LOGO = os.path.join(BASE_DIR, "logo_aeg.jpg")
+FICHIER_STYLES = os.path.join(BASE_DIR, "styles.css")
+
+
+@functools.lru_cache(maxsize=None)
+def logo_base64(chemin=FICHIER_LOGO):
+    with open(chemin, "rb") as img_file:
+        return base64.b64encode(img_file.read()).decode()
+
+
+@functools.lru_cache(maxsize=None)
+def feuille_styles(chemin=FICHIER_STYLES):
+    with open(chemin, encoding="utf-8") as f:
+        return f.read()
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+from inies.parsing import nombre_fr
+from inies.dataset import COLONNE_DUREE, COLONNE_ID
+from inies.impact import durees_ans, impact_normalise
+from inies.units import COLONNE_QUANTITE, COLONNE_UNITE, unites_fonctionnelles
+
+CATEGORIES = ['Bas carbone', 'Intermédiaire', 'Haut carbone']
+# ✅ Impact non fini (valeur illisible) : sans Z-Score, hors des trois catégories
+NON_CLASSE = 'Non classé'
+
+# ✅ Méthodes de score : toutes ramenées à une échelle "écart-type" (seuils ±1 communs)
+MODES_SCORE = {
+    'zscore': "Moyenne / écart-type",
+    'mediane': "Médiane / MAD (robuste aux valeurs aberrantes)",
+    'centile': "Rangs centiles",
+}
+FACTEUR_MAD = 1.4826
+FACTEUR_ECART_MOYEN = 1.2533
+
+
+# ✅ Classes centiles : tous les 5 %, plus les seuils des catégories (±1 <-> 16e / 84e centiles)
+GRILLE_CENTILES = np.union1d(np.linspace(0, 1, 21), [0.15865525393145707, 0.8413447460685429])
+
+
+# ✅ Rangs centiles par classes : seuils lus par sélection partielle (np.nanquantile -> np.partition), sans tri complet,
+# ✅ centile interpolé entre seuils puis converti en score normal équivalent ;
+# ✅ valeurs égales -> centile médian de leur palier (comme des rangs moyens)
+def _scores_centiles(x):
+    from scipy.special import ndtri
+    n = np.count_nonzero(~np.isnan(x))
+    if n == 0:
+        return np.full_like(x, np.nan)
+    # ✅ Positions de Hazen ((i - 0.5) / n) : mêmes centiles qu'avec les rangs aux points de l'échantillon
+    centiles = np.unique(np.clip(GRILLE_CENTILES, 0.5 / n, 1 - 0.5 / n))
+    seuils = np.nanquantile(x, centiles, method='hazen')
+    if seuils[0] == seuils[-1]:
+        return np.where(np.isnan(x), np.nan, 0.0)
+    rangs = (np.interp(x, seuils, centiles) + np.interp(-x, -seuils[::-1], centiles[::-1])) / 2
+    return ndtri(rangs)
+
+
+# ✅ Score de chaque valeur selon le mode choisi ; dispersion nulle -> score 0 (catégorie Intermédiaire) ;
+# ✅ statistiques calculées sur les seules valeurs finies, score NaN pour les autres (comme en mode centile)
+def scores(valeurs, mode='zscore'):
+    x = np.asarray(valeurs, dtype='float64')
+    if mode not in MODES_SCORE:
+        raise ValueError(f"Mode de score inconnu : {mode} ({', '.join(MODES_SCORE)})")
+    if len(x) == 0:
+        return x
+    x = np.where(np.isfinite(x), x, np.nan)
+    finies = x[~np.isnan(x)]
+    if len(finies) == 0:
+        return x
+
+    if mode == 'centile':
+        return _scores_centiles(x)
+
+    if mode == 'zscore':
+        centre = finies.mean()
+        echelle = finies.std(ddof=1) if len(finies) > 1 else 0.0
+    else:
+        # ✅ Médiane et MAD par sélection partielle (np.partition), sans tri complet
+        centre = np.median(finies)
+        ecarts = np.abs(finies - centre)
+        echelle = FACTEUR_MAD * np.median(ecarts)
+        if echelle == 0:
+            echelle = FACTEUR_ECART_MOYEN * ecarts.mean()
+
+    if not np.isfinite(echelle) or echelle == 0:
+        return np.where(np.isnan(x), np.nan, 0.0)
+    return (x - centre) / echelle
+
+
+# ✅ Scores calculés séparément dans chaque groupe (unités fonctionnelles comparables)
+def scores_par_groupe(valeurs, groupes, mode='zscore'):
+    valeurs = np.asarray(valeurs, dtype='float64')
+    codes, _ = pd.factorize(np.asarray(groupes), use_na_sentinel=False)
+    resultat = np.empty_like(valeurs)
+    for code in np.unique(codes):
+        membres = codes == code
+        resultat[membres] = scores(valeurs[membres], mode)
+    return resultat
+
+
+# ✅ Impact normalisé, Z-Score et catégorie carbone d'un jeu de résultats
+# ✅ par_unite : produits classés entre eux par unité canonique, impact ramené à une unité d'UF (1 m², 1 kg, 1 kW...)
+# ✅ impacts : table des impacts de la base d'origine (impacts_base), lue par ID INIES au lieu d'être recalculée
+def scorer(filtered_data, mode='zscore', par_unite=True, impacts=None):
+    filtered_data = filtered_data.copy()
+    if filtered_data.empty:
+        return filtered_data
+
+    # ✅ Unité canonique et quantité (colonnes de la base compacte, sinon déduites du texte avant conversion)
+    unites = unites_fonctionnelles(filtered_data) if par_unite else None
+
+    calcul = None
+    if impacts is not None and impacts.complet and COLONNE_ID in filtered_data.columns:
+        calcul = impacts.calculer(filtered_data[COLONNE_ID].to_numpy())
+    if calcul is not None and calcul['Produit trouvé'].all():
+        filtered_data['Impact CO₂ (kg)'] = calcul['Impact CO₂ (kg)'].to_numpy()
+        filtered_data['D-Bénéfices'] = calcul['D-Bénéfices'].to_numpy()
+        filtered_data['Durée de Vie'] = calcul[COLONNE_DUREE].to_numpy()
+        filtered_data['Impact normalisé'] = calcul['Impact normalisé'].to_numpy()
+    else:
+        # ✅ Conversion explicite en float (marqueurs manquants -> 0, durée de vie -> 50 ans)
+        filtered_data['Impact CO₂ (kg)'] = nombre_fr(filtered_data['Impact CO₂ (kg)']).fillna(0)
+        filtered_data['D-Bénéfices'] = nombre_fr(filtered_data['D-Bénéfices']).fillna(0)
+        filtered_data['Durée de Vie'] = durees_ans(filtered_data)
+        filtered_data['Impact normalisé'] = impact_normalise(
+            filtered_data['Impact CO₂ (kg)'], filtered_data['D-Bénéfices'], filtered_data['Durée de Vie']
+        )
+
+    # ✅ Impact total (CO₂ + D)
+    filtered_data['Impact total'] = filtered_data['Impact CO₂ (kg)'] + filtered_data['D-Bénéfices']
+
+    # ✅ Calcul du Z-Score (moyenne / écart-type, médiane / MAD ou rangs centiles)
+    if par_unite:
+        filtered_data[COLONNE_UNITE] = unites[COLONNE_UNITE]
+        filtered_data['Impact par unité'] = filtered_data['Impact normalisé'] / unites[COLONNE_QUANTITE].astype('float64')
+        filtered_data['Z-Score'] = scores_par_groupe(filtered_data['Impact par unité'], filtered_data[COLONNE_UNITE], mode)
+    else:
+        filtered_data['Z-Score'] = scores(filtered_data['Impact normalisé'], mode)
+
+    # ✅ Catégorisation basée sur le Z-Score
+    filtered_data['Catégorie'] = pd.cut(
+        filtered_data['Z-Score'],
+        bins=[-np.inf, -1, 1, np.inf],
+        labels=CATEGORIES
+    ).astype(object).fillna(NON_CLASSE).astype(str)
+
+    # ✅ Marquer la valeur maximale et minimale (de chaque unité si le classement est par unité) ;
+    # ✅ pas de marque pour un groupe d'un seul produit ou de Z-Scores tous égaux
+    groupes = filtered_data.groupby(COLONNE_UNITE, observed=True)['Z-Score'] if par_unite else [(None, filtered_data['Z-Score'])]
+    for _, z_scores in groupes:
+        if z_scores.count() >= 2 and z_scores.max() > z_scores.min():
+            max_idx = z_scores.idxmax()
+            min_idx = z_scores.idxmin()
+            filtered_data.loc[max_idx, 'Catégorie'] = f"{filtered_data.loc[max_idx, 'Catégorie']} (Valeur maximale)"
+            filtered_data.loc[min_idx, 'Catégorie'] = f"{filtered_data.loc[min_idx, 'Catégorie']} (Valeur minimale)"
+
+    return filtered_data
@@ -0,0 +1,14 @@
+from inies.facets import FACETTE_TYPE, index_recherche
+
+TYPES_DECLARATION = ['Individuelle', 'Collective', 'DED', 'RE2020', 'EC']
+
+
+# ✅ Recherche multi-termes sur "Nom du produit" OU "Unité Fonctionnelle" (tous les termes requis)
+# ✅ Filtres de facettes et termes combinés par ET sur les bitmaps précalculés de la base
+def rechercher(df, terme, types=None, facettes=None):
+    selections = dict(facettes or {})
+    if types is not None:
+        selections[FACETTE_TYPE] = types
+    if not selections and not (terme or "").split():
+        return df
+    return df.iloc[index_recherche(df).positions(terme, selections)]
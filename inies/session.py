@@ -0,0 +1,167 @@
+import sys
+import threading
+import time
+import uuid
+import numpy as np
+import pandas as pd
+from inies.dataset import COLONNE_ID
+
+# ✅ Budget mémoire d'une session Streamlit (objets propres à la session, base partagée exclue)
+BUDGET_SESSION = 20 * 1024 ** 2
+CLE_GESTION = "_gestion_session"
+DUREE_INACTIVITE = 3600
+
+# ✅ Empreinte de chaque session de ce processus : {id: {"empreinte": ..., "cles": ..., "evictions": ..., "maj": ...}}
+_REGISTRE = {}
+_VERROU = threading.Lock()
+
+
+# ✅ Taille approchée d'un objet et de son contenu ; les objets partagés (base INIES...) comptent pour 0
+def taille_objet(objet, partages=frozenset(), vus=None):
+    vus = set() if vus is None else vus
+    if id(objet) in partages or id(objet) in vus:
+        return 0
+    vus.add(id(objet))
+
+    if isinstance(objet, (pd.DataFrame, pd.Series)):
+        return int(objet.memory_usage(deep=True).sum() if isinstance(objet, pd.DataFrame) else objet.memory_usage(deep=True))
+    if isinstance(objet, pd.Index):
+        return int(objet.memory_usage(deep=True))
+    if isinstance(objet, np.ndarray):
+        return int(objet.nbytes)
+
+    taille = sys.getsizeof(objet)
+    if isinstance(objet, dict):
+        taille += sum(taille_objet(k, partages, vus) + taille_objet(v, partages, vus) for k, v in objet.items())
+    elif isinstance(objet, (list, tuple, set, frozenset)):
+        taille += sum(taille_objet(v, partages, vus) for v in objet)
+    elif hasattr(objet, "__dict__") and not isinstance(objet, type):
+        taille += taille_objet(vars(objet), partages, vus)
+    return taille
+
+
+# ✅ État d'une session (st.session_state ou simple dict) : objets gérés datés à chaque accès,
+# ✅ les moins récemment utilisés sont libérés au-delà du budget (jamais ceux utilisés pendant l'exécution en cours)
+class EtatSession:
+    def __init__(self, etat, partages=(), budget=BUDGET_SESSION):
+        self.etat = etat
+        self.partages = frozenset(id(objet) for objet in partages)
+        self.budget = budget
+        self.utilisees = set()
+        if CLE_GESTION not in etat:
+            etat[CLE_GESTION] = {"id": uuid.uuid4().hex[:12], "acces": {}, "evictions": 0}
+        self.gestion = etat[CLE_GESTION]
+
+    @property
+    def id(self):
+        return self.gestion["id"]
+
+    def _toucher(self, cle):
+        self.gestion["acces"][cle] = time.time()
+        self.utilisees.add(cle)
+
+    def obtenir(self, cle, fabrique):
+        if cle not in self.etat:
+            self.etat[cle] = fabrique()
+        self._toucher(cle)
+        return self.etat[cle]
+
+    def definir(self, cle, valeur):
+        self.etat[cle] = valeur
+        self._toucher(cle)
+        return valeur
+
+    def liberer(self, *cles):
+        for cle in cles:
+            if cle in self.etat:
+                del self.etat[cle]
+            self.gestion["acces"].pop(cle, None)
+            self.utilisees.discard(cle)
+
+    def tailles(self):
+        return {
+            cle: taille_objet(valeur, self.partages)
+            for cle, valeur in self.etat.items() if cle != CLE_GESTION
+        }
+
+    def empreinte(self):
+        return sum(self.tailles().values())
+
+    # ✅ Libération LRU des objets gérés jusqu'à repasser sous le budget ; empreinte publiée au registre
+    def appliquer_budget(self):
+        tailles = self.tailles()
+        total = sum(tailles.values())
+        liberees = []
+        candidates = sorted(
+            (cle for cle in self.gestion["acces"] if cle in tailles and cle not in self.utilisees),
+            key=self.gestion["acces"].get
+        )
+        for cle in candidates:
+            if total <= self.budget:
+                break
+            total -= tailles.pop(cle)
+            self.liberer(cle)
+            liberees.append(cle)
+        self.gestion["evictions"] += len(liberees)
+
+        with _VERROU:
+            _REGISTRE[self.id] = {"empreinte": total, "cles": len(tailles), "evictions": self.gestion["evictions"], "maj": time.time()}
+        return liberees
+
+
+# ✅ Empreinte des sessions actives de ce processus (sessions inactives depuis plus d'une heure oubliées)
+def empreintes_sessions(duree_inactivite=DUREE_INACTIVITE):
+    limite = time.time() - duree_inactivite
+    with _VERROU:
+        for id_session in [i for i, e in _REGISTRE.items() if e["maj"] < limite]:
+            del _REGISTRE[id_session]
+        lignes = [
+            (id_session, e["cles"], e["empreinte"] / 1024, e["evictions"], time.strftime("%H:%M:%S", time.localtime(e["maj"])))
+            for id_session, e in _REGISTRE.items()
+        ]
+    return pd.DataFrame(
+        lignes, columns=["Session", "Clés", "Empreinte (Ko)", "Libérations", "Dernière activité"]
+    ).sort_values("Empreinte (Ko)", ascending=False, ignore_index=True)
+
+
+def oublier_session(id_session):
+    with _VERROU:
+        _REGISTRE.pop(id_session, None)
+
+
+# ✅ Brouillon d'édition d'une solution tel que le construit la page Solutions (IDs et quantités seulement)
+def _brouillon(df, generateur, nb_produits):
+    lignes = df.iloc[generateur.integers(0, len(df), nb_produits)]
+    return {
+        "produits": [
+            {"id_inies": str(i), "nom": f"{nom} (ID: {i})", "quantité": 1.0, "impact_normalisé": 0.0, "durée_vie": 50, "d_bénéfices": 0.0}
+            for i, nom in zip(lignes[COLONNE_ID], lignes['Nom du produit'])
+        ],
+        "libre": [False] * nb_produits,
+    }
+
+
+# ✅ Simulation de sessions concurrentes : chacune ouvre des brouillons au fil de ses exécutions,
+# ✅ comparée à l'ancien fonctionnement (copie de la base et brouillons jamais libérés)
+def simuler_sessions(df, nb_sessions=50, executions=30, budget=BUDGET_SESSION, nb_produits=8, graine=0):
+    generateur = np.random.default_rng(graine)
+    taille_base = taille_objet(df)
+    lignes = []
+    for _ in range(nb_sessions):
+        etat = {}
+        sans_budget = 0
+        for execution in range(executions):
+            session = EtatSession(etat, partages=[df], budget=budget)
+            session.definir("edit_solution", f"solution_{execution}")
+            brouillon = session.obtenir(f"brouillon_solution_{execution}", lambda: _brouillon(df, generateur, nb_produits))
+            sans_budget += taille_objet(brouillon)
+            session.appliquer_budget()
+        lignes.append({
+            "Session": session.id,
+            "Clés": len(etat) - 1,
+            "Empreinte (Ko)": session.empreinte() / 1024,
+            "Libérations": session.gestion["evictions"],
+            "Sans gestion (Ko)": (taille_base + sans_budget) / 1024,
+        })
+        oublier_session(session.id)
+    return pd.DataFrame(lignes)
@@ -0,0 +1,161 @@
+import glob
+import json
+import os
+import time
+import multiprocessing as mp
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from inies.dataset import DOSSIER_CACHE, VERSION_SCHEMA, type_chaine
+from inies.snapshots import version_contenu
+
+try:
+    import fcntl
+except ImportError:  # ✅ Windows : pas de verrou inter-processus (poste de développement)
+    fcntl = None
+
+# ✅ Cache partagé entre processus : fichier Arrow projeté en mémoire + pointeur de version
+DOSSIER_PARTAGE = os.path.join(DOSSIER_CACHE, "partage")
+POINTEUR = "courant.json"
+VERSIONS_CONSERVEES = 2
+
+# ✅ Base déjà projetée par ce processus : (version, DataFrame)
+_BASE = {}
+
+
+def _chemin_pointeur(dossier):
+    return os.path.join(dossier, POINTEUR)
+
+
+# ✅ Fichier temporaire complet et synchronisé sur disque avant la bascule : jamais de fichier partiel après un arrêt brutal
+def _ecrire_atomique(chemin, ecrire):
+    temporaire = f"{chemin}.{os.getpid()}.tmp"
+    ecrire(temporaire)
+    os.replace(temporaire, chemin)
+
+
+def _ecrire_json(contenu):
+    def ecrire(temporaire):
+        with open(temporaire, "w", encoding="utf-8") as f:
+            json.dump(contenu, f)
+            f.flush()
+            os.fsync(f.fileno())
+    return ecrire
+
+
+def _ecrire_feather(table):
+    def ecrire(temporaire):
+        feather.write_feather(table, temporaire, compression='uncompressed')
+        with open(temporaire, "r+b") as f:
+            os.fsync(f.fileno())
+    return ecrire
+
+
+# ✅ Chaînes en Arrow : les colonnes texte restent dans le fichier projeté (aucune copie)
+def _types(type_arrow):
+    if pa.types.is_string(type_arrow) or pa.types.is_large_string(type_arrow):
+        return type_chaine()
+    return None
+
+
+def version_publiee(dossier=DOSSIER_PARTAGE):
+    try:
+        with open(_chemin_pointeur(dossier), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+# ✅ Publication d'une nouvelle base : écriture complète, puis bascule atomique du pointeur
+def publier(df, dossier=DOSSIER_PARTAGE):
+    os.makedirs(dossier, exist_ok=True)
+    version = version_contenu(df)
+    fichier = os.path.join(dossier, f"base-{version}-s{VERSION_SCHEMA}.arrow")
+    if not os.path.exists(fichier):
+        table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+        _ecrire_atomique(fichier, _ecrire_feather(table))
+
+    pointeur = {
+        "version": version, "schema": VERSION_SCHEMA, "fichier": os.path.basename(fichier),
+        "date": time.time(), "lignes": len(df)
+    }
+    _ecrire_atomique(_chemin_pointeur(dossier), _ecrire_json(pointeur))
+
+    # ✅ Les anciennes versions restent lisibles par les processus qui les projettent déjà
+    anciennes = sorted(glob.glob(os.path.join(dossier, "base-*.arrow")), key=os.path.getmtime)
+    for ancienne in anciennes[:-VERSIONS_CONSERVEES]:
+        if os.path.basename(ancienne) != pointeur["fichier"]:
+            os.remove(ancienne)
+    return version
+
+
+# ✅ Lecture de la version courante ; re-projection seulement si la version a changé
+# ✅ Version publiée avec une autre représentation compacte (VERSION_SCHEMA) : ignorée, à republier
+def lire(dossier=DOSSIER_PARTAGE):
+    pointeur = version_publiee(dossier)
+    if pointeur is None or pointeur.get("schema") != VERSION_SCHEMA:
+        return None, None
+
+    en_memoire = _BASE.get(dossier)
+    if en_memoire is not None and en_memoire[0] == pointeur["version"]:
+        return en_memoire
+
+    source = pa.memory_map(os.path.join(dossier, pointeur["fichier"]), 'r')
+    table = pa.ipc.open_file(source).read_all()
+    df = table.to_pandas(types_mapper=_types, split_blocks=True)
+    _BASE[dossier] = (pointeur["version"], df)
+    return _BASE[dossier]
+
+
+# ✅ Base partagée : un seul processus construit la première version (verrou), les autres la projettent
+def base_partagee(charger, dossier=DOSSIER_PARTAGE):
+    version, df = lire(dossier)
+    if df is not None:
+        return df
+
+    os.makedirs(dossier, exist_ok=True)
+    with open(os.path.join(dossier, "publication.lock"), "w") as verrou:
+        if fcntl is not None:
+            fcntl.flock(verrou, fcntl.LOCK_EX)
+        try:
+            version, df = lire(dossier)
+            if df is None:
+                df = charger()
+                if df is None or df.empty:
+                    return df
+                publier(df, dossier)
+                version, df = lire(dossier)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(verrou, fcntl.LOCK_UN)
+    return df
+
+
+def _lecteur(dossier, resultats, publie):
+    version, df = lire(dossier)
+    resultats.put((os.getpid(), "avant", version, len(df)))
+    publie.wait(60)
+    version, df = lire(dossier)
+    resultats.put((os.getpid(), "après", version, len(df)))
+
+
+# ✅ Vérification locale : N processus lisent la même version, puis basculent ensemble sur la suivante
+def verifier_processus(df, nb_processus=4, dossier=DOSSIER_PARTAGE):
+    contexte = mp.get_context("spawn")
+    version_1 = publier(df, dossier)
+    resultats, publie = contexte.Queue(), contexte.Event()
+    processus = [contexte.Process(target=_lecteur, args=(dossier, resultats, publie)) for _ in range(nb_processus)]
+    for p in processus:
+        p.start()
+
+    lectures = [resultats.get(timeout=120) for _ in range(nb_processus)]
+    version_2 = publier(df.iloc[:-1], dossier)
+    publie.set()
+    lectures += [resultats.get(timeout=120) for _ in range(nb_processus)]
+    for p in processus:
+        p.join()
+
+    lectures = pd.DataFrame(lectures, columns=['PID', 'Lecture', 'Version', 'Lignes'])
+    attendu = lectures['Lecture'].map({'avant': version_1, 'après': version_2})
+    lectures['Conforme'] = lectures['Version'] == attendu
+    return lectures
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from inies.dataset import BASE_DIR, COLONNE_ID
+from inies.units import COLONNE_QUANTITE, COLONNE_UNITE
+
+# ✅ Stock d'instantanés adressés par contenu (ajout seulement)
+DOSSIER_INSTANTANES = os.path.join(BASE_DIR, "snapshots")
+MANIFESTE = "manifest.jsonl"
+JOURNAL = "changelog.jsonl"
+NATURES = {"ajouts": "ajout", "suppressions": "suppression", "modifications": "modification"}
+# ✅ Colonnes déduites des colonnes texte : exclues des empreintes (versions inchangées si le calcul évolue)
+COLONNES_DEDUITES = [COLONNE_UNITE, COLONNE_QUANTITE]
+
+
+# ✅ Empreinte de chaque ligne (hors ID et colonnes déduites), indépendante du type de stockage des colonnes
+def empreintes_lignes(df):
+    colonnes = sorted(c for c in df.columns if c != COLONNE_ID and c not in COLONNES_DEDUITES)
+    valeurs = df[colonnes].astype('string').fillna('')
+    return pd.util.hash_pandas_object(valeurs, index=False).to_numpy(dtype='uint64')
+
+
+# ✅ IDs triés et empreintes alignées : la base d'une comparaison en temps quasi constant
+def _index_empreintes(df):
+    ids = df[COLONNE_ID].to_numpy(dtype='int64')
+    empreintes = empreintes_lignes(df)
+    ordre = np.argsort(ids, kind='stable')
+    return ids[ordre], empreintes[ordre]
+
+
+def _version(ids, empreintes):
+    return hashlib.sha1(ids.tobytes() + empreintes.tobytes()).hexdigest()[:16]
+
+
+# ✅ Version adressée par contenu d'une base
+def version_contenu(df):
+    return _version(*_index_empreintes(df))
+
+
+def _ajouter_ligne(chemin, enregistrement):
+    with open(chemin, "a", encoding="utf-8") as f:
+        f.write(json.dumps(enregistrement, ensure_ascii=False) + "\n")
+
+
+def _lire_lignes(chemin):
+    if not os.path.exists(chemin):
+        return []
+    with open(chemin, "r", encoding="utf-8") as f:
+        return [json.loads(ligne) for ligne in f if ligne.strip()]
+
+
+class StockInstantanes:
+    def __init__(self, dossier=DOSSIER_INSTANTANES):
+        self.dossier = dossier
+        os.makedirs(dossier, exist_ok=True)
+
+    def _chemin(self, version, suffixe):
+        return os.path.join(self.dossier, f"{version}{suffixe}")
+
+    # ✅ Historique des rafraîchissements (du plus ancien au plus récent)
+    def versions(self):
+        return _lire_lignes(os.path.join(self.dossier, MANIFESTE))
+
+    def derniere_version(self):
+        versions = self.versions()
+        return versions[-1]["version"] if versions else None
+
+    def charger(self, version):
+        return pd.read_parquet(self._chemin(version, ".parquet"))
+
+    def _empreintes(self, version):
+        with np.load(self._chemin(version, ".empreintes.npz")) as fichier:
+            return fichier["ids"], fichier["empreintes"]
+
+    # ✅ Nouvel instantané : un fichier colonnaire par contenu distinct, journal des changements par ID
+    def enregistrer(self, df, source=None):
+        ids, empreintes = _index_empreintes(df)
+        version = _version(ids, empreintes)
+        precedente = self.derniere_version()
+        if version == precedente:
+            return version
+
+        if not os.path.exists(self._chemin(version, ".parquet")):
+            temporaire = self._chemin(version, f".{os.getpid()}.tmp")
+            df.to_parquet(temporaire, index=False)
+            os.replace(temporaire, self._chemin(version, ".parquet"))
+            np.savez(self._chemin(version, ".empreintes.npz"), ids=ids, empreintes=empreintes)
+
+        date = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        if precedente is not None:
+            changements = self.diff(precedente, version)
+            chemin_journal = os.path.join(self.dossier, JOURNAL)
+            with open(chemin_journal, "a", encoding="utf-8") as f:
+                for nature, ids_changes in changements.items():
+                    for id_inies in ids_changes.tolist():
+                        f.write(json.dumps({
+                            "date": date, "de": precedente, "vers": version,
+                            COLONNE_ID: id_inies, "changement": NATURES[nature]
+                        }, ensure_ascii=False) + "\n")
+
+        _ajouter_ligne(os.path.join(self.dossier, MANIFESTE), {
+            "version": version, "date": date, "source": source, "lignes": int(len(ids))
+        })
+        return version
+
+    # ✅ Produits ajoutés, supprimés et modifiés entre deux versions (comparaison des empreintes)
+    def diff(self, version_a, version_b):
+        ids_a, emp_a = self._empreintes(version_a)
+        ids_b, emp_b = self._empreintes(version_b)
+        communs, pos_a, pos_b = np.intersect1d(ids_a, ids_b, assume_unique=True, return_indices=True)
+        return {
+            "ajouts": np.setdiff1d(ids_b, ids_a, assume_unique=True),
+            "suppressions": np.setdiff1d(ids_a, ids_b, assume_unique=True),
+            "modifications": communs[emp_a[pos_a] != emp_b[pos_b]],
+        }
+
+    # ✅ Détail des valeurs modifiées (ancienne / nouvelle valeur par colonne)
+    def diff_valeurs(self, version_a, version_b):
+        modifies = self.diff(version_a, version_b)["modifications"]
+        avant = self.charger(version_a).set_index(COLONNE_ID).loc[modifies]
+        apres = self.charger(version_b).set_index(COLONNE_ID).loc[modifies]
+        colonnes = [c for c in avant.columns if c in apres.columns]
+        avant = avant[colonnes].astype('string')
+        apres = apres[colonnes].astype('string')
+        differences = avant.ne(apres) & ~(avant.isna() & apres.isna())
+        longues = differences.stack()
+        longues = longues[longues].index
+        return pd.DataFrame({
+            COLONNE_ID: longues.get_level_values(0),
+            'Colonne': longues.get_level_values(1),
+            'Avant': [avant.at[i, c] for i, c in longues],
+            'Après': [apres.at[i, c] for i, c in longues],
+        })
+
+    # ✅ Journal des changements d'un produit
+    def historique(self, id_inies):
+        return [e for e in _lire_lignes(os.path.join(self.dossier, JOURNAL)) if e[COLONNE_ID] == int(id_inies)]
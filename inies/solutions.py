@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from inies.impact import impacts_base
+
+
+# ✅ Lecture de la bibliothèque de solutions (solutions_db.json)
+def charger_solutions(chemin):
+    chemin = Path(chemin)
+    if chemin.exists():
+        with open(chemin, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+# ✅ ID INIES saisi ("5511", 5511, "" ...) -> entier ou None
+def _id_inies(valeur):
+    try:
+        return int(str(valeur).strip())
+    except ValueError:
+        return None
+
+
+# ✅ Une ligne par produit de solution
+def lignes_solutions(solutions):
+    lignes = [
+        {
+            'Solution': nom,
+            'Catégorie': contenu.get('categorie', 'Non spécifiée'),
+            'Ligne': i,
+            'ID INIES': _id_inies(p.get('id_inies', '')),
+            'Nom du produit': p.get('nom', ''),
+            'Quantité': float(p.get('quantité', 0) or 0),
+            'Impact enregistré': float(p.get('impact_normalisé', 0) or 0)
+        }
+        for nom, contenu in solutions.items()
+        for i, p in enumerate(contenu.get('produits', []))
+    ]
+    colonnes = ['Solution', 'Catégorie', 'Ligne', 'ID INIES', 'Nom du produit', 'Quantité', 'Impact enregistré']
+    lignes = pd.DataFrame(lignes, columns=colonnes)
+    lignes['ID INIES'] = lignes['ID INIES'].astype('Int64')
+    return lignes
+
+
+# ✅ Impact normalisé de chaque ligne recalculé depuis la base (valeur enregistrée si produit inconnu)
+def evaluer_solutions(solutions, df):
+    lignes = lignes_solutions(solutions)
+    calcul = impacts_base(df).calculer(lignes['ID INIES'].fillna(-1).to_numpy(dtype='int64'), lignes['Quantité'].to_numpy())
+    connues = calcul['Produit trouvé'].to_numpy()
+
+    impacts = lignes['Impact enregistré'].to_numpy(dtype='float64').copy()
+    impacts[connues] = np.round(calcul['Impact normalisé'].to_numpy()[connues], 2)
+    lignes['Impact normalisé'] = impacts
+    lignes['Produit trouvé'] = connues
+    return lignes
+
+
+# ✅ Impact total CO₂ normalisé par solution
+def totaux_solutions(lignes):
+    return (
+        lignes.groupby(['Solution', 'Catégorie'], sort=False, as_index=False)
+        .agg(Produits=('Ligne', 'size'), **{'Impact total normalisé': ('Impact normalisé', 'sum')})
+    )
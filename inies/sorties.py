@@ -0,0 +1,92 @@
+import os
+import tempfile
+import pandas as pd
+from inies.dataset import type_chaine
+
+FORMATS = ('csv', 'parquet', 'xlsx')
+TAILLE_BLOC = 10000
+MIMES = {
+    'csv': "text/csv",
+    'parquet': "application/vnd.apache.parquet",
+    'xlsx': "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+# ✅ Écriture en flux par blocs : la mémoire reste bornée par la taille d'un bloc
+class EcrivainFlux:
+    def __init__(self, chemin, format=None):
+        self.chemin = chemin
+        self.format = format or os.path.splitext(chemin)[1].lstrip('.').lower()
+        if self.format not in FORMATS:
+            raise ValueError(f"Format de sortie non pris en charge : {self.format}")
+        self.lignes = 0
+        self._schema = None
+        self._parquet = None
+        self._classeur = None
+        self._entete = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def ecrire(self, bloc):
+        # ✅ Catégories converties en chaînes : schéma identique d'un bloc à l'autre
+        bloc = bloc.reset_index(drop=True)
+        for col in bloc.columns:
+            if isinstance(bloc[col].dtype, pd.CategoricalDtype) or bloc[col].dtype == object:
+                bloc[col] = bloc[col].astype(type_chaine())
+
+        if self.format == 'csv':
+            bloc.to_csv(self.chemin, mode='w' if self._entete else 'a', header=self._entete, index=False)
+            self._entete = False
+        elif self.format == 'xlsx':
+            # ✅ Classeur en écriture seule : les lignes partent sur disque au fil de l'eau
+            if self._classeur is None:
+                from openpyxl import Workbook
+                self._classeur = Workbook(write_only=True)
+                self._feuille = self._classeur.create_sheet("Sheet1")
+                self._feuille.append(list(bloc.columns))
+            # ✅ float32 repassés par leur écriture la plus courte (0.314 et non 0.31400001049)
+            for col in bloc.columns[bloc.dtypes == 'float32']:
+                bloc[col] = bloc[col].astype(str).astype('float64')
+            valeurs = bloc.astype(object).where(bloc.notna(), None)
+            for ligne in valeurs.itertuples(index=False, name=None):
+                self._feuille.append(ligne)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(bloc, schema=self._schema, preserve_index=False)
+            if self._parquet is None:
+                self._schema = table.schema
+                self._parquet = pq.ParquetWriter(self.chemin, self._schema)
+            self._parquet.write_table(table)
+        self.lignes += len(bloc)
+
+    def fermer(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        if self._classeur is not None:
+            self._classeur.save(self.chemin)
+            self._classeur = None
+
+
+# ✅ Export par blocs d'un résultat déjà filtré et scoré
+def exporter(df, chemin, format=None, taille_bloc=TAILLE_BLOC):
+    with EcrivainFlux(chemin, format) as sortie:
+        for debut in range(0, len(df), taille_bloc):
+            sortie.ecrire(df.iloc[debut:debut + taille_bloc])
+        if df.empty:
+            sortie.ecrire(df)
+    return sortie.lignes
+
+
+# ✅ Contenu du fichier exporté (téléchargement Streamlit), écrit côté serveur dans un fichier temporaire
+def exporter_octets(df, format, taille_bloc=TAILLE_BLOC):
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, f"export.{format}")
+        exporter(df, chemin, format, taille_bloc)
+        with open(chemin, "rb") as f:
+            return f.read()
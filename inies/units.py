@@ -0,0 +1,135 @@
+import re
+import numpy as np
+import pandas as pd
+
+# ✅ Unités fonctionnelles canoniques (ordre des groupes = ordre de l'expression régulière)
+UNITES = ['m³', 'm²', 'm', 'kg', 'kWh', 'kW', 'unité']
+UNITE_DEFAUT = 'unité'
+
+# ✅ Colonnes typées ajoutées à la base compacte (dataset.compacter)
+COLONNE_UNITE = 'Unité canonique'
+COLONNE_QUANTITE = 'Quantité UF'
+
+# ✅ Unités reconnues dans le texte (un groupe nommé par unité canonique) ; les watts seuls sont des
+# ✅ puissances nominales (« LED 14W »), jamais l'UF : seuls kW / kWc / kilowatts sont retenus
+MOTIF_UNITE = (
+    r"(?P<m3>m3\b|m³|mètres? cubes?)"
+    r"|(?P<m2>m2\b|m²|mètres? carrés?)"
+    r"|(?P<m>\bml\b|mètres? linéaires?|\b\d+\s?m\b|\bmètres?\b)"
+    r"|(?P<kg>(?<![a-z])kg\b|kilogrammes?|\btonnes?\b)"
+    r"|(?P<kwh>kwh)"
+    r"|(?P<kw>(?<![a-z])kwc?\b|kilowatts?)"
+    r"|(?P<unite>\bunités?\b|\bpièces?\b)"
+)
+GROUPES_UNITES = dict(zip(['m3', 'm2', 'm', 'kg', 'kwh', 'kw', 'unite'], UNITES))
+
+# ✅ Débits et grandeurs rapportées (« 12000 m3/h », « kWh/m²/an », « W/m².K ») : unité suivie ou précédée d'un « / » ;
+# ✅ dimensions (« 1,2x0,6x0,2 m ») écartées de même
+# ✅ Caractéristique d'un produit (« course de 2 mètres », « puissance de 14 kW ») : mot d'attribut dans la même proposition
+_MOTIF_UNITE = re.compile(MOTIF_UNITE)
+_MOTIF_ATTRIBUT = re.compile(
+    r"\b(?:course|diamètre|épaisseur|hauteur|largeur|profondeur|portée|débit|puissance|charge|capacité|poids|tube|section)\b[^,;()\[\]]*$"
+)
+_MOTIF_DIMENSIONS = re.compile(r"\d\s*[x×]\s*\d+(?:[.,]\d+)?\s*$")
+_NOMBRE_DEBUT = re.compile(r"^\d+(?:[.,]\d+)?")
+_NOMBRE_FIN = re.compile(r"(\d+(?:[.,]\d+)?)\s*$")
+
+
+def _rapportee(texte, trouve):
+    chiffres = _NOMBRE_DEBUT.match(trouve.group())
+    avant = texte[:trouve.start()] + (chiffres.group() if chiffres else "")
+    return (
+        texte[trouve.end():].lstrip().startswith('/') or avant.rstrip().endswith('/')
+        or _MOTIF_DIMENSIONS.search(avant) is not None
+    )
+
+
+# ✅ Quantité d'une occurrence : nombre qui la précède ("1 m²", "d'1m2", "25 kg") ; 1 si absent
+# ✅ Tonnes ramenées en kg (unité canonique)
+def _quantite(texte, trouve):
+    chiffres = _NOMBRE_DEBUT.match(trouve.group())
+    nombre = _NOMBRE_FIN.search(texte[:trouve.start()] + (chiffres.group() if chiffres else ""))
+    quantite = float(nombre.group(1).replace(",", ".")) if nombre else 1.0
+    if trouve.lastgroup == 'kg' and 'tonne' in trouve.group():
+        quantite *= 1000
+    return quantite if quantite > 0 else 1.0
+
+
+# ✅ Unité et quantité de l'UF d'un texte, (None, nan) si aucune unité ne la définit :
+# ✅ occurrences rapportées ou d'attribut écartées, kW retenu pour 1 kW seulement (sinon puissance nominale) ;
+# ✅ plusieurs unités possibles : celle énoncée pour une quantité de 1, sinon ambiguïté -> 1 unité
+def _analyser_uf(texte):
+    texte = str(texte).lower()
+    candidates = []
+    for trouve in _MOTIF_UNITE.finditer(texte):
+        if _rapportee(texte, trouve) or _MOTIF_ATTRIBUT.search(texte[:trouve.start()]):
+            continue
+        quantite = _quantite(texte, trouve)
+        if trouve.lastgroup == 'kw' and quantite != 1:
+            continue
+        candidates.append((GROUPES_UNITES[trouve.lastgroup], quantite))
+
+    if not candidates:
+        return None, np.nan
+    if len({unite for unite, _ in candidates}) == 1:
+        return candidates[0]
+    unitaires = [c for c in candidates if c[1] == 1]
+    if len({unite for unite, _ in unitaires}) == 1:
+        return unitaires[0]
+    return UNITE_DEFAUT, 1.0
+
+
+# ✅ Unité et quantité de l'UF d'une colonne texte, calculées sur ses seules valeurs distinctes
+def _analyser_colonne(textes):
+    textes = pd.Series(textes)
+    categories = pd.Categorical(textes)
+    analyses = [_analyser_uf(texte) for texte in categories.categories]
+    unites = np.asarray([unite for unite, _ in analyses] + [None], dtype=object)
+    quantites = np.asarray([quantite for _, quantite in analyses] + [np.nan], dtype='float64')
+    codes = categories.codes
+    return (
+        pd.Series(unites[codes], index=textes.index, dtype='object'),
+        pd.Series(quantites[codes], index=textes.index),
+    )
+
+
+def unite_depuis_texte(textes):
+    return _analyser_colonne(textes)[0]
+
+
+def quantite_depuis_texte(textes):
+    return _analyser_colonne(textes)[1]
+
+
+# ✅ Le champ 'Durée de Vie' contient souvent la quantité de l'UF ("1 m²", "1 unité") : prioritaire s'il est lisible
+def _textes_duree(df):
+    duree = df['Durée de Vie'].astype('string')
+    return df['Durée de Vie'].astype('object').where(
+        duree.str.match(r"^\s*\d+([.,]\d+)?\s*[^\d\s]", na=False) & ~duree.str.contains('ans', na=False)
+    )
+
+
+# ✅ Unité canonique et quantité de l'UF de chaque produit (calculées sur les seules valeurs distinctes) ;
+# ✅ les colonnes déjà présentes dans la base compacte sont reprises telles quelles
+def unites_fonctionnelles(df):
+    if {COLONNE_UNITE, COLONNE_QUANTITE} <= set(df.columns):
+        return pd.DataFrame({
+            COLONNE_UNITE: df[COLONNE_UNITE].astype(pd.CategoricalDtype(UNITES)),
+            COLONNE_QUANTITE: df[COLONNE_QUANTITE].astype('float32'),
+        }, index=df.index)
+
+    unite_duree, quantite_duree = _analyser_colonne(_textes_duree(df))
+    unite_uf, quantite_uf = _analyser_colonne(df['Unité Fonctionnelle'])
+    quantite = np.where(
+        unite_duree.notna(), quantite_duree,
+        np.where(unite_uf.notna(), quantite_uf, 1.0)
+    )
+    return pd.DataFrame({
+        COLONNE_UNITE: unite_duree.fillna(unite_uf).fillna(UNITE_DEFAUT).astype(pd.CategoricalDtype(UNITES)),
+        COLONNE_QUANTITE: np.nan_to_num(quantite, nan=1.0).astype('float32'),
+    }, index=df.index)
+
+
+# ✅ Unité fonctionnelle canonique d'un produit
+def unite_canonique(df):
+    return unites_fonctionnelles(df)[COLONNE_UNITE]
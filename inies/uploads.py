@@ -0,0 +1,197 @@
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import time
+import unicodedata
+from itertools import chain, islice
+import pandas as pd
+from inies.dataset import COLONNE_ID, COLONNES_IMPACT, DOSSIER_CACHE, compacter
+from inies.parsing import analyser_nombres
+
+# ✅ Imports utilisateurs : un fichier Parquet compact par utilisateur (ou par session)
+DOSSIER_IMPORTS = os.path.join(DOSSIER_CACHE, "imports")
+TAILLE_BLOC = 5000
+LIGNES_ENTETE_MAX = 20
+IMPORTS_CONSERVES = 16
+
+COLONNES_OBLIGATOIRES = [COLONNE_ID, 'Nom du produit']
+COLONNES_SCHEMA = [
+    COLONNE_ID, 'Nom du produit', 'Type de Déclaration', 'Unité Fonctionnelle',
+    'Durée de Vie', 'Impact CO₂ (kg)', 'D-Bénéfices'
+]
+
+# ✅ Variantes d'en-têtes rencontrées (sans accents, casse ni ponctuation)
+SYNONYMES = {
+    COLONNE_ID: ['id', 'idinies', 'identifiant', 'identifiantinies', 'numeroinies', 'ninies', 'inies'],
+    'Nom du produit': ['nomduproduit', 'nom', 'produit', 'nomproduit', 'designation', 'libelle'],
+    'Type de Déclaration': ['typededeclaration', 'typedeclaration', 'type', 'declaration'],
+    'Unité Fonctionnelle': ['unitefonctionnelle', 'uf', 'unite'],
+    'Durée de Vie': ['dureedevie', 'dureedevieans', 'dvr', 'duree', 'dureedeviedereference'],
+    'Impact CO₂ (kg)': ['impactco2kg', 'impactco2', 'co2', 'totalcycledevie', 'rechauffementclimatique'],
+    'D-Bénéfices': ['dbenefices', 'd', 'moduled', 'beneficesetchargesaudeladesfrontieresdusysteme'],
+}
+_CANONIQUES = {variante: col for col, variantes in SYNONYMES.items() for variante in variantes}
+
+
+def normaliser_entete(entete):
+    texte = unicodedata.normalize('NFKD', str(entete))
+    texte = ''.join(c for c in texte if not unicodedata.combining(c))
+    return re.sub(r'[^a-z0-9]', '', texte.lower())
+
+
+# ✅ En-tête du fichier -> colonne canonique (première occurrence retenue)
+def correspondance_colonnes(entetes):
+    correspondance = {}
+    for position, entete in enumerate(entetes):
+        if entete is None:
+            continue
+        colonne = _CANONIQUES.get(normaliser_entete(entete))
+        if colonne is not None and colonne not in correspondance.values():
+            correspondance[position] = colonne
+    return correspondance
+
+
+# ✅ Ligne d'en-tête : celle des premières lignes qui reconnaît le plus de colonnes du schéma
+def _trouver_entete(lignes):
+    meilleure = (None, {})
+    for numero, ligne in enumerate(lignes):
+        correspondance = correspondance_colonnes(ligne)
+        if len(correspondance) > len(meilleure[1]):
+            meilleure = (numero, correspondance)
+    return meilleure
+
+
+def _feuilles_candidates(classeur):
+    noms = classeur.sheetnames
+    return (["Sheet1"] if "Sheet1" in noms else []) + [n for n in noms if n != "Sheet1"]
+
+
+# ✅ Lecture en flux (openpyxl read-only) : seules les colonnes reconnues sont conservées, par blocs
+def lire_import(source, taille_bloc=TAILLE_BLOC):
+    from openpyxl import load_workbook
+
+    classeur = load_workbook(source, read_only=True, data_only=True)
+    try:
+        vues = []
+        for nom in _feuilles_candidates(classeur):
+            lignes = classeur[nom].iter_rows(values_only=True)
+            debut = list(islice(lignes, LIGNES_ENTETE_MAX))
+            numero, correspondance = _trouver_entete(debut)
+            vues.append((nom, sorted(correspondance.values(), key=COLONNES_SCHEMA.index)))
+            if not set(COLONNES_OBLIGATOIRES) <= set(correspondance.values()):
+                continue
+
+            positions = list(correspondance)
+            colonnes = [correspondance[p] for p in positions]
+            blocs = []
+            restantes = chain(debut[numero + 1:], lignes)
+            while True:
+                bloc = list(islice(restantes, taille_bloc))
+                if not bloc:
+                    break
+                blocs.append(pd.DataFrame(
+                    [[ligne[p] if p < len(ligne) else None for p in positions] for ligne in bloc],
+                    columns=colonnes, dtype=object
+                ))
+            df = pd.concat(blocs, ignore_index=True) if blocs else pd.DataFrame(columns=colonnes, dtype=object)
+            return df, {"feuille": nom, "ligne_entete": numero + 1, "colonnes": colonnes}
+    finally:
+        classeur.close()
+
+    detail = " ; ".join(f"{nom} : {', '.join(cols) or 'aucune colonne reconnue'}" for nom, cols in vues)
+    raise ValueError(f"Colonnes obligatoires introuvables ({', '.join(COLONNES_OBLIGATOIRES)}). {detail}")
+
+
+# ✅ Validation par rapport au schéma canonique ; les lignes inexploitables sont écartées et comptées
+def valider(df):
+    avertissements = []
+    df = df.dropna(how='all')
+    lues = len(df)
+
+    manquantes = [col for col in COLONNES_SCHEMA if col not in df.columns]
+    for col in manquantes:
+        df[col] = None
+    if manquantes:
+        avertissements.append(f"Colonnes absentes (laissées vides) : {', '.join(manquantes)}")
+    df = df[COLONNES_SCHEMA]
+
+    ids = pd.to_numeric(df[COLONNE_ID], errors='coerce')
+    sans_id = ids.isna() | (ids != ids.round())
+    if sans_id.any():
+        avertissements.append(f"{int(sans_id.sum())} lignes sans ID INIES valide ignorées")
+    df = df[~sans_id]
+
+    doublons = df[COLONNE_ID].astype('float64').duplicated(keep='last')
+    if doublons.any():
+        avertissements.append(f"{int(doublons.sum())} ID INIES en double (dernière occurrence conservée)")
+    df = df[~doublons]
+
+    # ✅ Colonnes texte en chaînes, comme dans la base INIES (ex. "Durée de Vie" saisie en nombre)
+    for col in COLONNES_SCHEMA[1:5]:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str).str.strip())
+
+    for col in COLONNES_IMPACT:
+        _, illisibles = analyser_nombres(df[col])
+        if illisibles.any():
+            avertissements.append(f"{int(illisibles.sum())} valeurs illisibles dans « {col} » (laissées vides)")
+
+    rapport = {"lignes_lues": lues, "lignes_retenues": len(df), "avertissements": avertissements}
+    return df.reset_index(drop=True), rapport
+
+
+def _dossier_utilisateur(utilisateur, dossier):
+    return os.path.join(dossier, re.sub(r'[^\w.-]', '_', str(utilisateur)))
+
+
+# ✅ Imports déjà lus par ce processus : {(dossier utilisateur, empreinte): DataFrame} ;
+# ✅ le même objet est rendu à chaque rerun, les index mémoïsés par base (recherche, impacts) restent valables
+_IMPORTS = {}
+
+
+def charger_import(utilisateur, dossier=DOSSIER_IMPORTS):
+    dossier = _dossier_utilisateur(utilisateur, dossier)
+    try:
+        with open(os.path.join(dossier, "import.json"), "r", encoding="utf-8") as f:
+            rapport = json.load(f)
+        cle = (dossier, rapport.get("empreinte"))
+        if cle not in _IMPORTS:
+            _IMPORTS[cle] = pd.read_parquet(os.path.join(dossier, "import.parquet"))
+            while len(_IMPORTS) > IMPORTS_CONSERVES:
+                del _IMPORTS[next(iter(_IMPORTS))]
+        return _IMPORTS[cle], rapport
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None, None
+
+
+def supprimer_import(utilisateur, dossier=DOSSIER_IMPORTS):
+    dossier = _dossier_utilisateur(utilisateur, dossier)
+    for cle in [cle for cle in _IMPORTS if cle[0] == dossier]:
+        _IMPORTS.pop(cle, None)
+    shutil.rmtree(dossier, ignore_errors=True)
+
+
+# ✅ Import complet : lecture en flux, validation, compaction, puis persistance pour l'utilisateur
+def importer_fichier(contenu, nom_fichier, utilisateur, dossier=DOSSIER_IMPORTS):
+    empreinte = hashlib.sha1(contenu).hexdigest()[:16]
+    df, rapport = charger_import(utilisateur, dossier)
+    if rapport is not None and rapport.get("empreinte") == empreinte:
+        return df, rapport
+
+    brut, lecture = lire_import(io.BytesIO(contenu))
+    df, validation = valider(brut)
+    if df.empty:
+        raise ValueError("Aucune ligne exploitable dans le fichier importé.")
+    df = compacter(df)
+
+    rapport = {"fichier": nom_fichier, "empreinte": empreinte, "date": time.time(), **lecture, **validation}
+    dossier = _dossier_utilisateur(utilisateur, dossier)
+    os.makedirs(dossier, exist_ok=True)
+    temporaire = os.path.join(dossier, f"import.{os.getpid()}.tmp")
+    df.to_parquet(temporaire, index=False)
+    os.replace(temporaire, os.path.join(dossier, "import.parquet"))
+    with open(os.path.join(dossier, "import.json"), "w", encoding="utf-8") as f:
+        json.dump(rapport, f, ensure_ascii=False)
+    return df, rapport
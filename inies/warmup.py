@@ -0,0 +1,161 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import multiprocessing as mp
+import pandas as pd
+import requests
+from inies.comparison import libelles_produits
+from inies.dataset import BASE_DIR, DOSSIER_CACHE, FICHIER_BASE, URL_BASE, charger_base, compacter, lire_classeur
+from inies.facets import index_recherche
+from inies.impact import impacts_base
+from inies.recommend import index_substituts
+from inies.ressources import feuille_styles, logo_base64
+from inies.shared_cache import DOSSIER_PARTAGE, base_partagee
+
+# ✅ Préchauffage au démarrage du serveur : base, index et ressources prêts avant la première requête
+FICHIER_ETAT = os.path.join(DOSSIER_CACHE, "prechauffage.json")
+SCRIPT_ACCUEIL = os.path.join(BASE_DIR, "login.py")
+PAGE_BANC = "pages/appworks.py"
+DELAI_PAGE = 300
+
+
+# ✅ Base source : classeur local (cache Parquet) s'il est présent, sinon téléchargement GitHub comme les pages
+def charger_source():
+    if os.path.exists(FICHIER_BASE):
+        return charger_base(FICHIER_BASE)
+    response = requests.get(URL_BASE, timeout=60)
+    response.raise_for_status()
+    return compacter(lire_classeur(io.BytesIO(response.content)))
+
+
+def _ecrire_etat(etat, fichier):
+    os.makedirs(os.path.dirname(fichier), exist_ok=True)
+    temporaire = f"{fichier}.{os.getpid()}.tmp"
+    with open(temporaire, "w", encoding="utf-8") as f:
+        json.dump(etat, f, ensure_ascii=False)
+    os.replace(temporaire, fichier)
+
+
+def lire_etat(fichier=FICHIER_ETAT):
+    try:
+        with open(fichier, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+# ✅ Prêt : préchauffage terminé sans erreur par un processus toujours en vie
+def est_pret(fichier=FICHIER_ETAT):
+    etat = lire_etat(fichier)
+    if not etat or not etat.get("pret"):
+        return False
+    if os.name == "posix":
+        try:
+            os.kill(etat["pid"], 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+    return True
+
+
+# ✅ Chargement de la base partagée puis construction des structures dérivées, chronométrées par étape ;
+# ✅ état publié dans FICHIER_ETAT (signal de disponibilité), une erreur n'empêche pas le serveur de démarrer
+def prechauffer(charger=charger_source, dossier=DOSSIER_PARTAGE, fichier=FICHIER_ETAT):
+    etat = {"pid": os.getpid(), "debut": time.time(), "pret": False, "etapes": {}, "erreur": None}
+    _ecrire_etat(etat, fichier)
+    debut = time.perf_counter()
+
+    def etape(nom, fonction, *args):
+        depart = time.perf_counter()
+        resultat = fonction(*args)
+        etat["etapes"][nom] = round(time.perf_counter() - depart, 3)
+        return resultat
+
+    try:
+        df = etape("base", base_partagee, charger, dossier)
+        if df is None or df.empty:
+            raise LookupError("Base INIES vide ou introuvable")
+        etape("recherche", index_recherche, df)
+        etape("impacts", impacts_base, df)
+        etape("libelles", libelles_produits, df)
+        etape("substituts", index_substituts, df)
+        etape("ressources", lambda: (logo_base64(), feuille_styles()))
+        etat.update(pret=True, lignes=len(df))
+    except Exception as e:
+        etat["erreur"] = f"{type(e).__name__}: {e}"
+
+    etat["duree"] = round(time.perf_counter() - debut, 3)
+    _ecrire_etat(etat, fichier)
+    return etat
+
+
+# ✅ Lancement du serveur Streamlit dans le processus préchauffé (mêmes options que `streamlit run`)
+def lancer_serveur(script=SCRIPT_ACCUEIL, options=(), charger=charger_source, prechauffage=True):
+    if prechauffage:
+        etat = prechauffer(charger)
+        if etat["pret"]:
+            etapes = ", ".join(f"{nom} {duree:.2f} s" for nom, duree in etat["etapes"].items())
+            print(f"✅ Préchauffage terminé en {etat['duree']:.2f} s ({etapes})", file=sys.stderr)
+        else:
+            print(f"⚠️ Préchauffage incomplet : {etat['erreur']}", file=sys.stderr)
+
+    from streamlit.web import cli as stcli
+
+    sys.argv = ["streamlit", "run", script, *options]
+    return stcli.main()
+
+
+# ✅ Processus serveur neuf : préchauffage éventuel, puis première page et première recherche d'un utilisateur connecté
+def _premier_affichage(page, terme, prechauffage, resultats):
+    lancement = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(BASE_DIR)
+    duree_prechauffage = prechauffer()["duree"] if prechauffage else 0.0
+    requete = time.perf_counter()
+
+    app = AppTest.from_file(os.path.join(BASE_DIR, page), default_timeout=DELAI_PAGE)
+    app.session_state.logged_in = True
+    app.session_state.username = "admin"
+    app.run()
+    page_affichee = time.perf_counter()
+    if terme and len(app.text_input):
+        app.text_input[0].set_value(terme).run()
+    interactif = time.perf_counter()
+
+    resultats.put({
+        "Préchauffage (s)": duree_prechauffage,
+        "Première page (s)": page_affichee - requete,
+        "Premier interactif (s)": interactif - requete,
+        "Depuis le lancement (s)": interactif - lancement,
+        "Erreurs": len(app.exception),
+    })
+
+
+# ✅ Banc de démarrage à froid : processus neufs sur un cache vide (INIES_CACHE temporaire),
+# ✅ délai jusqu'au premier affichage interactif sans puis avec préchauffage
+def banc_demarrage(page=PAGE_BANC, terme="bois", repetitions=1):
+    contexte = mp.get_context("spawn")
+    lignes = []
+    ancien_cache = os.environ.get("INIES_CACHE")
+    try:
+        for repetition in range(repetitions):
+            for mode, prechauffage in (("Sans préchauffage", False), ("Avec préchauffage", True)):
+                with tempfile.TemporaryDirectory() as dossier:
+                    os.environ["INIES_CACHE"] = dossier
+                    resultats = contexte.Queue()
+                    processus = contexte.Process(target=_premier_affichage, args=(page, terme, prechauffage, resultats))
+                    processus.start()
+                    mesure = resultats.get(timeout=2 * DELAI_PAGE)
+                    processus.join()
+                lignes.append({"Mode": mode, "Essai": repetition + 1, **mesure})
+    finally:
+        if ancien_cache is None:
+            os.environ.pop("INIES_CACHE", None)
+        else:
+            os.environ["INIES_CACHE"] = ancien_cache
+    return pd.DataFrame(lignes)
@@ -1,13 +1,18 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import requests
 import io
-import plotly.express as px
-from PIL import Image
-import base64
 from streamlit_modal import Modal
-from utils import apply_styles
+from utils import apply_styles, bouton_export, tableau_pagine
+from inies.dataset import compacter
+from inies.shared_cache import base_partagee
+from inies.ressources import feuille_styles, logo_base64
+from inies.uploads import importer_fichier, charger_import, supprimer_import
+from inies.scoring import scorer, MODES_SCORE
+from inies.search import rechercher, TYPES_DECLARATION
+from inies.impact import impacts_base
+from inies.facets import FACETTE_DUREE, FACETTE_TYPE, FACETTE_UNITE, index_recherche
+from inies.charts import histogramme_par_categorie, figure_histogramme
 
 
 # ✅ Configuration de la page (MUST BE FIRST)
@@ -34,21 +39,13 @@ with col2:
         st.switch_page("pages/redirect_login.py")
 
 # ✅ Charger le fichier CSS
-with open("styles.css") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
-# ✅ Charger le logo
-logo = Image.open("logo_aeg.jpg")
-
-# ✅ Convertir en base64 pour le rendre cliquable
-with open("logo_aeg.jpg", "rb") as img_file:
-    logo_base64 = base64.b64encode(img_file.read()).decode()
+st.markdown(f"<style>{feuille_styles()}</style>", unsafe_allow_html=True)
 
 # ✅ Affichage du logo en tant que bouton cliquable
 st.sidebar.markdown(
     f"""
     <a href="/" target="_self">
-        <img src="data:image/png;base64,{logo_base64}" style="width: 100%; height: auto;">
+        <img src="data:image/png;base64,{logo_base64()}" style="width: 100%; height: auto;">
     </a>
     """,
     unsafe_allow_html=True
@@ -59,17 +56,14 @@ st.sidebar.markdown(
 df = pd.DataFrame()
 
 
-# ✅ Charger automatiquement le fichier depuis GitHub
-@st.cache_data
-def load_data_from_repo():
-    global df  # ✅ Déclaré comme global
+# ✅ Charger automatiquement le fichier depuis GitHub (base compacte renvoyée, publiée par base_partagee)
+def telecharger_base():
     url = 'https://raw.githubusercontent.com/CJ-AEG/aeginies/main/base_inies_complete.xlsx'
     try:
         response = requests.get(url)
         if response.status_code == 200:
             file = io.BytesIO(response.content)
-            df = pd.read_excel(file, sheet_name="Sheet1", engine='openpyxl')
-            return df
+            return compacter(pd.read_excel(file, sheet_name="Sheet1", engine='openpyxl'))
         else:
             st.error(f"❌ Erreur de chargement du fichier : {response.status_code}")
             return pd.DataFrame()
@@ -77,9 +71,27 @@ def load_data_from_repo():
         st.error(f"⚠️ Erreur lors du chargement : {e}")
         return pd.DataFrame()
 
+# ✅ Base partagée entre tous les processus Streamlit (fichier projeté en mémoire, version courante)
+def load_data_from_repo():
+    return base_partagee(telecharger_base)
+
 # ✅ Charger le fichier automatiquement au lancement
 df = load_data_from_repo()
-if not df.empty:
+
+# ✅ Fichier importé par l'utilisateur : conservé entre les rechargements et les sessions
+utilisateur = st.session_state.get("username") or "anonyme"
+df_import, rapport_import = charger_import(utilisateur)
+if df_import is not None:
+    df = df_import
+    st.info(f"📂 Fichier importé : **{rapport_import['fichier']}** (feuille « {rapport_import['feuille']} », {len(df)} produits)")
+    if rapport_import["avertissements"]:
+        with st.expander("⚠️ Rapport d'import"):
+            for avertissement in rapport_import["avertissements"]:
+                st.write(f"- {avertissement}")
+    if st.sidebar.button("↩️ Revenir à la base INIES"):
+        supprimer_import(utilisateur)
+        st.rerun()
+elif not df.empty:
     st.success("✅ Base de données chargée automatiquement depuis GitHub !")
 
 # ✅ Créer une fenêtre modale pour l'importation
@@ -96,10 +108,14 @@ if modal.is_open():
         uploaded_file = st.file_uploader("", type=["xlsx"])
         
         if uploaded_file is not None:
-            df = pd.read_excel(uploaded_file, sheet_name="Sheet1", engine='openpyxl')
-            st.success("✅ Fichier chargé avec succès !")
-            modal.close()
-            st.rerun()  # 🔥 Mettre à jour l'application après fermeture de la popup
+            # ✅ Lecture en flux, contrôle des colonnes et conversion au format compact de la base
+            try:
+                importer_fichier(uploaded_file.getvalue(), uploaded_file.name, utilisateur)
+            except ValueError as e:
+                st.error(f"❌ Fichier non importé : {e}")
+            else:
+                st.success("✅ Fichier chargé avec succès !")
+                modal.close()  # 🔥 Mettre à jour l'application après fermeture de la popup
 
 		
         
@@ -108,65 +124,26 @@ if modal.is_open():
             modal.close()
 
 # ✅ Fonction de traitement des données après recherche
-def process_data(filtered_data):
+def process_data(filtered_data, mode_score='zscore', par_unite=True):
     global df   # ✅ Déclaré comme global
 
     if filtered_data.empty:
         st.warning("⚠️ Aucun élément trouvé.")
         return
 
-    # ✅ Conversion explicite en float (gestion d'erreur)
-    filtered_data['Impact CO₂ (kg)'] = pd.to_numeric(filtered_data['Impact CO₂ (kg)'], errors='coerce').fillna(0)
-    filtered_data['D-Bénéfices'] = pd.to_numeric(filtered_data['D-Bénéfices'], errors='coerce').fillna(0)
-    filtered_data['Durée de Vie'] = pd.to_numeric(
-        filtered_data['Durée de Vie'].str.replace('ans', '').str.strip(), 
-        errors='coerce'
-    ).fillna(50)
-
-    # ✅ Calcul de l'Impact total et de l'Impact normalisé
-    filtered_data['Impact total'] = filtered_data['Impact CO₂ (kg)'] + filtered_data['D-Bénéfices']
-    filtered_data['Impact normalisé'] = filtered_data['Impact total'] * (50 / filtered_data['Durée de Vie'])
-
-    # ✅ Calcul du Z-Score
-    mean = filtered_data['Impact normalisé'].mean()
-    std = filtered_data['Impact normalisé'].std()
-    filtered_data['Z-Score'] = (filtered_data['Impact normalisé'] - mean) / std
-
-    # ✅ Catégorisation basée sur le Z-Score
-    filtered_data['Catégorie'] = pd.cut(
-        filtered_data['Z-Score'],
-        bins=[-np.inf, -1, 1, np.inf],
-        labels=['Bas carbone', 'Intermédiaire', 'Haut carbone']
-    ).astype(str)
-
-    # ✅ Marquer la valeur maximale et minimale
-    if not filtered_data.empty:
-        max_idx = filtered_data['Z-Score'].idxmax()
-        min_idx = filtered_data['Z-Score'].idxmin()
-
-        filtered_data.loc[max_idx, 'Catégorie'] = f"{filtered_data.loc[max_idx, 'Catégorie']} (Valeur maximale)"
-        filtered_data.loc[min_idx, 'Catégorie'] = f"{filtered_data.loc[min_idx, 'Catégorie']} (Valeur minimale)"
+    # ✅ Impact normalisé, Z-Score et catégorisation (cœur partagé avec la CLI)
+    filtered_data = scorer(filtered_data, mode_score, par_unite, impacts_base(df))
 
     # ✅ Affichage direct du tableau traité
     st.write(f"### 🔎 {len(filtered_data)} résultats trouvés :")
-    st.dataframe(filtered_data)
-
-    # ✅ Affichage du graphique Z-Score
-    fig = px.histogram(
-        filtered_data,
-        x='Z-Score',
-        nbins=20,
-        color='Catégorie',
-        color_discrete_map={
-            'Bas carbone': '#2ca02c',
-            'Intermédiaire': '#ff7f0e',
-            'Haut carbone': '#d62728',
-            'Bas carbone (Valeur minimale)': '#1f77b4',
-            'Haut carbone (Valeur maximale)': '#9467bd'
-        }
-    )
-    fig.update_xaxes(range=[-3, 3])
-    st.plotly_chart(fig)
+    tableau_pagine(filtered_data, key="tableau_recherche")
+    bouton_export(filtered_data, "recherche_inies", key="export_recherche")
+
+    # ✅ Affichage du graphique Z-Score (construit uniquement à la demande, à partir des effectifs pré-calculés)
+    with st.expander("📈 Distribution des Z-Scores"):
+        if st.toggle("Afficher le graphique", key="afficher_histogramme"):
+            classes = histogramme_par_categorie(filtered_data['Z-Score'], filtered_data['Catégorie'], nbins=20)
+            st.plotly_chart(figure_histogramme(classes))
 
 # ✅ Vérifier que df n'est pas vide avant de filtrer
 if not df.empty:
@@ -182,38 +159,75 @@ if not df.empty:
         )
         search_term = st.text_input("Exemple : Plancher bois")
 
+    # ✅ Sélections en cours (lues avant l'affichage des filtres, qui portent les effectifs)
+    # ✅ Fichier importé sans type de déclaration : pas de filtre sur le type
+    index = index_recherche(df)
+    filtrer_types = df['Type de Déclaration'].notna().any()
+    cles_facettes = {FACETTE_DUREE: "facette_duree", FACETTE_UNITE: "facette_unite"}
+    selections = {
+        facette: st.session_state.get(cle) or None
+        for facette, cle in cles_facettes.items() if facette in index.valeurs
+    }
+    if filtrer_types:
+        selections[FACETTE_TYPE] = st.session_state.get("types_declaration", TYPES_DECLARATION)
+
+    # ✅ Effectifs de chaque valeur de facette pour la recherche courante (un seul passage par facette)
+    comptes = index.comptes(search_term, selections)
+
+    def avec_effectif(facette):
+        effectifs = comptes.get(facette, {})
+        return lambda valeur: f"{valeur} ({effectifs.get(valeur, 0)})"
+
     # ✅ Filtrage par type de déclaration
     with col2:
         st.markdown(
             "<h4 style='font-size:24px; font-weight:bold; color:#0047AB;'>📌 Filtrer par type de déclaration :</h4>", 
             unsafe_allow_html=True
         )
-        type_declaration_options = ['Individuelle', 'Collective', 'DED', 'RE2020', 'EC']
+        type_declaration_options = TYPES_DECLARATION
         selected_types = st.multiselect(
             "",
             options=type_declaration_options,
-            default=type_declaration_options
+            default=type_declaration_options,
+            format_func=avec_effectif(FACETTE_TYPE),
+            key="types_declaration"
         )
 
-    # ✅ Appliquer le filtrage directement après sélection
-    filtered_df = df[df['Type de Déclaration'].isin(selected_types)]
+    # ✅ Méthode de classement (les modes robustes limitent l'effet des valeurs aberrantes)
+    mode_score = st.sidebar.selectbox(
+        "📐 Méthode de classement",
+        options=list(MODES_SCORE),
+        format_func=MODES_SCORE.get,
+        key="mode_score"
+    )
 
-    # ✅ Si recherche en plus du filtrage par type de déclaration
-    if search_term:
-        terms = search_term.split()
+    # ✅ Classement à unité fonctionnelle égale (m², m³, kg, unité... comparés séparément)
+    par_unite = st.sidebar.toggle(
+        "⚖️ Classer par unité fonctionnelle",
+        value=True,
+        key="classement_par_unite",
+        help="Z-Score calculé entre produits de même unité canonique, sur l'impact ramené à une unité d'UF"
+    )
 
-        # ✅ Filtrage amélioré basé sur "Nom du produit" ET "Unité Fonctionnelle"
-        filtered_df = filtered_df[
-            np.logical_and.reduce([
-                filtered_df['Nom du produit'].str.contains(term, case=False, na=False) |
-                filtered_df['Unité Fonctionnelle'].str.contains(term, case=False, na=False)
-                for term in terms
-            ])
-        ]
+    # ✅ Facettes complémentaires (aucune sélection = pas de filtre)
+    facettes = {}
+    for facette, libelle in ((FACETTE_DUREE, "⏳ Durée de vie"), (FACETTE_UNITE, "📏 Unité fonctionnelle")):
+        if facette in index.valeurs:
+            choix = st.sidebar.multiselect(
+                libelle, options=index.valeurs[facette], placeholder="Toutes",
+                format_func=avec_effectif(facette), key=cles_facettes[facette]
+            )
+            if choix:
+                facettes[facette] = choix
+
+    # ✅ Filtrage par type de déclaration et facettes, puis recherche sur "Nom du produit" ET "Unité Fonctionnelle"
+    # ✅ (bitmaps précalculés combinés par ET)
+    types_filtre = selected_types if filtrer_types else None
+    filtered_df = rechercher(df, search_term, types_filtre, facettes)
 
     # ✅ Lancer le traitement si résultats disponibles
     if not filtered_df.empty:
-        process_data(filtered_df)  # ✅ Laisse cette fonction gérer l'affichage du tableau + nombre de résultats
+        process_data(filtered_df, mode_score, par_unite)  # ✅ Laisse cette fonction gérer l'affichage du tableau + nombre de résultats
 
     else:
         st.warning("⚠️ Aucun résultat trouvé.")
@@ -4,9 +4,10 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import streamlit as st
 import pandas as pd
 import os
-from PIL import Image
-import base64
-from utils import apply_styles
+from utils import apply_styles, bouton_export, tableau_pagine
+from inies.dataset import compacter
+from inies.shared_cache import base_partagee
+from inies.ressources import logo_base64
 
 
 # ✅ Configuration de la page
@@ -19,18 +20,11 @@ if "logged_in" not in st.session_state or not st.session_state.logged_in:
     st.warning("⚠️ Vous devez être connecté pour accéder à cette page.")
     st.switch_page("login.py")
 
-# ✅ Charger le logo
-logo = Image.open("logo_aeg.jpg")
-
-# ✅ Convertir en base64 pour le rendre cliquable
-with open("logo_aeg.jpg", "rb") as img_file:
-    logo_base64 = base64.b64encode(img_file.read()).decode()
-
 # ✅ Affichage du logo en tant que bouton cliquable
 st.sidebar.markdown(
     f"""
     <a href="/" target="_self">
-        <img src="data:image/png;base64,{logo_base64}" style="width: 100%; height: auto;">
+        <img src="data:image/png;base64,{logo_base64()}" style="width: 100%; height: auto;">
     </a>
     """,
     unsafe_allow_html=True
@@ -42,22 +36,26 @@ st.title("📊 Base de données complète")
 # ✅ Charger le fichier Excel depuis le dossier principal
 file_path = os.path.join(os.path.dirname(__file__), "../base_inies_complete.xlsx")
 
-@st.cache_data
-def load_data():
+def lire_base():
     try:
         df = pd.read_excel(file_path, sheet_name="Sheet1", engine='openpyxl')
-        return df
+        return compacter(df)
     except Exception as e:
         st.error(f"❌ Erreur lors du chargement du fichier : {e}")
         return pd.DataFrame()
 
+# ✅ Base partagée entre tous les processus Streamlit (fichier projeté en mémoire, version courante)
+def load_data():
+    return base_partagee(lire_base)
+
 # ✅ Charger les données
 df = load_data()
 
 # ✅ Affichage des données
 if not df.empty:
     st.write(f"### 📌 {len(df)} produits dans la base de données complète :")
-    st.dataframe(df)
+    tableau_pagine(df, key="tableau_base")
+    bouton_export(df, "base_inies_complete", key="export_base")
 
 else:
     st.warning("⚠️ Base de données vide ou problème de chargement.")
@@ -3,12 +3,14 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import requests
 import io
-from PIL import Image
-import base64
 from utils import apply_styles
+from inies.dataset import compacter
+from inies.shared_cache import base_partagee
+from inies.ressources import logo_base64
+from inies.comparison import libelles_produits, comparer_produits, COLONNES_COMPARAISON
+from inies.charts import figure_barres_groupees
 
 
 # ✅ Configuration de la page
@@ -22,18 +24,11 @@ if "logged_in" not in st.session_state or not st.session_state.logged_in:
     st.warning("⚠️ Vous devez être connecté pour accéder à cette page.")
     st.switch_page("login.py")
 
-# ✅ Charger le logo
-logo = Image.open("logo_aeg.jpg")
-
-# ✅ Convertir en base64 pour le rendre cliquable
-with open("logo_aeg.jpg", "rb") as img_file:
-    logo_base64 = base64.b64encode(img_file.read()).decode()
-
 # ✅ Affichage du logo en tant que bouton cliquable
 st.sidebar.markdown(
     f"""
     <a href="/" target="_self">
-        <img src="data:image/png;base64,{logo_base64}" style="width: 100%; height: auto;">
+        <img src="data:image/png;base64,{logo_base64()}" style="width: 100%; height: auto;">
     </a>
     """,
     unsafe_allow_html=True
@@ -41,15 +36,14 @@ st.sidebar.markdown(
 
 
 # ✅ Charger automatiquement le fichier depuis GitHub
-@st.cache_data
-def load_data_from_repo():
+def telecharger_base():
     url = 'https://raw.githubusercontent.com/CJ-AEG/aeginies/main/base_inies_complete.xlsx'
     try:
         response = requests.get(url)
         if response.status_code == 200:
             file = io.BytesIO(response.content)
             df = pd.read_excel(file, sheet_name="Sheet1", engine='openpyxl')
-            return df
+            return compacter(df)
         else:
             st.error(f"⚠️ Erreur lors du chargement du fichier : {response.status_code}")
             return pd.DataFrame()
@@ -57,6 +51,10 @@ def load_data_from_repo():
         st.error(f"⚠️ Erreur lors du chargement : {e}")
         return pd.DataFrame()
 
+# ✅ Base partagée entre tous les processus Streamlit (fichier projeté en mémoire, version courante)
+def load_data_from_repo():
+    return base_partagee(telecharger_base)
+
 # ✅ Charger les données
 df = load_data_from_repo()
 
@@ -65,101 +63,47 @@ if df.empty:
     st.warning("⚠️ Base de données vide !")
     st.stop()
 
-# ✅ Créer une colonne combinée pour recherche par nom ou ID
-df['Produit (ID)'] = df['Nom du produit'] + " (ID: " + df['ID INIES'].astype(str) + ")"
+# ✅ Libellés "Nom (ID: ...)" des produits (construits une fois par base)
+libelles = libelles_produits(df)
 
 # ✅ Titre de la page
 st.title("🔎 Comparaison de produits")
 
-# ✅ Colonnes côte à côte pour la sélection
-col1, col2 = st.columns(2)
-
-# ✅ Sélection du premier produit (clé unique)
-with col1:
-    st.markdown(
-        "<h4 style='font-size:24px; font-weight:bold; color:#0047AB;'>🛒 Sélectionner le premier produit :</h4>", 
-        unsafe_allow_html=True
-    )
-    product_1 = st.selectbox(
-        "",  # On met une string vide car le titre est dans markdown
-        df['Produit (ID)'].unique(),
-        key="product_1"
-    )
-
-# ✅ Sélection du second produit (clé unique)
-with col2:
-    st.markdown(
-        "<h4 style='font-size:24px; font-weight:bold; color:#0047AB;'>🛒 Sélectionner le second produit :</h4>", 
-        unsafe_allow_html=True
-    )
-    product_2 = st.selectbox(
-        "",
-        df['Produit (ID)'].unique(),
-        key="product_2"
-    )
-
-
-# ✅ Vérification que les produits sont différents
-if product_1 == product_2:
-    st.warning("⚠️ Les produits doivent être différents pour lancer la comparaison.")
-    st.stop()
-
-# ✅ Filtrer les deux produits sélectionnés par nom du produit
-product_1_name = product_1.split(" (ID: ")[0]
-product_2_name = product_2.split(" (ID: ")[0]
-
-filtered_df = df[df['Nom du produit'].isin([product_1_name, product_2_name])].copy()
-
-# ✅ Nettoyage des colonnes (forcer en float)
-filtered_df['Impact CO₂ (kg)'] = pd.to_numeric(filtered_df['Impact CO₂ (kg)'], errors='coerce').fillna(0)
-filtered_df['D-Bénéfices'] = pd.to_numeric(filtered_df['D-Bénéfices'], errors='coerce').fillna(0)
-filtered_df['Durée de Vie'] = pd.to_numeric(
-    filtered_df['Durée de Vie'].str.replace('ans', '', regex=True).str.strip(),
-    errors='coerce'
-).fillna(50)
-
-# ✅ Ajouter l'impact total normalisé
-filtered_df['Impact total normalisé'] = (
-    (filtered_df['Impact CO₂ (kg)'] + filtered_df['D-Bénéfices']) * (50 / filtered_df['Durée de Vie'])
+# ✅ Sélection d'un nombre quelconque de produits (par ID INIES)
+st.markdown(
+    "<h4 style='font-size:24px; font-weight:bold; color:#0047AB;'>🛒 Sélectionner les produits à comparer :</h4>", 
+    unsafe_allow_html=True
+)
+selected_ids = st.multiselect(
+    "",  # On met une string vide car le titre est dans markdown
+    options=list(libelles),
+    format_func=libelles.get,
+    key="produits_compares"
 )
 
-# ✅ Vérification des colonnes disponibles
-available_columns = ['Type de Déclaration', 'Impact CO₂ (kg)', 'D-Bénéfices', 'Impact total normalisé']
-if 'Z-Score' in filtered_df.columns:
-    available_columns.append('Z-Score')
-if 'Catégorie' in filtered_df.columns:
-    available_columns.append('Catégorie')
+# ✅ Au moins deux produits pour lancer la comparaison
+if len(selected_ids) < 2:
+    st.warning("⚠️ Sélectionnez au moins deux produits différents pour lancer la comparaison.")
+    st.stop()
+
+# ✅ Calcul vectorisé pour tous les produits sélectionnés, classés par impact normalisé
+comparison_data = comparer_produits(df, selected_ids)
+comparison_data['Produit (ID)'] = comparison_data['ID INIES'].map(libelles)
 
 # ✅ Affichage du tableau comparatif sous forme de colonnes
 st.write("### 📊 Tableau comparatif")
 st.dataframe(
-    filtered_df.set_index('Nom du produit')[available_columns].transpose()
-)
-
-# ✅ Créer un DataFrame pour le graphique groupé
-comparison_data = pd.DataFrame({
-    'Nom du produit': [product_1_name, product_2_name],
-    'Impact CO₂ (kg)': filtered_df['Impact CO₂ (kg)'].values,
-    'D-Bénéfices': filtered_df['D-Bénéfices'].values,
-    'Impact total normalisé': filtered_df['Impact total normalisé'].values
-})
-
-# ✅ Transformer les données pour un graphique groupé
-comparison_data_melted = comparison_data.melt(
-    id_vars='Nom du produit', 
-    value_vars=['Impact CO₂ (kg)', 'D-Bénéfices', 'Impact total normalisé'],
-    var_name='Variable',
-    value_name='Valeur'
+    comparison_data.set_index('Produit (ID)')[
+        ['Rang', 'Type de Déclaration', 'Durée de Vie (ans)'] + COLONNES_COMPARAISON
+    ].transpose()
 )
 
-# ✅ Créer le graphique à barres groupé
-fig = px.bar(
-    comparison_data_melted,
-    x='Variable',                   # Les variables en abscisse
-    y='Valeur',
-    color='Nom du produit',         # Les produits en couleur
-    barmode='group',                # Mode groupé
-    title="🔎 Comparaison des produits"
+# ✅ Créer le graphique à barres groupé (directement depuis le tableau large)
+fig = figure_barres_groupees(
+    comparison_data,
+    'Produit (ID)',
+    COLONNES_COMPARAISON,
+    titre="🔎 Comparaison des produits"
 )
 
 # ✅ Personnalisation du style du graphique
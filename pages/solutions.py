@@ -1,11 +1,21 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import streamlit as st
 import json
-import os
 from pathlib import Path
 import pandas as pd
 import numpy as np
-from PIL import Image
-import base64
+from inies.dataset import compacter
+from inies.shared_cache import base_partagee
+from inies.ressources import logo_base64
+from inies.recommend import index_substituts
+from inies.comparison import libelles_produits
+from inies.impact import impacts_normalises
+from inies.optimize import optimiser_solutions, totaux_optimises
+from inies.search import TYPES_DECLARATION
+from inies.project import CalculProjet, charger_projets, enregistrer_projets
+from inies.session import EtatSession, empreintes_sessions
 
 st.set_page_config(page_title="Solutions prédéfinies", layout="wide")
 st.title("🧱 Gestion des solutions prédéfinies")
@@ -15,34 +25,31 @@ if "logged_in" not in st.session_state or not st.session_state.logged_in:
     st.warning("⚠️ Vous devez être connecté pour accéder à cette page.")
     st.switch_page("login.py")
 
-# ✅ Charger le logo
-logo = Image.open("logo_aeg.jpg")
-
-# ✅ Convertir en base64 pour le rendre cliquable
-with open("logo_aeg.jpg", "rb") as img_file:
-    logo_base64 = base64.b64encode(img_file.read()).decode()
-
 # ✅ Affichage du logo en tant que bouton cliquable
 st.sidebar.markdown(
     f"""
     <a href="/" target="_self">
-        <img src="data:image/png;base64,{logo_base64}" style="width: 100%; height: auto;">
+        <img src="data:image/png;base64,{logo_base64()}" style="width: 100%; height: auto;">
     </a>
     """,
     unsafe_allow_html=True
 )
 
 # Chargement de la base INIES
-if "df_inies" not in st.session_state:
-    base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    file_path = os.path.join(base_path, "base_inies_complete.xlsx")
-    if os.path.exists(file_path):
-        df = pd.read_excel(file_path)
-        st.session_state["df_inies"] = df
-    else:
-        st.warning("⚠️ Fichier INIES introuvable à l'emplacement attendu : base_inies_complete.xlsx")
+# ✅ Base partagée entre processus, relue à chaque exécution : rien n'en est conservé dans la session
+base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+file_path = os.path.join(base_path, "base_inies_complete.xlsx")
+df_inies = pd.DataFrame()
+if os.path.exists(file_path):
+    df_inies = base_partagee(lambda: compacter(pd.read_excel(file_path)))
+else:
+    st.warning("⚠️ Fichier INIES introuvable à l'emplacement attendu : base_inies_complete.xlsx")
+
+# ✅ Objets propres à la session (brouillons, calcul de projet) suivis et plafonnés en mémoire
+session = EtatSession(st.session_state, partages=[df_inies])
 
 SOLUTIONS_FILE = Path("solutions_db.json")
+PROJETS_FILE = Path("projets_db.json")
 
 def load_solutions():
     if SOLUTIONS_FILE.exists():
@@ -86,255 +93,367 @@ def search_products(df, query):
     return df[mask]
 
 
+# ✅ Solution créée, modifiée ou supprimée : seul son total est recalculé dans le projet ouvert
+def actualiser_projet(name, contenu):
+    if "calcul_projet" in st.session_state:
+        st.session_state.calcul_projet.actualiser_solution(name, contenu)
+
 
 solutions = load_solutions()
-view_tab, create_tab = st.tabs(["📂 Visualiser les solutions", "➕ Créer une solution"])
+# ✅ Onglets exécutés à la demande : seul l'onglet ouvert lit ses objets de session (brouillons, calcul de projet),
+# ✅ les autres vieillissent et peuvent être libérés par le budget mémoire
+view_tab, create_tab, optim_tab, projet_tab = st.tabs(
+    ["📂 Visualiser les solutions", "➕ Créer une solution", "⚙️ Optimiser les solutions", "🏗️ Projet"],
+    key="onglet_solutions", on_change="rerun"
+)
 
 with view_tab:
-    st.subheader("Solutions existantes")
-    if not solutions:
-        st.info("Aucune solution enregistrée pour le moment.")
-    else:
-        all_categories = sorted(set(content.get("categorie", "Non spécifiée") for content in solutions.values()))
-        selected_cat = st.selectbox("Filtrer par catégorie", ["Toutes"] + all_categories)
-
-        if "edit_solution" not in st.session_state:
-            st.session_state.edit_solution = None
-        if "edit_temp_produits" not in st.session_state:
-            st.session_state.edit_temp_produits = {}
-        if "saisie_libre_flags" not in st.session_state:
-            st.session_state.saisie_libre_flags = {}
-
-        for name, content in solutions.items():
-            if selected_cat != "Toutes" and content.get("categorie") != selected_cat:
-                continue
-
-            st.markdown(f"### 🔹 {name}")
-            st.markdown(f"**Catégorie :** {content.get('categorie', 'Non spécifiée')}")
-            solution_qte = st.number_input(f"Quantité de la solution ({name})", min_value=0.0, value=1.0, step=0.1, key=f"solution_qte_{name}")
-            produits = content.get("produits", [])
-
-            if st.session_state.edit_solution == name:
-                if name not in st.session_state.edit_temp_produits:
-                    st.session_state.edit_temp_produits[name] = produits
-                if name not in st.session_state.saisie_libre_flags:
-                    st.session_state.saisie_libre_flags[name] = [False] * len(produits)
-
-                new_produits = st.session_state.edit_temp_produits[name]
-                libre_flags = st.session_state.saisie_libre_flags[name]
-                df_inies = st.session_state.get("df_inies", pd.DataFrame())
-
-                for i, p in enumerate(new_produits):
-                    st.write(f"**Produit {i+1} :**")
-                    libre_key = f"libre_{name}_{i}"
-                    libre_flags[i] = st.checkbox("🔓 Mode saisie libre", value=libre_flags[i], key=libre_key)
-
-                    if libre_flags[i]:
-                        selected_nom = st.text_input(
-                            f"Nom ou ID INIES du produit {i+1}",
-                            value=p.get("nom", ""),
-                            key=f"text_{name}_{i}"
-                        )
-                        selected_row = None
-                        id_inies = ""
-                    else:
-                        options = [
-                            f"{row['Nom du produit']} (ID: {row['ID INIES']})"
-                            for _, row in df_inies.iterrows()
-                        ]
-                        default_val = p.get("nom", "")
-                        selected_nom = st.selectbox(
-                            f"Nom ou ID INIES du produit {i+1}",
-                            options,
-                            index=options.index(default_val) if default_val in options else 0,
-                            key=f"dropdown_{name}_{i}"
-                        )
-
-                        id_inies = extract_product_id(selected_nom)
-                        selected_row = (
-                            df_inies[df_inies["ID INIES"].astype(str) == id_inies].iloc[0]
-                            if id_inies and not df_inies.empty and id_inies in df_inies["ID INIES"].astype(str).values
-                            else None
-                        )
-
-                    quantité = st.number_input(f"Quantité {i+1}", value=float(p.get("quantité", 0)), key=f"quantite_{name}_{i}")
-
-                    if selected_row is not None:
-                        impact_co2 = float(selected_row["Impact CO₂ (kg)"])
-                        d_benefices = float(selected_row.get("D-Bénéfices", 0) or 0)
-                        duree_vie = selected_row.get("Durée de Vie", 50)
-                        try:
-                            duree_vie = int(str(duree_vie).split()[0])
-                        except:
-                            duree_vie = 50
-                        impact_normalisé = round((impact_co2 + d_benefices) * (50 / duree_vie) * float(quantité), 2)
-                    else:
-                        impact_normalisé = float(p.get("impact_normalisé", 0))
-                        duree_vie = p.get("durée_vie", 50)
-                        d_benefices = p.get("d_bénéfices", 0)
-
-                    st.write(f"Impact CO₂ normalisé {i+1} : {impact_normalisé} kg")
-
-                    new_produits[i] = {
-                        "id_inies": str(id_inies),
-                        "nom": str(selected_nom),
-                        "quantité": float(quantité),
-                        "impact_normalisé": float(impact_normalisé),
-                        "durée_vie": int(duree_vie),
-                        "d_bénéfices": float(d_benefices)
-                    }
-
-                    if st.button(f"❌ Supprimer produit {i+1}", key=f"remove_prod_{name}_{i}"):
-                        new_produits.pop(i)
-                        libre_flags.pop(i)
+    if view_tab.open:
+        st.subheader("Solutions existantes")
+        if not solutions:
+            st.info("Aucune solution enregistrée pour le moment.")
+        else:
+            all_categories = sorted(set(content.get("categorie", "Non spécifiée") for content in solutions.values()))
+            selected_cat = st.selectbox("Filtrer par catégorie", ["Toutes"] + all_categories)
+
+            if "edit_solution" not in st.session_state:
+                st.session_state.edit_solution = None
+
+            for name, content in solutions.items():
+                if selected_cat != "Toutes" and content.get("categorie") != selected_cat:
+                    continue
+
+                st.markdown(f"### 🔹 {name}")
+                st.markdown(f"**Catégorie :** {content.get('categorie', 'Non spécifiée')}")
+                solution_qte = st.number_input(f"Quantité de la solution ({name})", min_value=0.0, value=1.0, step=0.1, key=f"solution_qte_{name}")
+                produits = content.get("produits", [])
+
+                if st.session_state.edit_solution == name:
+                    # ✅ Brouillon d'édition de la solution, libéré à l'enregistrement ou à l'annulation
+                    brouillon = session.obtenir(
+                        f"brouillon_{name}",
+                        lambda: {"produits": [dict(p) for p in produits], "libre": [False] * len(produits)}
+                    )
+                    new_produits = brouillon["produits"]
+                    libre_flags = brouillon["libre"]
+
+                    for i, p in enumerate(new_produits):
+                        st.write(f"**Produit {i+1} :**")
+                        libre_key = f"libre_{name}_{i}"
+                        libre_flags[i] = st.checkbox("🔓 Mode saisie libre", value=libre_flags[i], key=libre_key)
+
+                        if libre_flags[i]:
+                            selected_nom = st.text_input(
+                                f"Nom ou ID INIES du produit {i+1}",
+                                value=p.get("nom", ""),
+                                key=f"text_{name}_{i}"
+                            )
+                            id_inies = ""
+                        else:
+                            options = list(libelles_produits(df_inies).values()) if not df_inies.empty else []
+                            default_val = p.get("nom", "")
+                            selected_nom = st.selectbox(
+                                f"Nom ou ID INIES du produit {i+1}",
+                                options,
+                                index=options.index(default_val) if default_val in options else 0,
+                                key=f"dropdown_{name}_{i}"
+                            )
+
+                            id_inies = extract_product_id(selected_nom)
+
+                        quantité = st.number_input(f"Quantité {i+1}", value=float(p.get("quantité", 0)), key=f"quantite_{name}_{i}")
+
+                        # ✅ Impact normalisé x quantité lu dans la table des impacts de la base (calculée une fois par version)
+                        produit = impacts_normalises(df_inies, [id_inies], [quantité]).iloc[0] if id_inies and not df_inies.empty else None
+                        if produit is not None and produit["Produit trouvé"]:
+                            impact_normalisé = round(float(produit["Impact normalisé"]), 2)
+                            duree_vie = produit["Durée de Vie (ans)"]
+                            d_benefices = produit["D-Bénéfices"]
+                        else:
+                            impact_normalisé = float(p.get("impact_normalisé", 0))
+                            duree_vie = p.get("durée_vie", 50)
+                            d_benefices = p.get("d_bénéfices", 0)
+
+                        st.write(f"Impact CO₂ normalisé {i+1} : {impact_normalisé} kg")
+
+                        new_produits[i] = {
+                            "id_inies": str(id_inies),
+                            "nom": str(selected_nom),
+                            "quantité": float(quantité),
+                            "impact_normalisé": float(impact_normalisé),
+                            "durée_vie": int(duree_vie),
+                            "d_bénéfices": float(d_benefices)
+                        }
+
+                        if st.button(f"❌ Supprimer produit {i+1}", key=f"remove_prod_{name}_{i}"):
+                            new_produits.pop(i)
+                            libre_flags.pop(i)
+                            st.rerun()
+
+                    if st.button(f"➕ Ajouter un produit vide", key=f"add_prod_{name}"):
+                        new_produits.append({
+                            "id_inies": "",
+                            "nom": "",
+                            "quantité": 0.0,
+                            "impact_normalisé": 0.0,
+                            "durée_vie": 50,
+                            "d_bénéfices": 0
+                        })
+                        libre_flags.append(False)
                         st.rerun()
 
-                if st.button(f"➕ Ajouter un produit vide", key=f"add_prod_{name}"):
-                    new_produits.append({
-                        "id_inies": "",
-                        "nom": "",
-                        "quantité": 0.0,
-                        "impact_normalisé": 0.0,
-                        "durée_vie": 50,
-                        "d_bénéfices": 0
-                    })
-                    libre_flags.append(False)
-                    st.rerun()
-
-                if st.button("📅 Sauvegarder", key=f"save_{name}"):
-                    solutions[name]["produits"] = new_produits
-                    save_solutions(solutions)
-                    st.success("Modifications enregistrées.")
-                    st.session_state.edit_solution = None
-                    st.rerun()
-                if st.button("❌ Annuler", key=f"cancel_{name}"):
-                    st.session_state.edit_solution = None
-                    st.rerun()
-            else:
-                df = pd.DataFrame(produits)
-                df_affiche = df[["nom", "quantité", "impact_normalisé"]].rename(columns={
-                    "nom": "Nom du produit",
-                    "quantité": "Quantité",
-                    "impact_normalisé": "Impact CO₂ normalisé (kg)"
-                })
-                st.dataframe(df_affiche, use_container_width=True)
-                impact_total = df["impact_normalisé"].sum()
-                st.markdown(f"**Impact total CO₂ normalisé :** {impact_total:.2f} kg")
-
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button(f"🖍️ Modifier", key=f"edit_{name}"):
-                        st.session_state.edit_solution = name
+                    if st.button("📅 Sauvegarder", key=f"save_{name}"):
+                        solutions[name]["produits"] = new_produits
+                        save_solutions(solutions)
+                        actualiser_projet(name, solutions[name])
+                        st.success("Modifications enregistrées.")
+                        st.session_state.edit_solution = None
+                        session.liberer(f"brouillon_{name}")
                         st.rerun()
-                with col2:
-                    if st.button(f"🗑️ Supprimer", key=f"delete_{name}"):
-                        delete_solution(name, solutions)
+                    if st.button("❌ Annuler", key=f"cancel_{name}"):
+                        st.session_state.edit_solution = None
+                        session.liberer(f"brouillon_{name}")
                         st.rerun()
+                else:
+                    df = pd.DataFrame(produits)
+                    df_affiche = df[["nom", "quantité", "impact_normalisé"]].rename(columns={
+                        "nom": "Nom du produit",
+                        "quantité": "Quantité",
+                        "impact_normalisé": "Impact CO₂ normalisé (kg)"
+                    })
+                    st.dataframe(df_affiche, use_container_width=True)
+                    impact_total = df["impact_normalisé"].sum()
+                    st.markdown(f"**Impact total CO₂ normalisé :** {impact_total:.2f} kg")
+                    st.markdown(f"**Impact pour une quantité de {solution_qte:g} :** {impact_total * solution_qte:.2f} kg")
+
+                    # ✅ Substituts de même unité fonctionnelle et d'impact normalisé plus faible
+                    ids_solution = [int(p["id_inies"]) for p in produits if str(p.get("id_inies", "")).strip().isdigit()]
+                    if ids_solution and not df_inies.empty:
+                        with st.expander("💡 Substituts bas carbone"):
+                            if st.toggle("Rechercher des substituts", key=f"substituts_{name}"):
+                                substituts = index_substituts(df_inies)
+                                ids_connus = [i for i in ids_solution if i in substituts.positions]
+                                st.dataframe(substituts.recommander_lot(ids_connus, k=3), use_container_width=True)
+
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.button(f"🖍️ Modifier", key=f"edit_{name}"):
+                            st.session_state.edit_solution = name
+                            st.rerun()
+                    with col2:
+                        if st.button(f"🗑️ Supprimer", key=f"delete_{name}"):
+                            delete_solution(name, solutions)
+                            actualiser_projet(name, None)
+                            st.rerun()
 
 with create_tab:
-    st.subheader("Création d'une nouvelle solution")
+    if create_tab.open:
+        st.subheader("Création d'une nouvelle solution")
 
-    if "new_solution_produits" not in st.session_state:
-        st.session_state.new_solution_produits = []
+        session.obtenir("new_solution_produits", list)
 
-    solution_name = st.text_input("Nom de la solution", "")
+        solution_name = st.text_input("Nom de la solution", "")
 
-    categories_possibles = [
-        "Toitures", "Murs ossature bois", "Planchers", "Murs béton", "Menuiseries", "Autres"
-    ]
-    categorie = st.selectbox("Catégorie de la solution", categories_possibles)
+        categories_possibles = [
+            "Toitures", "Murs ossature bois", "Planchers", "Murs béton", "Menuiseries", "Autres"
+        ]
+        categorie = st.selectbox("Catégorie de la solution", categories_possibles)
 
-    st.markdown("### Ajouter un produit à la solution")
-    df_inies = st.session_state.get("df_inies", pd.DataFrame())
+        st.markdown("### Ajouter un produit à la solution")
 
-    if "saisie_libre_creation" not in st.session_state:
-        st.session_state.saisie_libre_creation = False
+        if "saisie_libre_creation" not in st.session_state:
+            st.session_state.saisie_libre_creation = False
 
-    st.session_state.saisie_libre_creation = st.checkbox("🔓 Mode saisie libre", value=st.session_state.saisie_libre_creation)
+        st.session_state.saisie_libre_creation = st.checkbox("🔓 Mode saisie libre", value=st.session_state.saisie_libre_creation)
 
-    produit_nom = ""
-    selected_row = None
+        produit_nom = ""
+        id_inies = None
 
-    if st.session_state.saisie_libre_creation:
-        produit_nom = st.text_input("Nom ou ID INIES du produit 1", "")
-    else:
-        options = [
-            f"{row['Nom du produit']} (ID: {row['ID INIES']})"
-            for _, row in df_inies.iterrows()
-        ]
-        produit_nom = st.selectbox("Nom ou ID INIES du produit 1", options)
+        if st.session_state.saisie_libre_creation:
+            produit_nom = st.text_input("Nom ou ID INIES du produit 1", "")
+        else:
+            options = list(libelles_produits(df_inies).values()) if not df_inies.empty else []
+            produit_nom = st.selectbox("Nom ou ID INIES du produit 1", options)
+            id_inies = extract_product_id(produit_nom)
 
-        def extract_product_id(option):
-            if "(ID: " in option:
-                return option.split("(ID: ")[-1].replace(")", "")
-            return None
+        quantité = st.number_input("Quantité", min_value=0.0, format="%.2f")
 
-        id_inies = extract_product_id(produit_nom)
-        if id_inies and id_inies in df_inies["ID INIES"].astype(str).values:
-            selected_row = df_inies[df_inies["ID INIES"].astype(str) == id_inies].iloc[0]
+        produit = impacts_normalises(df_inies, [id_inies], [quantité]).iloc[0] if id_inies and not df_inies.empty else None
+        if produit is not None and produit["Produit trouvé"]:
+            impact_normalisé = round(float(produit["Impact normalisé"]), 2)
+            duree_vie = produit["Durée de Vie (ans)"]
+            d_benefices = produit["D-Bénéfices"]
         else:
-            selected_row = None
-
-    quantité = st.number_input("Quantité", min_value=0.0, format="%.2f")
-
-    if selected_row is not None:
-        id_inies = selected_row["ID INIES"]
-        impact_co2 = selected_row["Impact CO₂ (kg)"]
-        d_benefices = selected_row.get("D-Bénéfices", 0) or 0
-        duree_vie = selected_row.get("Durée de Vie", 50)
-        try:
-            duree_vie = int(str(duree_vie).split()[0])
-        except:
+            id_inies = ""
+            impact_normalisé = 0.0
             duree_vie = 50
-        impact_normalisé = round((float(impact_co2) + float(d_benefices)) * (50 / duree_vie) * float(quantité), 2)
-    else:
-        id_inies = ""
-        impact_normalisé = 0.0
-        duree_vie = 50
-        d_benefices = 0.0
-
-    st.write(f"**Impact CO₂ normalisé : {impact_normalisé:.1f} kg**")
-
-    if st.button("➕ Ajouter ce produit à la solution"):
-        st.session_state.new_solution_produits.append({
-            "id_inies": str(id_inies),
-            "nom": str(produit_nom),
-            "quantité": float(quantité),
-            "impact_normalisé": float(impact_normalisé),
-            "durée_vie": int(duree_vie),
-            "d_bénéfices": float(d_benefices)
-        })
-        st.success("Produit ajouté.")
-
-    if st.session_state.new_solution_produits:
-        st.markdown("### Produits dans la solution")
-        df_temp = pd.DataFrame(st.session_state.new_solution_produits)
-        df_affiche = df_temp[["nom", "quantité", "impact_normalisé"]].rename(columns={
-            "nom": "Nom du produit",
-            "quantité": "Quantité",
-            "impact_normalisé": "Impact CO₂ normalisé (kg)"
-        })
-        st.dataframe(df_affiche, use_container_width=True)
-
-        total = df_temp["impact_normalisé"].sum()
-        st.markdown(f"**Impact total estimé : {total:.2f} kg**")
-
-        for i in range(len(st.session_state.new_solution_produits)):
-            if st.button(f"❌ Supprimer le produit {i+1}", key=f"remove_{i}"):
-                st.session_state.new_solution_produits.pop(i)
-                st.rerun()
-
-    if st.session_state.new_solution_produits and solution_name.strip():
-        if st.button("💾 Enregistrer la solution"):
-            if solution_name in solutions:
-                st.warning("Une solution avec ce nom existe déjà.")
-            else:
-                solutions[solution_name] = {
-                    "nom": solution_name,
-                    "categorie": categorie,
-                    "produits": st.session_state.new_solution_produits,
-                }
-                save_solutions(solutions)
-                st.success("✅ Solution enregistrée avec succès.")
-                st.session_state.new_solution_produits = []
-                st.rerun()
+            d_benefices = 0.0
+
+        st.write(f"**Impact CO₂ normalisé : {impact_normalisé:.1f} kg**")
+
+        if st.button("➕ Ajouter ce produit à la solution"):
+            st.session_state.new_solution_produits.append({
+                "id_inies": str(id_inies),
+                "nom": str(produit_nom),
+                "quantité": float(quantité),
+                "impact_normalisé": float(impact_normalisé),
+                "durée_vie": int(duree_vie),
+                "d_bénéfices": float(d_benefices)
+            })
+            st.success("Produit ajouté.")
+
+        if st.session_state.new_solution_produits:
+            st.markdown("### Produits dans la solution")
+            df_temp = pd.DataFrame(st.session_state.new_solution_produits)
+            df_affiche = df_temp[["nom", "quantité", "impact_normalisé"]].rename(columns={
+                "nom": "Nom du produit",
+                "quantité": "Quantité",
+                "impact_normalisé": "Impact CO₂ normalisé (kg)"
+            })
+            st.dataframe(df_affiche, use_container_width=True)
+
+            total = df_temp["impact_normalisé"].sum()
+            st.markdown(f"**Impact total estimé : {total:.2f} kg**")
+
+            for i in range(len(st.session_state.new_solution_produits)):
+                if st.button(f"❌ Supprimer le produit {i+1}", key=f"remove_{i}"):
+                    st.session_state.new_solution_produits.pop(i)
+                    st.rerun()
+
+        if st.session_state.new_solution_produits and solution_name.strip():
+            if st.button("💾 Enregistrer la solution"):
+                if solution_name in solutions:
+                    st.warning("Une solution avec ce nom existe déjà.")
+                else:
+                    solutions[solution_name] = {
+                        "nom": solution_name,
+                        "categorie": categorie,
+                        "produits": st.session_state.new_solution_produits,
+                    }
+                    save_solutions(solutions)
+                    actualiser_projet(solution_name, solutions[solution_name])
+                    st.success("✅ Solution enregistrée avec succès.")
+                    st.session_state.new_solution_produits = []
+                    st.rerun()
+
+with optim_tab:
+    if optim_tab.open:
+        st.subheader("Optimisation de l'impact CO₂ normalisé")
+
+        if not solutions or df_inies.empty:
+            st.info("Aucune solution ou base INIES indisponible.")
+        else:
+            # ✅ Contraintes : types de déclaration autorisés et nombre de substitutions par solution
+            types_autorises = st.multiselect(
+                "Types de déclaration autorisés pour les substituts",
+                TYPES_DECLARATION,
+                default=TYPES_DECLARATION
+            )
+            limiter = st.checkbox("Limiter le nombre de substitutions par solution")
+            max_substitutions = st.number_input("Substitutions maximales", min_value=1, value=2, step=1) if limiter else None
+
+            if st.button("⚙️ Lancer l'optimisation"):
+                lignes_optim = optimiser_solutions(
+                    solutions,
+                    index_substituts(df_inies),
+                    types=types_autorises,
+                    max_substitutions=max_substitutions
+                )
+                st.dataframe(totaux_optimises(lignes_optim), use_container_width=True)
+                st.markdown("### Substitutions proposées")
+                st.dataframe(
+                    lignes_optim[lignes_optim["Substitué"]][
+                        ["Solution", "Nom du produit", "Quantité", "Impact initial", "ID optimisé", "Nom optimisé", "Quantité optimisée", "Impact optimisé"]
+                    ],
+                    use_container_width=True
+                )
+                if lignes_optim["Type non conforme"].any():
+                    st.warning("⚠️ Certains produits ne respectent pas les types autorisés et n'ont pas de substitut admissible.")
+
+# ✅ Enregistrement / suppression en rappel : le projet affiché bascule avant le rechargement de la page
+def enregistrer_projet(projets, choix, nom, calcul):
+    if nom != choix:
+        projets.pop(choix, None)
+    projets[nom] = calcul.projet(nom)
+    enregistrer_projets(projets, PROJETS_FILE)
+    st.session_state.choix_projet = nom
+    st.session_state.projet_courant = nom
+    st.session_state.projet_initial = calcul.tableau()[["Solution", "Quantité"]]
+    st.toast("✅ Projet enregistré.")
+
+
+def supprimer_projet(projets, choix):
+    projets.pop(choix)
+    enregistrer_projets(projets, PROJETS_FILE)
+    st.session_state.choix_projet = "➕ Nouveau projet"
+    st.session_state.pop("projet_courant", None)
+
+
+with projet_tab:
+    if projet_tab.open:
+        st.subheader("Bilan carbone d'un projet")
+
+        if not solutions or df_inies.empty:
+            st.info("Aucune solution ou base INIES indisponible.")
+        else:
+            projets = charger_projets(PROJETS_FILE)
+            choix_projet = st.selectbox("Projet", ["➕ Nouveau projet"] + list(projets), key="choix_projet")
+            nom_projet = st.text_input("Nom du projet", "" if choix_projet == "➕ Nouveau projet" else choix_projet)
+
+            # ✅ Calcul conservé dans la session : totaux des solutions évalués une fois à l'ouverture du projet
+            if st.session_state.get("projet_courant") != choix_projet:
+                st.session_state.projet_courant = choix_projet
+                calcul = session.definir("calcul_projet", CalculProjet.depuis_projet(projets.get(choix_projet, {}), solutions, df_inies))
+                st.session_state.projet_initial = calcul.tableau()[["Solution", "Quantité"]]
+            # ✅ Libéré par le budget mémoire de la session : reconstruit, puis resynchronisé sur l'éditeur ci-dessous
+            calcul = session.obtenir(
+                "calcul_projet", lambda: CalculProjet.depuis_projet(projets.get(choix_projet, {}), solutions, df_inies)
+            )
+
+            st.markdown("Ajoutez une ligne par solution mise en œuvre (ex. 120 m² de planchers).")
+            edition = st.data_editor(
+                st.session_state.projet_initial,
+                num_rows="dynamic",
+                column_config={
+                    "Solution": st.column_config.SelectboxColumn("Solution", options=list(solutions), required=True),
+                    "Quantité": st.column_config.NumberColumn("Quantité", min_value=0.0, step=1.0),
+                },
+                use_container_width=True,
+                key=f"editeur_projet_{choix_projet}"
+            )
+
+            # ✅ Seules les lignes modifiées sont recalculées (cumuls par catégorie corrigés par différence)
+            edition = edition.dropna(subset=["Solution"]).reset_index(drop=True)
+            for cle, (solution, quantite) in enumerate(edition[["Solution", "Quantité"]].itertuples(index=False)):
+                quantite = float(quantite) if pd.notna(quantite) else 0.0
+                if calcul.lignes.get(cle) != (solution, quantite):
+                    calcul.definir_ligne(cle, solution, quantite)
+            for cle in [cle for cle in calcul.lignes if cle >= len(edition)]:
+                calcul.retirer_ligne(cle)
+
+            st.metric("Impact total CO₂ normalisé du projet", f"{calcul.total:,.2f} kg".replace(",", " "))
+            col_lignes, col_categories = st.columns([3, 2])
+            with col_lignes:
+                st.markdown("### Détail par solution")
+                st.dataframe(calcul.tableau().round(2), use_container_width=True)
+            with col_categories:
+                st.markdown("### Par catégorie")
+                st.dataframe(calcul.recapitulatif().round(2), use_container_width=True)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.button(
+                    "💾 Enregistrer le projet",
+                    disabled=not nom_projet.strip(),
+                    on_click=enregistrer_projet,
+                    args=(projets, choix_projet, nom_projet.strip(), calcul)
+                )
+            with col2:
+                if choix_projet in projets:
+                    st.button("🗑️ Supprimer le projet", on_click=supprimer_projet, args=(projets, choix_projet))
+
+# ✅ Budget mémoire de la session appliqué en fin d'exécution ; empreinte des sessions de ce processus
+session.appliquer_budget()
+with st.sidebar.expander("🧠 Mémoire des sessions"):
+    st.metric("Cette session", f"{session.empreinte() / 1024:,.0f} Ko".replace(",", " "))
+    st.dataframe(empreintes_sessions(), use_container_width=True, hide_index=True)
@@ -0,0 +1,62 @@
+from inies.browser import CONFIG_DEFAUT, extraire_avec_reprise
+from inies.metrics import MesuresExtraction
+
+
+# ✅ Navigateur factice : la session « plante » pendant la première page du produit indiqué
+class NavigateurFactice:
+    def __init__(self, plantages):
+        self.config = dict(CONFIG_DEFAUT)
+        self.plantages = plantages
+        self.vivant = True
+        self.sessions = 1
+        self.redemarrages = 0
+
+    @property
+    def driver(self):
+        return self
+
+    def est_vivant(self):
+        return self.vivant
+
+    def redemarrer(self):
+        self.vivant = True
+        self.redemarrages += 1
+
+    def page_chargee(self):
+        pass
+
+
+def test_page_partielle_apres_plantage_reessayee(tmp_path):
+    navigateur = NavigateurFactice({"2"})
+    tentatives = []
+
+    def extraire(id_inies, driver, mesure):
+        tentatives.append(id_inies)
+        if id_inies in driver.plantages:
+            driver.plantages.discard(id_inies)
+            driver.vivant = False
+            mesure.echec("informations", RuntimeError("session perdue"))
+            return [id_inies, "Nom introuvable"]
+        return [id_inies, f"Produit {id_inies}"]
+
+    chemin = tmp_path / "mesures.jsonl"
+    with MesuresExtraction(str(chemin)) as mesures:
+        resultats = extraire_avec_reprise(["1", "2", "3"], extraire, navigateur, lambda i, e: [i, "Erreur"], mesures=mesures)
+
+    assert tentatives == ["1", "2", "3", "2"]
+    assert sorted(resultats) == [["1", "Produit 1"], ["2", "Produit 2"], ["3", "Produit 3"]]
+    assert navigateur.redemarrages == 1
+    assert '"statut": "reessai"' in chemin.read_text(encoding="utf-8")
+
+
+# ✅ Champ absent de la page, session intacte : résultat partiel conservé sans nouvel essai
+def test_page_partielle_session_vivante_conservee():
+    navigateur = NavigateurFactice(set())
+
+    def extraire(id_inies, driver, mesure):
+        mesure.echec("duree_vie", RuntimeError("absent"))
+        return [id_inies, "partiel"]
+
+    resultats = extraire_avec_reprise(["1"], extraire, navigateur, lambda i, e: [i, "Erreur"])
+    assert resultats == [["1", "partiel"]]
+    assert navigateur.redemarrages == 0
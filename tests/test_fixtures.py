@@ -0,0 +1,17 @@
+from inies.fixtures import DOSSIER_FIXTURES, charger_attendu, comparer_extractions, pages
+
+
+# ✅ Corpus hors ligne : chaque page a ses valeurs attendues et l'analyse statique les retrouve toutes.
+# ✅ Pages reconstruites (pas des captures du site) : non-régression des XPath sur la structure de référence,
+# ✅ sans valeur de preuve sur le balisage réel d'INIES
+def test_corpus_complet():
+    assert pages(DOSSIER_FIXTURES)
+    assert set(pages(DOSSIER_FIXTURES)) == set(charger_attendu(DOSSIER_FIXTURES))
+
+
+def test_analyse_statique_sans_ecart():
+    resultats, ecarts = comparer_extractions(DOSSIER_FIXTURES)
+    statique = resultats.iloc[0]
+    assert statique["Échecs"] == 0
+    assert statique["Indicateurs"] > 0
+    assert ecarts.empty, ecarts.to_string()
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+import time
+from inies import refresh
+
+
+# ✅ Étape longue sans progression : le fil de battement garde le travailleur actif,
+# ✅ et un second travailleur lancé entre-temps ne touche pas à la tâche en cours
+def test_etape_longue_sans_progression(tmp_path, monkeypatch):
+    dossier = str(tmp_path)
+    monkeypatch.setattr(refresh, "BATTEMENT_MAX", 0.2)
+    observations = {}
+
+    def etape_longue(progression):
+        time.sleep(0.6)
+        observations["actif"] = refresh.travailleur_actif(dossier)
+        observations["second"] = subprocess.run(
+            [sys.executable, "-c", f"from inies import refresh; print(refresh.travailler({dossier!r}, une_fois=True))"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.dirname(refresh.__file__))
+        ).stdout.strip()
+        observations["statut"] = refresh.etat(tache["id"], dossier)["statut"]
+        return "Terminée"
+
+    monkeypatch.setitem(refresh.TRAITEMENTS, "maj", etape_longue)
+    tache = refresh.soumettre("maj", dossier)
+    refresh._battement(dossier)
+    refresh.executer(tache, dossier)
+
+    assert observations["actif"]
+    assert observations["second"] == "0"
+    assert observations["statut"] == "en_cours"
+    assert refresh.etat(tache["id"], dossier)["statut"] == "terminee"
+
+
+def test_travailleur_arrete(tmp_path, monkeypatch):
+    dossier = str(tmp_path)
+    monkeypatch.setattr(refresh, "BATTEMENT_MAX", 0.2)
+    refresh._battement(dossier)
+    assert refresh.travailleur_actif(dossier)
+    time.sleep(0.3)
+    assert not refresh.travailleur_actif(dossier)
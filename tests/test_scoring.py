@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from inies.impact import impact_normalise
+from inies.scoring import MODES_SCORE, scores
+
+
+# ✅ Une valeur non finie n'annule pas les scores du groupe : NaN pour elle seule, quel que soit le mode
+@pytest.mark.parametrize("mode", list(MODES_SCORE))
+def test_valeur_non_finie_isolee(mode):
+    valeurs = np.array([1.0, 2.0, 3.0, 4.0, 100.0])
+    avec_infini = scores(np.append(valeurs, np.inf), mode)
+
+    assert np.isnan(avec_infini[-1])
+    np.testing.assert_allclose(avec_infini[:-1], scores(valeurs, mode))
+    assert np.ptp(avec_infini[:-1]) > 0
+
+
+def test_duree_de_vie_nulle_ou_negative():
+    with np.errstate(all='raise'):
+        normalises = impact_normalise([10.0, 10.0, 10.0], [0.0, 0.0, 0.0], [0.0, -5.0, 25.0])
+    np.testing.assert_allclose(normalises, [10.0, 10.0, 20.0])
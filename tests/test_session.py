@@ -0,0 +1,56 @@
+import numpy as np
+from inies.session import CLE_GESTION, EtatSession, oublier_session, taille_objet
+
+TAILLE = taille_objet(np.zeros(1000))
+
+
+# ✅ Première exécution : trois objets gérés, dates d'accès fixées (a le plus ancien, c le plus récent)
+def _etat_apres_premiere_execution():
+    etat = {}
+    session = EtatSession(etat, budget=10 * TAILLE)
+    for cle in ("a", "b", "c"):
+        session.definir(cle, np.zeros(1000))
+    session.gestion["acces"].update(a=1.0, b=2.0, c=3.0)
+    assert session.appliquer_budget() == []
+    return etat
+
+
+# ✅ Au-delà du budget : le moins récemment utilisé est libéré, seulement jusqu'à repasser sous le budget,
+# ✅ jamais un objet utilisé pendant l'exécution en cours
+def test_liberation_lru_hors_execution_en_cours():
+    etat = _etat_apres_premiere_execution()
+    session = EtatSession(etat, budget=3 * TAILLE + TAILLE // 2)
+    session.obtenir("a", lambda: np.zeros(1000))
+    session.definir("d", np.zeros(1000))
+
+    assert session.appliquer_budget() == ["b"]
+    assert set(etat) == {CLE_GESTION, "a", "c", "d"}
+    assert "b" not in session.gestion["acces"]
+    assert session.empreinte() == 3 * TAILLE <= session.budget
+    assert session.gestion["evictions"] == 1
+    oublier_session(session.id)
+
+
+def test_objets_de_l_execution_conserves_meme_hors_budget():
+    etat = _etat_apres_premiere_execution()
+    session = EtatSession(etat, budget=0)
+    session.obtenir("c", lambda: np.zeros(1000))
+    session.definir("d", np.zeros(1000))
+
+    assert session.appliquer_budget() == ["a", "b"]
+    assert set(etat) == {CLE_GESTION, "c", "d"}
+    assert session.empreinte() == 2 * TAILLE
+    oublier_session(session.id)
+
+
+# ✅ Objets partagés (base INIES) hors budget : ils ne déclenchent aucune libération
+def test_objets_partages_non_comptes():
+    base = np.zeros(100_000)
+    etat = {}
+    session = EtatSession(etat, partages=[base], budget=2 * TAILLE)
+    session.definir("base", base)
+    session.definir("brouillon", np.zeros(1000))
+
+    assert session.empreinte() == TAILLE
+    assert session.appliquer_budget() == []
+    oublier_session(session.id)
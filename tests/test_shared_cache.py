@@ -0,0 +1,30 @@
+import pandas as pd
+from inies.shared_cache import lire, publier, verifier_processus
+
+
+def _base(lignes):
+    return pd.DataFrame({
+        'ID INIES': range(1, lignes + 1),
+        'Nom du produit': [f"Produit {i}" for i in range(1, lignes + 1)],
+        'Impact CO₂ (kg)': [float(i) for i in range(1, lignes + 1)],
+    })
+
+
+# ✅ N lecteurs dans des processus distincts : avant la seconde publication tous lisent la première version,
+# ✅ après la bascule tous lisent la seconde, chacune complète (nombre de lignes publié)
+def test_bascule_atomique_entre_processus(tmp_path):
+    df = _base(50)
+    lectures = verifier_processus(df, nb_processus=3, dossier=str(tmp_path))
+
+    assert len(lectures) == 6
+    assert lectures['Conforme'].all(), lectures.to_string()
+    lignes = lectures.groupby('Lecture')['Lignes'].unique()
+    assert list(lignes['avant']) == [len(df)]
+    assert list(lignes['après']) == [len(df) - 1]
+
+
+def test_pointeur_lisible_apres_publication(tmp_path):
+    version = publier(_base(10), str(tmp_path))
+    lue, df = lire(str(tmp_path))
+    assert lue == version
+    assert len(df) == 10
@@ -1,4 +1,5 @@
 import streamlit as st
+from inies.sorties import FORMATS, MIMES, exporter_octets
 
 def apply_styles():
     st.markdown(
@@ -29,3 +30,34 @@ def apply_styles():
         """,
         unsafe_allow_html=True
     )
+
+# ✅ Tableau paginé : seule la page courante est envoyée au navigateur (le jeu complet passe par l'export)
+LIGNES_PAGE = 100
+
+def tableau_pagine(df, key, lignes_page=LIGNES_PAGE):
+    nb_pages = max(1, -(-len(df) // lignes_page))
+    page = 1
+    if nb_pages > 1:
+        col_page, col_info = st.columns([1, 4])
+        with col_page:
+            page = st.number_input("Page", min_value=1, max_value=nb_pages, value=1, step=1, key=f"{key}_page")
+        with col_info:
+            debut = (page - 1) * lignes_page
+            st.caption(f"Lignes {debut + 1} à {min(debut + lignes_page, len(df))} sur {len(df)} ({nb_pages} pages)")
+    debut = (page - 1) * lignes_page
+    st.dataframe(df.iloc[debut:debut + lignes_page])
+
+# ✅ Export côté serveur du résultat courant (fichier généré au clic, sans passer par le tableau)
+def bouton_export(df, nom_fichier, key):
+    col_format, col_bouton = st.columns([1, 2])
+    with col_format:
+        format_export = st.selectbox("Format", FORMATS, index=FORMATS.index('xlsx'), key=f"{key}_format")
+    with col_bouton:
+        st.download_button(
+            f"💾 Exporter {len(df)} lignes",
+            data=lambda: exporter_octets(df, format_export),
+            file_name=f"{nom_fichier}.{format_export}",
+            mime=MIMES[format_export],
+            on_click="ignore",
+            key=key
+        )